@@ -1,24 +1,148 @@
 """
 Backtesting API routes
 """
-from flask import Blueprint, jsonify, request
-from services.backtester import Backtester
+import json
+from flask import Blueprint, Response, jsonify, request
+from services.result_cache import BacktestResultCache
+from services.encoding import RESPONSE_FORMATS, backtest_to_columns, json_response
+from services.job_queue import JobQueue, JobNotFoundError, QueueFullError
+from services.telemetry import stage_timer
 
+# The backtesters (and the pandas/yfinance stack behind them) are imported
+# in the handlers that use them, so registering the blueprint stays cheap
 backtest_bp = Blueprint('backtest', __name__, url_prefix='/api/backtest')
+result_cache = BacktestResultCache()
+job_queue = JobQueue()
 
 @backtest_bp.route('/run', methods=['POST'])
 def run_backtest():
     """Run backtesting on a strategy"""
+    from services.backtester import Backtester
+    # Models come from the prediction API's warm registry and batching scheduler
+    from api.stock_routes import model_registry
     try:
         data = request.get_json()
         symbol = data.get('symbol')
         strategy = data.get('strategy')
         start_date = data.get('start_date')
         end_date = data.get('end_date')
+        params = data.get('params')
+        response_format = data.get('format', request.args.get('format', 'records'))
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Unknown format '{response_format}', expected one of {list(RESPONSE_FORMATS)}")
+        
+        backtester = Backtester(symbol, start_date, end_date, result_cache=result_cache,
+                                model_registry=model_registry)
+        results = backtester.run_strategy(strategy, params)
+        
+        with stage_timer('api', 'serialize'):
+            if response_format == 'columnar':
+                return json_response({'success': True, 'format': 'columnar', 'results': backtest_to_columns(results)}, request)
+            return jsonify({'success': True, 'results': results})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@backtest_bp.route('/portfolio', methods=['POST'])
+def run_portfolio_backtest():
+    """Run a strategy over several symbols sharing one pool of capital"""
+    from services.portfolio_backtester import PortfolioBacktester
+    try:
+        data = request.get_json()
+        symbols = data.get('symbols') or []
+        if not symbols:
+            raise ValueError('symbols must be a non-empty list')
+        
+        backtester = PortfolioBacktester(
+            symbols, data.get('start_date'), data.get('end_date'),
+            initial_capital=data.get('initial_capital'),
+            risk_per_trade=data.get('risk_per_trade'),
+            stop_loss=data.get('stop_loss')
+        )
+        results = backtester.run_strategy(data.get('strategy', 'sma_crossover'), data.get('params'))
+        
+        return jsonify({'success': True, 'results': results})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@backtest_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get backtest result cache counters"""
+    return jsonify({'success': True, 'stats': result_cache.stats()})
+
+@backtest_bp.route('/sweep', methods=['POST'])
+def run_sweep():
+    """Run a strategy over a grid of parameters and rank the results"""
+    from services.backtester import Backtester
+    try:
+        data = request.get_json()
+        symbol = data.get('symbol')
+        strategy = data.get('strategy', 'sma_crossover')
+        param_grid = data.get('param_grid', {})
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        rank_by = data.get('rank_by', 'sharpe_ratio')
         
         backtester = Backtester(symbol, start_date, end_date)
-        results = backtester.run_strategy(strategy)
+        results = backtester.run_sweep(param_grid, strategy, rank_by=rank_by)
         
         return jsonify({'success': True, 'results': results})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+
+@backtest_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a backtest to run in the background and return its job id"""
+    try:
+        data = request.get_json()
+        job_id = job_queue.submit(
+            symbol=data.get('symbol'),
+            strategy=data.get('strategy'),
+            params=data.get('params'),
+            start_date=data.get('start_date'),
+            end_date=data.get('end_date'),
+            initial_capital=data.get('initial_capital')
+        )
+        return jsonify({'success': True, 'job_id': job_id}), 202
+    except QueueFullError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@backtest_bp.route('/jobs', methods=['GET'])
+def get_job_stats():
+    """Get queue depth, job counts and timings"""
+    return jsonify({'success': True, 'stats': job_queue.stats()})
+
+@backtest_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll a job's status, progress and (once finished) results"""
+    try:
+        return jsonify({'success': True, 'job': job_queue.get(job_id)})
+    except JobNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+@backtest_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    try:
+        return jsonify({'success': True, 'job': job_queue.cancel(job_id)})
+    except JobNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+@backtest_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Stream job updates as server-sent events until the job finishes"""
+    try:
+        job_queue.get(job_id, include_result=False)
+    except JobNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+
+    def events():
+        for snapshot in job_queue.watch(job_id):
+            if snapshot is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
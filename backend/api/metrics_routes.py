@@ -0,0 +1,77 @@
+"""
+Metrics API routes and request timing middleware
+"""
+import time
+from flask import Blueprint, Response, g, jsonify, request
+from services.telemetry import REGISTRY, REQUEST_SECONDS, SamplingProfiler
+from config import Config
+
+PROFILER_MODES = ('off', 'request', 'slow')
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+profiler = SamplingProfiler()
+
+@metrics_bp.record_once
+def check_profiler_mode(state):
+    """Reject a misspelled PROFILER_MODE at startup instead of silently not profiling"""
+    if Config.PROFILER_MODE not in PROFILER_MODES:
+        raise ValueError(f"Unknown profiler mode '{Config.PROFILER_MODE}', expected one of {list(PROFILER_MODES)}")
+
+@metrics_bp.before_app_request
+def start_request_timer():
+    """Time every request, and start the profiler for the ones it covers"""
+    g.request_started = time.perf_counter()
+    g.profiling = Config.PROFILER_MODE == 'slow' or (
+        Config.PROFILER_MODE == 'request'
+        and (request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1')
+    )
+    if g.profiling:
+        profiler.start()
+
+@metrics_bp.after_app_request
+def record_request_time(response):
+    """
+    Observe the request's latency, labelled by route template
+
+    In 'request' mode, profiles of requests that asked for one are kept;
+    in 'slow' mode every request is sampled and the profile kept once it
+    took at least PROFILER_SLOW_MS. A kept profile's id is returned in
+    the X-Profile-Id header.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUEST_SECONDS.observe(elapsed, request.method, endpoint, str(response.status_code))
+    if g.pop('profiling', False):
+        samples = profiler.stop()
+        if Config.PROFILER_MODE == 'request' or elapsed * 1000 >= Config.PROFILER_SLOW_MS:
+            profile_id = profiler.keep(samples, method=request.method, path=request.path, endpoint=endpoint,
+                                       status=response.status_code, duration_ms=round(elapsed * 1000, 2))
+            response.headers['X-Profile-Id'] = str(profile_id)
+    return response
+
+@metrics_bp.teardown_app_request
+def stop_profiler(error=None):
+    """Stop sampling a request that failed before its response was built"""
+    if g.pop('profiling', False):
+        profiler.stop()
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """Request and stage latency histograms in Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@metrics_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    """Summaries of the kept request profiles, newest first"""
+    return jsonify({'success': True, 'mode': Config.PROFILER_MODE, 'profiles': profiler.profiles()})
+
+@metrics_bp.route('/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """One profile as collapsed stacks, ready for flamegraph.pl or speedscope"""
+    collapsed = profiler.collapsed(profile_id)
+    if collapsed is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return Response(collapsed, mimetype='text/plain')
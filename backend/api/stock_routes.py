@@ -2,26 +2,99 @@
 Stock data API routes
 """
 from flask import Blueprint, jsonify, request
-from services.data_fetcher import DataFetcher
+from services.cache import TTLCache
+from services.lazy import LazyObject
+from services.model_registry import ModelRegistry, ModelNotFoundError
+from services.inference_scheduler import InferenceScheduler
+from services.encoding import RESPONSE_FORMATS, records_to_columns, json_response
+from services.telemetry import stage_timer
+from config import Config
 
 stock_bp = Blueprint('stock', __name__, url_prefix='/api/stock')
-data_fetcher = DataFetcher()
+
+def _create_data_fetcher():
+    # Imported on first use: yfinance and pandas dominate the module's import time
+    from services.data_fetcher import DataFetcher
+    return DataFetcher()
+
+data_fetcher = LazyObject(_create_data_fetcher)
+price_cache = TTLCache(Config.PRICE_CACHE_MAX_BYTES)
+inference_scheduler = InferenceScheduler()
+model_registry = ModelRegistry(scheduler=inference_scheduler)
+
+def load_prices(symbol, period, interval='1d'):
+    """Fetch price records through the shared price cache"""
+    ttl = Config.PRICE_CACHE_TTLS.get(period, Config.PRICE_CACHE_DEFAULT_TTL)
+    return price_cache.get_or_load(
+        (symbol, period, interval),
+        lambda: data_fetcher.fetch_stock_data(symbol, period, interval),
+        ttl
+    )
+
+def load_price_columns(symbol, period, interval='1d'):
+    """Columnar form of load_prices(), cached alongside the records"""
+    ttl = Config.PRICE_CACHE_TTLS.get(period, Config.PRICE_CACHE_DEFAULT_TTL)
+    return price_cache.get_or_load(
+        (symbol, period, interval, 'columnar'),
+        lambda: records_to_columns(load_prices(symbol, period, interval), 'Date'),
+        ttl
+    )
 
 @stock_bp.route('/price/<symbol>', methods=['GET'])
 def get_stock_price(symbol):
-    """Get current stock price"""
+    """Get current stock price (?format=columnar for parallel arrays)"""
     try:
         period = request.args.get('period', '1d')
-        data = data_fetcher.fetch_stock_data(symbol, period)
-        return jsonify({'success': True, 'data': data})
+        interval = request.args.get('interval', '1d')
+        response_format = request.args.get('format', 'records')
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Unknown format '{response_format}', expected one of {list(RESPONSE_FORMATS)}")
+        if response_format == 'columnar':
+            data = load_price_columns(symbol, period, interval)
+            with stage_timer('api', 'serialize'):
+                return json_response({'success': True, 'format': 'columnar', 'data': data}, request)
+        data = load_prices(symbol, period, interval)
+        with stage_timer('api', 'serialize'):
+            return jsonify({'success': True, 'data': data})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
+@stock_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get price cache hit/miss/eviction counters"""
+    return jsonify({'success': True, 'stats': price_cache.stats()})
+
 @stock_bp.route('/predict/<symbol>', methods=['POST'])
 def predict_price(symbol):
     """Predict stock price using CNN-LSTM model"""
+    import pandas as pd
     try:
-        # Implementation will use the trained model
-        return jsonify({'success': True, 'prediction': []})
+        data = request.get_json(silent=True) or {}
+        days = int(data.get('days', 5))
+        period = data.get('period', '1y')
+        version = data.get('version')
+        
+        predictor = model_registry.get(symbol, int(version) if version is not None else None)
+        history = pd.DataFrame(load_prices(symbol, period))
+        prices = predictor.inverse_close(predictor.predict_next_days(history, days))[:, 0]
+        
+        last_date = pd.Timestamp(str(history['Date'].iloc[-1])[:10])
+        dates = pd.bdate_range(last_date + pd.Timedelta(days=1), periods=days)
+        prediction = [
+            {'date': date.strftime('%Y-%m-%d'), 'price': round(float(price), 2)}
+            for date, price in zip(dates, prices)
+        ]
+        return jsonify({'success': True, 'symbol': symbol, 'prediction': prediction})
+    except ModelNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
+
+@stock_bp.route('/models/stats', methods=['GET'])
+def get_model_stats():
+    """Get model registry and inference batching counters"""
+    return jsonify({
+        'success': True,
+        'stats': model_registry.stats(),
+        'inference': inference_scheduler.stats()
+    })
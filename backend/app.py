@@ -1,20 +1,94 @@
 """
 Main Flask application for FINANZ Stock Trading Bot
 """
-from api.stock_routes import stock_bp
-from api.backtest_routes import backtest_bp
+import gc
+import logging
 from flask import Flask, jsonify
 from flask_cors import CORS
 from config import Config
+from services.numpy_model import ARTIFACT_SUFFIX
 
-app = Flask(__name__)
-app.config.from_object(Config)
-CORS(app)
-app.register_blueprint(stock_bp)
-app.register_blueprint(backtest_bp)
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({'status': 'healthy', 'message': 'FINANZ API is running'})
+logger = logging.getLogger(__name__)
+
+
+def create_app(config=Config, preload=None):
+    """
+    Build the Flask application
+
+    Importing the app is kept cheap: pandas, yfinance and TensorFlow are
+    only imported when a request first needs them. Under a pre-forking
+    server (e.g. gunicorn --preload), pass preload=True to load shared
+    read-only data in the master instead, so workers inherit it
+    copy-on-write rather than each loading its own copy.
+
+    Args:
+        config: Configuration object
+        preload: Run preload_app() before returning; defaults to
+            config.PRELOAD_APP
+    """
+    from api.stock_routes import stock_bp
+    from api.backtest_routes import backtest_bp
+    from api.metrics_routes import metrics_bp
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    CORS(app)
+    app.register_blueprint(stock_bp)
+    app.register_blueprint(backtest_bp)
+    app.register_blueprint(metrics_bp)
+
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        return jsonify({'status': 'healthy', 'message': 'FINANZ API is running'})
+
+    if config.PRELOAD_APP if preload is None else preload:
+        preload_app(config.PRELOAD_SYMBOLS, config.PRELOAD_PERIOD)
+    return app
+
+
+def preload_app(symbols=(), period='1y'):
+    """
+    Load heavy libraries, price data and models ahead of forking workers
+
+    Price records for each symbol are fetched into the shared price cache.
+    A symbol's model is only loaded when it is served by NumPy: TensorFlow
+    starts threads that do not survive fork(), so Keras models are left to
+    load lazily in each worker. Finally gc.freeze() moves everything loaded
+    so far out of the collector's reach, so collections in the workers do
+    not write to (and thereby copy) the shared pages.
+
+    Args:
+        symbols: Stock symbols to preload
+        period: Price history period to fetch for each symbol
+
+    Returns:
+        Dict with the symbols whose prices and models were loaded
+    """
+    import pandas  # noqa: F401
+    from api.stock_routes import data_fetcher, load_prices, model_registry
+    from services.lazy import load
+    from services.model_registry import ModelNotFoundError
+
+    load(data_fetcher)
+    summary = {'prices': [], 'models': []}
+    for symbol in symbols:
+        try:
+            load_prices(symbol, period)
+            summary['prices'].append(symbol)
+        except Exception as e:
+            logger.warning("Could not preload prices for %s: %s", symbol, e)
+        try:
+            if model_registry.resolve(symbol).endswith(ARTIFACT_SUFFIX):
+                model_registry.get(symbol)
+                summary['models'].append(symbol)
+        except ModelNotFoundError:
+            pass
+    gc.collect()
+    gc.freeze()
+    return summary
+
+
+app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -10,6 +10,18 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     DEBUG = os.getenv('DEBUG', 'True') == 'True'
     
+    # Preloading before workers fork (see app.create_app)
+    PRELOAD_APP = os.getenv('PRELOAD_APP', 'False') == 'True'
+    PRELOAD_SYMBOLS = [s for s in os.getenv('PRELOAD_SYMBOLS', '').split(',') if s]
+    PRELOAD_PERIOD = os.getenv('PRELOAD_PERIOD', '1y')
+    
+    # Sampling profiler: off, request (X-Profile: 1 header or ?profile=1)
+    # or slow (every request sampled, kept when it takes PROFILER_SLOW_MS)
+    PROFILER_MODE = os.getenv('PROFILER_MODE', 'off')
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+    PROFILER_SLOW_MS = float(os.getenv('PROFILER_SLOW_MS', '1000'))
+    PROFILER_MAX_PROFILES = int(os.getenv('PROFILER_MAX_PROFILES', '20'))
+    
     # Database
     DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///finanz.db')
     
@@ -19,7 +31,69 @@ class Config:
     # Model settings
     MODEL_PATH = os.getenv('MODEL_PATH', '../models/saved_models/')
     DATA_PATH = os.getenv('DATA_PATH', '../data/')
+    MAX_WARM_MODELS = int(os.getenv('MAX_WARM_MODELS', '4'))
+    INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '64'))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '5'))
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'auto')
+    
+    # Market-data source: yahoo, synthetic, record (Yahoo, saving responses)
+    # or replay (saved responses, with simulated latency, errors and throttling)
+    DATA_SOURCE = os.getenv('DATA_SOURCE', 'yahoo')
+    DATA_RECORDINGS_PATH = os.getenv('DATA_RECORDINGS_PATH', os.path.join(DATA_PATH, 'recordings'))
+    MOCK_DATA_FALLBACK = os.getenv('MOCK_DATA_FALLBACK', 'True') == 'True'
+    REPLAY_LATENCY = os.getenv('REPLAY_LATENCY', '')
+    REPLAY_ERROR_RATE = float(os.getenv('REPLAY_ERROR_RATE', '0'))
+    REPLAY_MAX_RPS = float(os.getenv('REPLAY_MAX_RPS', '0'))
+    REPLAY_THROTTLE = os.getenv('REPLAY_THROTTLE', 'delay')
+    REPLAY_SEED = int(os.getenv('REPLAY_SEED')) if os.getenv('REPLAY_SEED') else None
+    
+    # Local OHLCV store
+    OHLCV_STORE_PATH = os.getenv('OHLCV_STORE_PATH', os.path.join(DATA_PATH, 'ohlcv'))
+    OHLCV_STORE_MAX_AGE = int(os.getenv('OHLCV_STORE_MAX_AGE', '3600'))
+    
+    # Bulk fetching
+    BULK_FETCH_WORKERS = int(os.getenv('BULK_FETCH_WORKERS', '8'))
+    BULK_FETCH_TIMEOUT = float(os.getenv('BULK_FETCH_TIMEOUT', '30'))
+    BULK_FETCH_RETRIES = int(os.getenv('BULK_FETCH_RETRIES', '2'))
+    BULK_FETCH_BACKOFF = float(os.getenv('BULK_FETCH_BACKOFF', '0.5'))
+    
+    # Price response cache
+    PRICE_CACHE_MAX_BYTES = int(os.getenv('PRICE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    # Seconds a price response is cached, per period, as 'period:seconds,...'
+    PRICE_CACHE_TTLS = {
+        period: int(seconds) for period, seconds in (
+            item.split(':') for item in os.getenv('PRICE_CACHE_TTLS', '1d:60,5d:300,1mo:900,3mo:1800').split(',')
+            if item
+        )
+    }
+    PRICE_CACHE_DEFAULT_TTL = int(os.getenv('PRICE_CACHE_DEFAULT_TTL', '3600'))
+    
+    # Compressed JSON responses
+    RESPONSE_GZIP_MIN_BYTES = int(os.getenv('RESPONSE_GZIP_MIN_BYTES', '1024'))
+    RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '5'))
+    RESPONSE_STREAM_MIN_BYTES = int(os.getenv('RESPONSE_STREAM_MIN_BYTES', str(1024 * 1024)))
+    RESPONSE_STREAM_CHUNK_BYTES = int(os.getenv('RESPONSE_STREAM_CHUNK_BYTES', str(256 * 1024)))
     
     # Trading settings
     INITIAL_CAPITAL = float(os.getenv('INITIAL_CAPITAL', '100000'))
     RISK_PER_TRADE = float(os.getenv('RISK_PER_TRADE', '0.02'))
+    PORTFOLIO_STOP_LOSS = float(os.getenv('PORTFOLIO_STOP_LOSS', '0.10'))
+    
+    # Backtest result cache
+    BACKTEST_CACHE_PATH = os.getenv('BACKTEST_CACHE_PATH', os.path.join(DATA_PATH, 'backtests'))
+    BACKTEST_CACHE_MAX_BYTES = int(os.getenv('BACKTEST_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    
+    # Background backtest jobs (0 workers = one per CPU)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '0'))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '64'))
+    JOB_MAX_FINISHED = int(os.getenv('JOB_MAX_FINISHED', '1000'))
+    
+    # Walk-forward ML backtests (0 workers = one per CPU)
+    WALK_FORWARD_BATCH_SIZE = int(os.getenv('WALK_FORWARD_BATCH_SIZE', '1024'))
+    WALK_FORWARD_TRAIN_WINDOW = int(os.getenv('WALK_FORWARD_TRAIN_WINDOW', '750'))
+    WALK_FORWARD_RETRAIN_EVERY = int(os.getenv('WALK_FORWARD_RETRAIN_EVERY', '250'))
+    WALK_FORWARD_EPOCHS = int(os.getenv('WALK_FORWARD_EPOCHS', '5'))
+    WALK_FORWARD_WORKERS = int(os.getenv('WALK_FORWARD_WORKERS', '0'))
+    
+    # Parameter sweeps (0 = one worker per CPU)
+    SWEEP_WORKERS = int(os.getenv('SWEEP_WORKERS', '0'))
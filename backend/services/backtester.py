@@ -1,32 +1,118 @@
 """
 Backtesting service for trading strategies
 """
+import os
+import time
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import pandas as pd
 import numpy as np
 from services.data_fetcher import DataFetcher
+from services.result_cache import data_fingerprint
+from services.indicators import SMA
+from services.metrics import metrics_table
+from services.telemetry import stage_timer
+from config import Config
+
+# Tunable parameters per strategy, for parameter sweeps
+SWEEP_PARAMETERS = {
+    'sma_crossover': ('short_window', 'long_window'),
+}
+
+# Parameters accepted by run_strategy
+STRATEGY_PARAMETERS = dict(SWEEP_PARAMETERS, ml_predictions=(
+    'threshold', 'retrain', 'train_window', 'retrain_every', 'epochs'
+))
+
+# Model inputs, in the order the CNN-LSTM is trained on (see services.predictor)
+ML_FEATURE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
 
 class Backtester:
-    def __init__(self, symbol, start_date, end_date, initial_capital=100000):
+    def __init__(self, symbol, start_date, end_date, initial_capital=100000, result_cache=None,
+                 predictor=None, model_registry=None):
+        """
+        Args:
+            symbol: Stock symbol
+            start_date, end_date: Backtest date range
+            initial_capital: Starting capital
+            result_cache: Optional BacktestResultCache
+            predictor: Model for ml_predictions; defaults to the symbol's
+                model from model_registry
+            model_registry: ModelRegistry to load models from, normally the
+                one shared with the prediction API; a private one is
+                created on first use when omitted
+        """
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
         self.initial_capital = initial_capital
         self.data_fetcher = DataFetcher()
+        self.result_cache = result_cache
+        self.predictor = predictor
+        self.model_registry = model_registry
         
-    def run_strategy(self, strategy_name):
+    def run_strategy(self, strategy_name, params=None, progress=None):
         """
         Run backtesting for a given strategy
         
+        With a result cache, a run whose strategy, parameters, capital and
+        input prices all match an earlier run returns that run's result.
+        
         Args:
             strategy_name: Name of the strategy to test
+            params: Optional strategy parameters (see STRATEGY_PARAMETERS)
+            progress: Optional callable(stage, fraction) invoked as the
+                run moves through its steps
         
         Returns:
             Dictionary with backtest results
         """
-        # Fetch historical data
-        data = self.data_fetcher.fetch_stock_data(self.symbol, period='max')
-        df = pd.DataFrame(data)
+        params = dict(params or {})
+        unknown = set(params) - set(STRATEGY_PARAMETERS.get(strategy_name, ()))
+        if unknown:
+            raise ValueError(f"Unknown parameters for {strategy_name}: {sorted(unknown)}")
+        progress = progress or (lambda stage, fraction: None)
         
+        # Fetch the requested range, plus the bars the strategy warms up on
+        progress('loading data', 0.05)
+        warmup = warmup_bars(strategy_name, params, getattr(self.predictor, 'sequence_length', 60))
+        df = self._load_data(warmup)
+        progress('running strategy', 0.5)
+        
+        cache_params = self._cache_params(strategy_name, params)
+        if self.result_cache is None or cache_params is None:
+            return self._run_on_data(df, strategy_name, params)
+        # Each date range (and warm-up) loads its own slice of the history
+        scope = None
+        if self.start_date is not None or self.end_date is not None:
+            scope = f'{self.start_date}_{self.end_date}_{warmup}'
+        return self.result_cache.get_or_compute(
+            self.symbol, strategy_name, cache_params, self.initial_capital, data_fingerprint(df),
+            lambda: self._run_on_data(df, strategy_name, params), scope=scope
+        )
+    
+    def _cache_params(self, strategy_name, params):
+        """
+        Parameters identifying a run for the result cache
+        
+        Model-driven runs also depend on the model artifact, so its path and
+        modification time are added; a run with an in-memory model that has
+        no artifact is not cached (None).
+        """
+        if strategy_name != 'ml_predictions' or params.get('retrain'):
+            return params
+        if self.predictor is not None:
+            path = getattr(self.predictor, 'model_path', None)
+        else:
+            path = self._registry().resolve(self.symbol)
+        if not path or not os.path.exists(path):
+            return None
+        return dict(params, model=os.path.abspath(path), model_mtime=os.path.getmtime(path))
+    
+    def _run_on_data(self, df, strategy_name, params):
+        """Run a strategy over already loaded prices and score it"""
         # Initialize portfolio
         portfolio = {
             'capital': self.initial_capital,
@@ -37,28 +123,157 @@ class Backtester:
         
         # Apply strategy (placeholder - implement specific strategies)
         if strategy_name == 'sma_crossover':
-            results = self._sma_crossover_strategy(df, portfolio)
+            with stage_timer('backtester', 'strategy.sma_crossover'):
+                results = self._sma_crossover_strategy(df, portfolio, **params)
         elif strategy_name == 'ml_predictions':
-            results = self._ml_prediction_strategy(df, portfolio)
+            with stage_timer('backtester', 'strategy.ml_predictions'):
+                results = self._ml_prediction_strategy(df, portfolio, **params)
         else:
-            results = self._buy_and_hold_strategy(df, portfolio)
+            with stage_timer('backtester', 'strategy.buy_and_hold'):
+                results = self._buy_and_hold_strategy(df, portfolio)
         
         # Calculate metrics
-        metrics = self._calculate_metrics(results)
+        with stage_timer('backtester', 'metrics'):
+            metrics = self._calculate_metrics(results)
         
-        return {
+        output = {
             'portfolio_value': results['portfolio_value'],
             'trades': results['trades'],
             'metrics': metrics
         }
+        if 'timings' in results:
+            output['timings'] = results['timings']
+        return output
     
-    def _sma_crossover_strategy(self, df, portfolio):
-        """Simple Moving Average Crossover Strategy"""
+    def run_sweep(self, param_grid, strategy_name='sma_crossover', rank_by='sharpe_ratio',
+                  max_workers=None):
+        """
+        Backtest every combination of strategy parameters
+        
+        The price series is loaded once and placed in shared memory; worker
+        processes attach to it read-only instead of receiving a pickled copy
+        per task. Combinations that need more history than is available are
+        skipped. Warm-up bars for the longest window are loaded ahead of
+        start_date, so every combination trades the same date range.
+        
+        Args:
+            param_grid: Dict mapping parameter name to a list of values,
+                e.g. {'short_window': [20, 50], 'long_window': [100, 200]}
+            strategy_name: Strategy to sweep (see SWEEP_PARAMETERS)
+            rank_by: Metric to rank by, best (highest) first
+            max_workers: Number of worker processes; 1 runs in-process
+        
+        Returns:
+            List of {'params': ..., 'metrics': ...} dicts, best first
+        """
+        if strategy_name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Strategy '{strategy_name}' has no sweepable parameters")
+        unknown = set(param_grid) - set(SWEEP_PARAMETERS[strategy_name])
+        if unknown:
+            raise ValueError(f"Unknown parameters for {strategy_name}: {sorted(unknown)}")
+        
+        names = sorted(param_grid)
+        combos = [dict(zip(names, values))
+                  for values in itertools.product(*(param_grid[name] for name in names))]
+        df = self._load_data(max((warmup_bars(strategy_name, params) for params in combos), default=0))
+        close = df['Close'].to_numpy(dtype=float)
+        first_bar = df.attrs.get('first_bar', 0)
+        combos = [params for params in combos if _valid_sweep_params(strategy_name, params, len(close))]
+        tasks = [(strategy_name, params, self.initial_capital, first_bar) for params in combos]
+        
+        max_workers = max_workers or Config.SWEEP_WORKERS or os.cpu_count()
+        if max_workers == 1 or len(tasks) <= 1:
+            runs = [_run_sweep_task(close, *task) for task in tasks]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+            try:
+                shared = np.ndarray(close.shape, dtype=close.dtype, buffer=shm.buf)
+                shared[:] = close
+                del shared
+                # Sweeps run inside threaded request handlers, possibly with
+                # TensorFlow loaded, so workers are spawned rather than forked;
+                # they attach to the prices by name, which keeps startup cheap
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)),
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_attach_sweep_prices,
+                                         initargs=(shm.name, close.shape)) as pool:
+                    chunksize = max(1, len(tasks) // (max_workers * 4))
+                    runs = list(pool.map(_run_shared_sweep_task, tasks, chunksize=chunksize))
+            finally:
+                shm.close()
+                shm.unlink()
+        
+        # Score every run in one vectorized pass; curves differ in length
+        # (each starts after its own warm-up), so shorter ones are NaN-padded
+        curves = np.full((len(runs), max((len(values) for _, values, _ in runs), default=0)), np.nan)
+        for i, (_, values, _) in enumerate(runs):
+            curves[i, :len(values)] = values
+        scores = metrics_table(curves, self.initial_capital, [trades for _, _, trades in runs])
+        rows = [{'params': params, 'metrics': metrics} for (params, _, _), metrics in zip(runs, scores)]
+        
+        def rank_key(row):
+            value = row['metrics'][rank_by]
+            return -np.inf if value is None or np.isnan(value) else value
+        return sorted(rows, key=rank_key, reverse=True)
+    
+    def _load_data(self, warmup=0):
+        """
+        Fetch the prices between start_date and end_date
+        
+        Up to warmup earlier bars are included for indicators to settle on;
+        their count is kept in df.attrs['first_bar'], and strategies only
+        trade from that row on.
+        
+        Args:
+            warmup: Bars needed before start_date
+        
+        Returns:
+            DataFrame of bars indexed by date
+        """
+        with stage_timer('backtester', 'fetch'):
+            data, first_bar = self.data_fetcher.fetch_window(self.symbol, self.start_date, self.end_date, warmup)
+        with stage_timer('backtester', 'dataframe'):
+            df = pd.DataFrame(data)
+            date_col = next((col for col in ('Date', 'Datetime') if col in df.columns), None)
+            if date_col is not None:
+                df = df.set_index(date_col)
+            if first_bar >= len(df):
+                raise ValueError(f"No {self.symbol} prices between {self.start_date} and {self.end_date}")
+            df.attrs['first_bar'] = first_bar
+            return df
+    
+    def _sma_crossover_strategy(self, df, portfolio, short_window=50, long_window=200):
+        """
+        Simple Moving Average Crossover Strategy (vectorized)
+        
+        Signals, position state, fills and the equity curve are derived
+        from whole columns; only the handful of fills is walked in Python.
+        Produces the same trades and portfolio values as
+        _sma_crossover_strategy_loop.
+        """
+        fast_col, slow_col = f'SMA_{short_window}', f'SMA_{long_window}'
+        df[fast_col] = SMA(short_window).initialize(df['Close'])
+        df[slow_col] = SMA(long_window).initialize(df['Close'])
+        
+        first = max(long_window, df.attrs.get('first_bar', 0))
+        close = df['Close'].to_numpy(dtype=float)[first:]
+        fast = df[fast_col].to_numpy(dtype=float)[first:]
+        slow = df[slow_col].to_numpy(dtype=float)[first:]
+        dates = [str(d) for d in df.index[first:]]
+        
+        return simulate_long_flat(close, fast > slow, fast < slow, dates, portfolio)
+    
+    def _sma_crossover_strategy_loop(self, df, portfolio):
+        """
+        Bar-by-bar reference implementation of the SMA crossover strategy.
+        
+        Kept for regression tests and benchmarks of the vectorized engine.
+        """
         df['SMA_50'] = df['Close'].rolling(window=50).mean()
         df['SMA_200'] = df['Close'].rolling(window=200).mean()
         
         # Trading logic
-        for i in range(200, len(df)):
+        for i in range(max(200, df.attrs.get('first_bar', 0)), len(df)):
             if df['SMA_50'].iloc[i] > df['SMA_200'].iloc[i] and portfolio['shares'] == 0:
                 # Buy signal
                 shares_to_buy = int(portfolio['capital'] / df['Close'].iloc[i])
@@ -95,6 +310,7 @@ class Backtester:
     
     def _buy_and_hold_strategy(self, df, portfolio):
         """Buy and Hold Strategy"""
+        df = df.iloc[df.attrs.get('first_bar', 0):]
         # Buy at start
         shares = int(portfolio['capital'] / df['Close'].iloc[0])
         portfolio['shares'] = shares
@@ -108,38 +324,235 @@ class Backtester:
         })
         
         # Track portfolio value
-        for i in range(len(df)):
-            portfolio_value = portfolio['capital'] + (portfolio['shares'] * df['Close'].iloc[i])
-            portfolio['portfolio_value'].append({
-                'date': str(df.index[i]),
-                'value': portfolio_value
-            })
+        values = portfolio['capital'] + shares * df['Close'].to_numpy(dtype=float)
+        portfolio['portfolio_value'].extend(
+            {'date': str(date), 'value': value}
+            for date, value in zip(df.index, values.tolist())
+        )
         
         return portfolio
     
-    def _ml_prediction_strategy(self, df, portfolio):
-        """ML-based prediction strategy (placeholder)"""
-        # This will use the CNN-LSTM model predictions
-        return self._buy_and_hold_strategy(df, portfolio)
+    def _ml_prediction_strategy(self, df, portfolio, threshold=0.0, retrain=False,
+                                train_window=None, retrain_every=None, epochs=None):
+        """
+        Walk-forward CNN-LSTM strategy
+        
+        Next-bar closes are predicted for the whole history up front, in
+        large batched forward passes: either with the symbol's trained model,
+        or (retrain=True) with models refit on rolling windows in parallel
+        worker processes. The position is long while the predicted return
+        exceeds threshold and flat once it falls below -threshold; trades
+        and the equity curve then come from simulate_long_flat. Time spent
+        predicting and simulating is reported under 'timings'.
+        
+        Args:
+            threshold: Minimum predicted next-bar return (as a fraction) to act on
+            retrain: Refit a model per walk-forward fold instead of using
+                the saved one
+            train_window, retrain_every, epochs: Walk-forward settings
+                (defaults from Config)
+        """
+        from services.walk_forward import predict_closes, walk_forward_predictions
+        if threshold < 0:
+            raise ValueError('threshold must be non-negative')
+        
+        features = df[ML_FEATURE_COLUMNS].to_numpy(dtype=float)
+        started = time.perf_counter()
+        if retrain:
+            predicted, folds = walk_forward_predictions(
+                features, train_window=train_window, retrain_every=retrain_every, epochs=epochs
+            )
+        else:
+            predictor = self.predictor or self._load_predictor()
+            predicted, folds = predict_closes(predictor, features), []
+        prediction_time = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        valid = np.flatnonzero(~np.isnan(predicted))
+        first = max(valid[0], df.attrs.get('first_bar', 0)) if len(valid) else len(df)
+        close = df['Close'].to_numpy(dtype=float)[first:]
+        expected_return = predicted[first:] / close - 1
+        dates = [str(d) for d in df.index[first:]]
+        simulate_long_flat(close, expected_return > threshold, expected_return < -threshold, dates, portfolio)
+        
+        portfolio['timings'] = {
+            'prediction_seconds': round(prediction_time, 4),
+            'simulation_seconds': round(time.perf_counter() - started, 4),
+            'bars_predicted': int(len(valid)),
+            'folds': len(folds),
+        }
+        return portfolio
+    
+    def _load_predictor(self):
+        """The symbol's trained model, as served by the prediction API"""
+        return self._registry().get(self.symbol)
+    
+    def _registry(self):
+        if self.model_registry is None:
+            from services.model_registry import ModelRegistry
+            self.model_registry = ModelRegistry()
+        return self.model_registry
     
     def _calculate_metrics(self, results):
         """Calculate performance metrics"""
         portfolio_values = [pv['value'] for pv in results['portfolio_value']]
+        return calculate_metrics(portfolio_values, self.initial_capital, len(results['trades']))
+
+
+def warmup_bars(strategy_name, params, sequence_length=60):
+    """
+    Bars a strategy needs before its first signal
+    
+    Args:
+        strategy_name: Strategy to run
+        params: Its parameters
+        sequence_length: Model input window, for ml_predictions
+    """
+    if strategy_name == 'sma_crossover':
+        return params.get('long_window', 200)
+    if strategy_name == 'ml_predictions':
+        if params.get('retrain'):
+            return params.get('train_window') or Config.WALK_FORWARD_TRAIN_WINDOW
+        return sequence_length - 1
+    return 0
+
+
+def calculate_metrics(portfolio_values, initial_capital, num_trades):
+    """
+    Calculate performance metrics for one equity curve
+    
+    Args:
+        portfolio_values: Sequence of portfolio values, one per bar
+        initial_capital: Starting capital
+        num_trades: Number of trades taken
+    
+    Returns:
+        Dictionary of metrics (see services.metrics.metrics_table)
+    """
+    return metrics_table(np.asarray(portfolio_values, dtype=float), initial_capital, num_trades)[0]
+
+
+# Parameter sweep workers. Each worker process attaches to the shared price
+# array once in its initializer and reuses the view for every task.
+_sweep_prices = {}
+
+
+def _valid_sweep_params(strategy_name, params, n_bars):
+    if strategy_name == 'sma_crossover':
+        short = params.get('short_window', 50)
+        long = params.get('long_window', 200)
+        return 0 < short < long < n_bars
+    return True
+
+
+def _attach_sweep_prices(name, shape):
+    shm = shared_memory.SharedMemory(name=name)
+    _sweep_prices['shm'] = shm
+    _sweep_prices['close'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _sweep_prices['close'].flags.writeable = False
+
+
+def _run_shared_sweep_task(task):
+    return _run_sweep_task(_sweep_prices['close'], *task)
+
+
+def _run_sweep_task(close, strategy_name, params, initial_capital, first_bar=0):
+    """Run one strategy/parameter combination; returns (params, equity curve, trades)"""
+    short = params.get('short_window', 50)
+    long = params.get('long_window', 200)
+    first = max(long, first_bar)
+    fast = SMA(short).initialize(close)[first:]
+    slow = SMA(long).initialize(close)[first:]
+    fills, values, _, _ = simulate_fills(close[first:], fast > slow, fast < slow, initial_capital)
+    return dict(params), values, len(fills)
+
+
+def simulate_long_flat(close, buy_signal, sell_signal, dates, portfolio):
+    """
+    Simulate an all-in long/flat strategy over whole price columns
+    
+    Mirrors the bar-by-bar rules used by the strategies: on a buy signal
+    while holding no shares, spend all capital on whole shares; on a sell
+    signal while holding, liquidate. Buy and sell signals are expected to
+    be mutually exclusive on any given bar.
+    
+    Args:
+        close: 1-D array of closing prices
+        buy_signal: Boolean array, True where the strategy wants to be long
+        sell_signal: Boolean array, True where the strategy wants to be flat
+        dates: Sequence of date labels, one per bar
+        portfolio: Portfolio dict with 'capital', 'shares', 'trades' and
+            'portfolio_value' keys; updated in place
+    
+    Returns:
+        The updated portfolio dict
+    """
+    fills, values, capital, shares = simulate_fills(close, buy_signal, sell_signal, portfolio['capital'])
+    
+    portfolio['trades'].extend(
+        {'date': dates[i], 'type': side, 'shares': qty, 'price': close[i]}
+        for i, side, qty in fills
+    )
+    portfolio['capital'] = capital
+    portfolio['shares'] = shares
+    portfolio['portfolio_value'].extend(
+        {'date': date, 'value': value} for date, value in zip(dates, values.tolist())
+    )
+    return portfolio
+
+
+def simulate_fills(close, buy_signal, sell_signal, initial_capital):
+    """
+    Array core of simulate_long_flat
+    
+    Returns:
+        Tuple of (fills, values, capital, shares): fills is a list of
+        (bar index, 'BUY'/'SELL', shares) tuples, values the per-bar
+        portfolio value array, and capital/shares the final position
+    """
+    n = len(close)
+    
+    # Regime: 1 from a buy signal until the next sell signal (forward-filled)
+    marks = np.full(n, -1, dtype=np.int8)
+    marks[sell_signal] = 0
+    marks[buy_signal] = 1
+    last_mark = np.maximum.accumulate(np.where(marks >= 0, np.arange(n), -1))
+    regime = np.where(last_mark >= 0, marks[np.maximum(last_mark, 0)], 0)
+    
+    edges = np.diff(regime, prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.append(np.flatnonzero(edges == -1), n)[:len(starts)]
+    
+    capital = initial_capital
+    fills = []
+    shares_held = np.zeros(n)
+    cash_idx, cash_val = [], []
+    
+    for start, end in zip(starts, ends):
+        # Buy attempts that cannot afford a single share still record a trade
+        attempts = np.flatnonzero(buy_signal[start:end]) + start
+        affordable = attempts[capital / close[attempts] >= 1]
+        first_fill = affordable[0] if len(affordable) else end
+        fills.extend((i, 'BUY', 0) for i in attempts[attempts < first_fill])
+        if first_fill == end:
+            continue
         
-        total_return = ((portfolio_values[-1] - self.initial_capital) / self.initial_capital) * 100
-        
-        returns = np.diff(portfolio_values) / portfolio_values[:-1]
-        sharpe_ratio = (np.mean(returns) / np.std(returns)) * np.sqrt(252) if len(returns) > 0 else 0
-        
-        cumulative_returns = (np.array(portfolio_values) - self.initial_capital) / self.initial_capital
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdown = (cumulative_returns - running_max)
-        max_drawdown = np.min(drawdown) * 100 if len(drawdown) > 0 else 0
+        shares = int(capital / close[first_fill])
+        capital -= shares * close[first_fill]
+        fills.append((first_fill, 'BUY', shares))
+        shares_held[first_fill:end] = shares
+        cash_idx.append(first_fill)
+        cash_val.append(capital)
         
-        return {
-            'total_return': round(total_return, 2),
-            'sharpe_ratio': round(sharpe_ratio, 2),
-            'max_drawdown': round(max_drawdown, 2),
-            'num_trades': len(results['trades']),
-            'final_value': round(portfolio_values[-1], 2)
-        }
+        if end < n:
+            capital += shares * close[end]
+            fills.append((end, 'SELL', shares))
+            cash_idx.append(end)
+            cash_val.append(capital)
+    
+    # Cash is piecewise constant between fills
+    cash_levels = np.array([initial_capital] + cash_val, dtype=float)
+    cash = cash_levels[np.searchsorted(np.array(cash_idx, dtype=int), np.arange(n), side='right')]
+    values = cash + shares_held * close
+    
+    return fills, values, capital, int(shares_held[-1]) if n else 0
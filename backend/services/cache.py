@@ -0,0 +1,142 @@
+"""
+In-process TTL/LRU cache with single-flight request coalescing
+"""
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """
+    Approximate the memory footprint of a cached value in bytes
+
+    Lists of records (as returned by DataFetcher.fetch_stock_data) are
+    estimated from their first element rather than walked in full.
+    """
+    if isinstance(value, (list, tuple)):
+        size = sys.getsizeof(value)
+        if value:
+            size += len(value) * estimate_size(value[0])
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    """A load in progress that concurrent callers can wait on"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Bounded cache with per-entry TTLs and LRU eviction by estimated size
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    the loader, the others block until it finishes and share its result
+    (or its exception). Failed loads are not cached.
+    """
+    def __init__(self, max_bytes, sizeof=estimate_size, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0,
+                          'evictions': 0, 'expirations': 0, 'load_errors': 0}
+
+    def get_or_load(self, key, loader, ttl):
+        """
+        Return the cached value for key, loading it on a miss
+
+        Args:
+            key: Hashable cache key
+            loader: Zero-argument callable producing the value
+            ttl: Seconds the loaded value stays fresh
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > self.clock():
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return entry[0]
+                self._remove(key)
+                self._counters['expirations'] += 1
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters['coalesced'] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self._counters['misses'] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._counters['load_errors'] += 1
+            raise
+        else:
+            self._put(key, flight.value, ttl)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def _put(self, key, value, ttl):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, self.clock() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters['evictions'] += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters and current occupancy, for sizing the cache"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses'] + self._counters['coalesced']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                in_flight=len(self._flights),
+                hit_rate=round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+            )
@@ -1,56 +1,125 @@
 """
-Stock data fetching service using Yahoo Finance API
+Stock data fetching service over a pluggable market-data source
 """
-import yfinance as yf
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from datetime import datetime, timedelta
-import numpy as np
+from config import Config
+from services.data_store import OHLCVStore
+from services.data_sources import default_data_source, period_start
+from services.synthetic import generate_ohlcv, INTRADAY_MINUTES
+from services.telemetry import stage_timer
 
-class DataFetcher:
-    def __init__(self):
-        self.cache = {}
+# Intervals served from the local store; intraday bars always go upstream
+STORE_INTERVALS = {'1d', '5d', '1wk', '1mo', '3mo'}
 
-    def _generate_mock_data(self, symbol, period='1mo'):
+class DataFetcher:
+    def __init__(self, store=None, max_age=None, source=None, mock_fallback=None):
+        """
+        Args:
+            store: OHLCVStore to read through; defaults to one under
+                Config.OHLCV_STORE_PATH. Pass False to always go upstream.
+            max_age: Seconds before a stored partition's tail is refreshed
+            source: DataSource bars and details come from; defaults to the
+                process-wide one selected by Config.DATA_SOURCE
+            mock_fallback: Serve synthetic bars when the source fails or
+                has nothing (default Config.MOCK_DATA_FALLBACK); when off,
+                fetch_stock_data() raises the source's error instead
+        """
+        if store is None:
+            store = OHLCVStore(Config.OHLCV_STORE_PATH)
+        self.store = store or None
+        self.max_age = Config.OHLCV_STORE_MAX_AGE if max_age is None else max_age
+        self.source = source or default_data_source()
+        self.mock_fallback = Config.MOCK_DATA_FALLBACK if mock_fallback is None else mock_fallback
 
-        period_map = {'1d': 1, '5d': 5, '1mo': 30, '3mo': 90, '6mo': 180, '1y': 365}
-        days = period_map.get(period, 30)
-        base_prices = {'RELIANCE.NS': 2800, 'TCS.NS': 3500, 'INFY.NS': 1500, 'HDFCBANK.NS': 1600, 'ITC.NS': 450}
-        base = base_prices.get(symbol, 1000)
+    @stage_timer('data_fetcher', 'mock_data')
+    def _generate_mock_data(self, symbol, period='1mo', interval='1d'):
+        """Deterministic synthetic records used when the data source is unavailable"""
+        return self._mock_records(generate_ohlcv(symbol, period, interval), interval)
     
-        np.random.seed(hash(symbol) % 2**32)
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        returns = np.random.normal(0.001, 0.02, days)
-        prices = base * np.exp(np.cumsum(returns))
+    @staticmethod
+    def _mock_records(df, interval):
+        df = df.reset_index()
+        date_col = df.columns[0]
+        date_format = '%Y-%m-%d %H:%M:%S' if interval in INTRADAY_MINUTES else '%Y-%m-%d'
+        df[date_col] = df[date_col].dt.strftime(date_format)
+        return df.to_dict('records')
     
-        data = []
-        for i, date in enumerate(dates):
-         close = prices[i]
-         data.append({
-            'Date': date.strftime('%Y-%m-%d'),
-            'Open': round(close * 0.99, 2),
-            'High': round(close * 1.02, 2),
-            'Low': round(close * 0.98, 2),
-            'Close': round(close, 2),
-            'Volume': int(np.random.uniform(1000000, 10000000))
-            })
-        return data
+    @staticmethod
+    def _records(df):
+        """yfinance-shaped bars as JSON-ready records"""
+        df = df.reset_index()
+        if 'Date' in df.columns:
+            df['Date'] = df['Date'].astype(str)
+        return df.to_dict('records')
     
     def fetch_stock_data(self, symbol, period='1y', interval='1d'):
         try:
-            stock = yf.Ticker(symbol)
-            df = stock.history(period=period, interval=interval)
+            df = self._load_history(symbol, interval, period=period)
         
             if df.empty:
-                return self._generate_mock_data(symbol, period)
-        
-            df = df.reset_index()
-            if 'Date' in df.columns:
-                df['Date'] = df['Date'].astype(str)
-            return df.to_dict('records')
-        except:
-            return self._generate_mock_data(symbol, period)
+                return self._generate_mock_data(symbol, period, interval) if self.mock_fallback else []
+        
+            with stage_timer('data_fetcher', 'to_records'):
+                return self._records(df)
+        except Exception:
+            if not self.mock_fallback:
+                raise
+            return self._generate_mock_data(symbol, period, interval)
     
-    def fetch_nse_bse_stocks(self, symbols_list, start_date, end_date):
+    def fetch_window(self, symbol, start=None, end=None, warmup=0, interval='1d'):
+        """
+        Records from start to end, preceded by up to warmup earlier bars
+        
+        Only the window and a lookback margin covering the warm-up bars are
+        loaded, so the cost follows the requested range rather than the
+        whole listing history.
+        
+        Args:
+            symbol: Stock symbol
+            start: First date wanted (inclusive); None for the full history
+            end: Last date wanted (inclusive); None for the latest bar
+            warmup: Bars needed before start, e.g. for indicator warm-up
+            interval: Bar interval
+        
+        Returns:
+            (records, n_warmup): records shaped as fetch_stock_data()
+            returns them, of which the first n_warmup fall before start
+        """
+        start_ts = None if start is None else pd.Timestamp(start)
+        end_ts = None if end is None else pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        try:
+            if start_ts is None and end_ts is None:
+                df = self._load_history(symbol, interval, period='max')
+            else:
+                # Calendar days spanning the warm-up bars, allowing for weekends and holidays
+                lookback = None if start_ts is None else start_ts - pd.Timedelta(days=warmup * 3 // 2 + 14)
+                df = self._load_history(symbol, interval,
+                                        start=None if lookback is None else lookback.strftime('%Y-%m-%d'),
+                                        end=None if end_ts is None else end_ts.strftime('%Y-%m-%d'))
+        except Exception:
+            if not self.mock_fallback:
+                raise
+            df = None
+        if df is not None and df.empty and not self.mock_fallback:
+            return [], 0
+        mock = df is None or df.empty
+        if mock:
+            df = generate_ohlcv(symbol, 'max', interval)
+        
+        if end_ts is not None:
+            df = df[df.index < self._timestamp(end_ts, df.index.tz)]
+        first = 0 if start_ts is None else int(df.index.searchsorted(self._timestamp(start_ts, df.index.tz)))
+        lead = max(0, first - warmup)
+        df = df.iloc[lead:]
+        with stage_timer('data_fetcher', 'to_records'):
+            records = self._mock_records(df, interval) if mock else self._records(df)
+        return records, first - lead
+    
+    def fetch_nse_bse_stocks(self, symbols_list, start_date, end_date, max_workers=None):
         """
         Fetch data for multiple NSE/BSE stocks
         
@@ -58,24 +127,184 @@ class DataFetcher:
             symbols_list: List of stock symbols
             start_date: Start date for data
             end_date: End date for data
+            max_workers: Number of symbols fetched concurrently
         
         Returns:
             Dictionary of DataFrames for each symbol
         """
-        data = {}
-        for symbol in symbols_list:
+        result = self.fetch_bulk(symbols_list, start_date, end_date, max_workers=max_workers)
+        for symbol in result['failed']:
+            print(f"Error fetching {symbol}: {result['results'][symbol]['error']}")
+        return {symbol: result['results'][symbol]['data'] for symbol in result['succeeded']}
+    
+    def fetch_bulk(self, symbols_list, start_date=None, end_date=None, interval='1d',
+                   max_workers=None, timeout=None, retries=None, backoff=None):
+        """
+        Fetch many symbols with bounded concurrency, timeouts and retries
+        
+        Each symbol is attempted up to retries + 1 times, waiting
+        backoff * 2**n seconds between attempts. An attempt that exceeds
+        timeout is abandoned and counts as a failure; its thread is left to
+        finish in the background.
+        
+        Args:
+            symbols_list: List of stock symbols
+            start_date: Start date for data
+            end_date: End date for data
+            interval: Bar interval
+            max_workers: Number of symbols fetched concurrently
+            timeout: Seconds allowed per attempt
+            retries: Extra attempts after a failure
+            backoff: Base delay in seconds between attempts
+        
+        Returns:
+            Dictionary with per-symbol 'results' ({'success', 'data', 'error',
+            'attempts', 'elapsed'}), 'succeeded' and 'failed' symbol lists
+            and total 'elapsed' seconds
+        """
+        max_workers = max_workers or Config.BULK_FETCH_WORKERS
+        timeout = Config.BULK_FETCH_TIMEOUT if timeout is None else timeout
+        retries = Config.BULK_FETCH_RETRIES if retries is None else retries
+        backoff = Config.BULK_FETCH_BACKOFF if backoff is None else backoff
+        
+        def fetch_one(symbol):
+            started = time.perf_counter()
+            error = None
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(backoff * 2 ** (attempt - 1))
+                try:
+                    df = self._call_with_timeout(
+                        lambda: self._load_history(symbol, interval, start=start_date, end=end_date),
+                        timeout
+                    )
+                except Exception as e:
+                    error = f"{type(e).__name__}: {str(e)}"
+                    continue
+                if df is None or df.empty:
+                    # Unknown or delisted symbols come back empty; retrying will not help
+                    error = 'No data returned'
+                    break
+                return {'success': True, 'data': df, 'error': None,
+                        'attempts': attempt + 1, 'elapsed': time.perf_counter() - started}
+            return {'success': False, 'data': None, 'error': error,
+                    'attempts': attempt + 1, 'elapsed': time.perf_counter() - started}
+        
+        started = time.perf_counter()
+        symbols = list(dict.fromkeys(symbols_list))
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols) or 1))) as pool:
+            results = dict(zip(symbols, pool.map(fetch_one, symbols)))
+        
+        return {
+            'results': results,
+            'succeeded': [s for s in symbols if results[s]['success']],
+            'failed': [s for s in symbols if not results[s]['success']],
+            'elapsed': time.perf_counter() - started
+        }
+    
+    @staticmethod
+    def _call_with_timeout(fn, timeout):
+        """Run fn on a helper thread, raising TimeoutError if it overruns"""
+        if not timeout:
+            return fn()
+        outcome = {}
+        def run():
             try:
-                stock = yf.Ticker(symbol)
-                df = stock.history(start=start_date, end=end_date)
-                data[symbol] = df
+                outcome['value'] = fn()
             except Exception as e:
-                print(f"Error fetching {symbol}: {str(e)}")
-        return data
+                outcome['error'] = e
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"timed out after {timeout}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['value']
+    
+    @stage_timer('data_fetcher', 'download')
+    def _download(self, symbol, interval, **kwargs):
+        """Fetch bars from the data source"""
+        return self.source.history(symbol, interval, **kwargs)
+    
+    def _load_history(self, symbol, interval, period=None, start=None, end=None):
+        """
+        Load bars through the local store, fetching only what is missing
+        
+        A partition is downloaded in full the first time a symbol/interval
+        (or an earlier start than stored) is requested. After that only the
+        bars since the last stored date are fetched, once the partition is
+        older than max_age, and appended.
+        
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval
+            period: yfinance period string ('1mo', '5y', 'max', ...)
+            start, end: Date bounds, used when period is not given
+        
+        Returns:
+            DataFrame shaped like yf.Ticker.history()
+        """
+        if self.store is None or interval not in STORE_INTERVALS:
+            if period is not None:
+                return self._download(symbol, interval, period=period)
+            return self._download(symbol, interval, start=start, end=end)
+        
+        meta = self.store.meta(symbol, interval)
+        since = self._since(period, start, meta['tz'] if meta else 'UTC')
+        
+        if not self.store.covers(meta, since):
+            if since is None:
+                df = self._download(symbol, interval, period='max')
+            else:
+                df = self._download(symbol, interval, start=self._day(since, 'UTC'))
+            if df.empty:
+                return df
+            if df.index.tz is not None:
+                since = self._since(period, start, str(df.index.tz))
+            self.store.write(symbol, interval, df, covered_from=since)
+        elif self.store.is_stale(meta, self.max_age):
+            try:
+                tail = self._download(symbol, interval, start=self._day(meta['last_ns'], meta['tz']))
+                self.store.append(symbol, interval, tail)
+            except Exception as e:
+                print(f"Error refreshing {symbol}, serving stored bars: {str(e)}")
+        
+        tz = self.store.meta(symbol, interval)['tz']
+        end_ts = self._timestamp(end, tz)
+        with stage_timer('data_fetcher', 'store_read'):
+            df = self.store.read(symbol, interval, start_ns=since,
+                                 end_ns=None if end_ts is None else end_ts.value)
+        # Trading-day periods ('5d') count bars; 'ytd' was bounded by since
+        if period is not None and re.fullmatch(r'\d+d', period):
+            df = df.iloc[-int(period[:-1]):]
+        return df
+    
+    def _since(self, period, start, tz):
+        """UTC epoch ns a request reaches back to (None for the full history)"""
+        since = self._period_start(period, tz) if period is not None else self._timestamp(start, tz)
+        return None if since is None else since.value
+    
+    @staticmethod
+    def _day(ns, tz):
+        return pd.Timestamp(ns, unit='ns', tz='UTC').tz_convert(tz).strftime('%Y-%m-%d')
+    
+    @staticmethod
+    def _timestamp(value, tz):
+        """Interpret a date bound in the exchange timezone"""
+        if value is None:
+            return None
+        ts = pd.Timestamp(value)
+        return ts.tz_localize(tz) if ts.tz is None else ts
+    
+    @staticmethod
+    def _period_start(period, tz):
+        """Earliest timestamp a yfinance period string reaches back to (None for 'max')"""
+        return period_start(period, pd.Timestamp.now(tz=tz))
     
     def get_stock_info(self, symbol):
         """Get detailed stock information"""
         try:
-            stock = yf.Ticker(symbol)
-            return stock.info
+            return self.source.info(symbol)
         except Exception as e:
             raise Exception(f"Error fetching info for {symbol}: {str(e)}")
@@ -0,0 +1,318 @@
+"""
+Pluggable market-data sources behind the data fetcher
+"""
+import os
+import re
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+from config import Config
+from services.data_store import OHLCVStore
+from services.synthetic import generate_ohlcv
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6), '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+DATA_SOURCES = ('yahoo', 'synthetic', 'record', 'replay')
+
+
+class RecordingNotFoundError(LookupError):
+    pass
+
+
+class InjectedError(ConnectionError):
+    """Upstream failure simulated by a ReplaySource"""
+
+
+class ThrottledError(ConnectionError):
+    """Request rejected by a ReplaySource's rate limit"""
+
+
+def period_start(period, now):
+    """
+    Earliest timestamp a yfinance period string reaches back to
+
+    Args:
+        period: '1mo', '5y', '5d', 'ytd', 'max', ...
+        now: tz-aware Timestamp the period ends at
+
+    Returns:
+        Timestamp, or None for 'max'
+    """
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    if period.endswith('d'):
+        # Trading-day periods; allow for weekends and holidays
+        return now.normalize() - pd.Timedelta(days=int(period[:-1]) * 2 + 7)
+    return now.normalize() - PERIOD_OFFSETS.get(period, pd.DateOffset(years=1))
+
+
+class DataSource:
+    """
+    Upstream provider of OHLCV bars and symbol details
+
+    history() returns a DataFrame shaped like yf.Ticker.history(): bars
+    indexed by a tz-aware DatetimeIndex, empty for unknown symbols.
+    Failures are raised, never papered over; DataFetcher decides what to
+    do with them.
+    """
+    def history(self, symbol, interval, period=None, start=None, end=None):
+        raise NotImplementedError
+
+    def info(self, symbol):
+        raise NotImplementedError
+
+
+class YahooSource(DataSource):
+    """Yahoo Finance, through yfinance"""
+    def history(self, symbol, interval, period=None, start=None, end=None):
+        # Imported on first use, so that other sources never load yfinance
+        import yfinance as yf
+        if period is not None:
+            return yf.Ticker(symbol).history(interval=interval, period=period)
+        return yf.Ticker(symbol).history(interval=interval, start=start, end=end)
+
+    def info(self, symbol):
+        import yfinance as yf
+        return yf.Ticker(symbol).info
+
+
+class SyntheticSource(DataSource):
+    """Deterministic generated bars (see services.synthetic)"""
+    def history(self, symbol, interval, period=None, start=None, end=None):
+        df = generate_ohlcv(symbol, period or 'max', interval)
+        return _slice(df, start, end)
+
+    def info(self, symbol):
+        return {'symbol': symbol, 'shortName': symbol, 'currency': 'INR'}
+
+
+class RecordingSource(DataSource):
+    """
+    Passes requests through to another source and records the responses
+
+    Bars are merged into an OHLCVStore under directory, one partition per
+    symbol and interval, and symbol details are saved as JSON, in the
+    layout ReplaySource serves them from.
+    """
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        self.store = OHLCVStore(directory)
+        self._lock = threading.Lock()
+
+    def history(self, symbol, interval, period=None, start=None, end=None):
+        df = self.source.history(symbol, interval, period=period, start=start, end=end)
+        if not df.empty:
+            with self._lock:
+                stored = self.store.read(symbol, interval)
+                merged = df
+                if stored is not None and not stored.empty:
+                    merged = pd.concat([stored, df.tz_convert(stored.index.tz)])
+                    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                self.store.write(symbol, interval, merged)
+        return df
+
+    def info(self, symbol):
+        info = self.source.info(symbol)
+        os.makedirs(os.path.join(self.directory, 'info'), exist_ok=True)
+        with open(_info_path(self.directory, symbol), 'w') as f:
+            json.dump(info, f, default=str)
+        return info
+
+
+class ReplaySource(DataSource):
+    """
+    Serves recorded responses locally, with simulated network behaviour
+
+    Recordings are frozen in time, so a period is measured back from the
+    last recorded bar rather than from today. Each request first passes
+    a token-bucket rate limit (max_rps; excess requests wait, or with
+    throttle='reject' fail with ThrottledError), then sleeps for a delay
+    drawn from the latency distribution, then fails with InjectedError
+    with probability error_rate.
+    """
+    def __init__(self, directory, latency=None, error_rate=0.0, max_rps=None, throttle='delay', seed=None):
+        """
+        Args:
+            directory: Recordings written by RecordingSource
+            latency: Delay spec (see latency_distribution)
+            error_rate: Fraction of requests that fail
+            max_rps: Sustained requests per second; None or 0 is unlimited
+            throttle: 'delay' to queue requests over the limit, 'reject' to fail them
+            seed: Seed for latency and error draws, for repeatable runs
+        """
+        if throttle not in ('delay', 'reject'):
+            raise ValueError(f"Unknown throttle mode '{throttle}', expected 'delay' or 'reject'")
+        self.directory = directory
+        self.store = OHLCVStore(directory)
+        self.latency = latency_distribution(latency)
+        self.error_rate = error_rate
+        self.throttle = throttle
+        self.max_rps = max_rps or None
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        # Token bucket allowing bursts of up to one second's worth of requests
+        self._tokens = float(max(1, max_rps or 1))
+        self._refilled = time.monotonic()
+        self._counters = {'requests': 0, 'errors': 0, 'throttled': 0, 'delay_seconds': 0.0}
+
+    def history(self, symbol, interval, period=None, start=None, end=None):
+        self._simulate()
+        df = self.store.read(symbol, interval)
+        if df is None:
+            raise RecordingNotFoundError(f"No recording of {symbol} ({interval}) in {self.directory}")
+        if period is not None:
+            since = period_start(period, df.index[-1]) if len(df) else None
+            df = df if since is None else df[df.index >= since]
+            return df.iloc[-int(period[:-1]):] if re.fullmatch(r'\d+d', period) else df
+        return _slice(df, start, end)
+
+    def info(self, symbol):
+        self._simulate()
+        try:
+            with open(_info_path(self.directory, symbol)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RecordingNotFoundError(f"No recorded info for {symbol} in {self.directory}")
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def _simulate(self):
+        with self._lock:
+            self._counters['requests'] += 1
+            wait = self._take_token()
+            delay = self.latency(self._rng)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if wait is None:
+                self._counters['throttled'] += 1
+            else:
+                self._counters['delay_seconds'] += wait + delay
+            if fail:
+                self._counters['errors'] += 1
+        if wait is None:
+            raise ThrottledError(f"Rate limit of {self.max_rps} requests/s exceeded")
+        if wait + delay > 0:
+            time.sleep(wait + delay)
+        if fail:
+            raise InjectedError('Injected upstream failure')
+
+    def _take_token(self):
+        """Seconds to wait for a token (reserving it), or None when rejected"""
+        if self.max_rps is None:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(max(1.0, self.max_rps), self._tokens + (now - self._refilled) * self.max_rps)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        if self.throttle == 'reject':
+            return None
+        self._tokens -= 1
+        return -self._tokens / self.max_rps
+
+
+def latency_distribution(spec):
+    """
+    Parse a latency spec into a callable drawing delays in seconds
+
+    Specs (all in seconds):
+        '' / None / '0'          no delay
+        '0.05' / 'fixed:0.05'    constant
+        'uniform:LOW,HIGH'       uniform between LOW and HIGH
+        'normal:MEAN,STD'        normal, clipped at zero
+        'lognormal:MEDIAN,SIGMA' log-normal with the given median
+        'pareto:MIN,ALPHA'       heavy-tailed, at least MIN
+
+    Returns:
+        Callable(rng) -> float
+    """
+    if spec is None or (isinstance(spec, str) and not spec.strip()):
+        return lambda rng: 0.0
+    if isinstance(spec, (int, float)):
+        spec = f'fixed:{spec}'
+    kind, _, args = spec.partition(':') if ':' in spec else ('fixed', ':', spec)
+    try:
+        values = [float(value) for value in args.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec '{spec}'")
+    shapes = {
+        'fixed': (1, lambda rng, s: s),
+        'uniform': (2, lambda rng, low, high: rng.uniform(low, high)),
+        'normal': (2, lambda rng, mean, std: max(0.0, rng.normal(mean, std))),
+        'lognormal': (2, lambda rng, median, sigma: median * np.exp(sigma * rng.standard_normal())),
+        'pareto': (2, lambda rng, low, alpha: low * (1 + rng.pareto(alpha))),
+    }
+    if kind not in shapes or len(values) != shapes[kind][0]:
+        raise ValueError(f"Invalid latency spec '{spec}'")
+    draw = shapes[kind][1]
+    return lambda rng: float(draw(rng, *values))
+
+
+def create_data_source(kind=None):
+    """
+    Build the data source named by kind (default Config.DATA_SOURCE)
+
+    'record' wraps Yahoo Finance in a RecordingSource and 'replay' serves
+    those recordings, both under Config.DATA_RECORDINGS_PATH; replay
+    behaviour comes from the REPLAY_* settings.
+    """
+    kind = kind or Config.DATA_SOURCE
+    if kind == 'yahoo':
+        return YahooSource()
+    if kind == 'synthetic':
+        return SyntheticSource()
+    if kind == 'record':
+        return RecordingSource(YahooSource(), Config.DATA_RECORDINGS_PATH)
+    if kind == 'replay':
+        return ReplaySource(Config.DATA_RECORDINGS_PATH, latency=Config.REPLAY_LATENCY,
+                            error_rate=Config.REPLAY_ERROR_RATE, max_rps=Config.REPLAY_MAX_RPS,
+                            throttle=Config.REPLAY_THROTTLE, seed=Config.REPLAY_SEED)
+    raise ValueError(f"Unknown data source '{kind}', expected one of {list(DATA_SOURCES)}")
+
+
+_default_source = None
+_default_lock = threading.Lock()
+
+
+def default_data_source():
+    """
+    The process-wide source from Config
+
+    Shared by every DataFetcher, so a replay rate limit applies to the
+    whole process rather than to each backtest's fetcher.
+    """
+    global _default_source
+    with _default_lock:
+        if _default_source is None:
+            _default_source = create_data_source()
+        return _default_source
+
+
+def _slice(df, start, end):
+    tz = df.index.tz
+    if start is not None:
+        df = df[df.index >= _localize(start, tz)]
+    if end is not None:
+        df = df[df.index < _localize(end, tz)]
+    return df
+
+
+def _localize(value, tz):
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(tz) if ts.tz is None else ts
+
+
+def _info_path(directory, symbol):
+    return os.path.join(directory, 'info', re.sub(r'[^A-Za-z0-9._^-]', '_', symbol) + '.json')
@@ -0,0 +1,164 @@
+"""
+Persistent columnar OHLCV store backing the data fetcher
+"""
+import os
+import re
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+
+class OHLCVStore:
+    """
+    On-disk, append-only columnar store for OHLCV bars.
+
+    Each symbol/interval pair is a partition directory holding one raw
+    binary file per column plus a ``timestamps.i8`` file of UTC epoch
+    nanoseconds. Files are memory-mapped on read, so slicing a window out
+    of a long history only touches the pages it needs. ``meta.json`` holds
+    the committed row count; bytes past it (from an interrupted append)
+    are ignored and truncated on the next write.
+    """
+    TIMESTAMP_FILE = 'timestamps.i8'
+    META_FILE = 'meta.json'
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.RLock()
+
+    def _partition(self, symbol, interval):
+        safe_symbol = re.sub(r'[^A-Za-z0-9._^-]', '_', symbol)
+        return os.path.join(self.root, interval, safe_symbol)
+
+    @staticmethod
+    def _column_file(column):
+        return re.sub(r'[^A-Za-z0-9]', '_', column) + '.bin'
+
+    def meta(self, symbol, interval):
+        """Return the partition metadata, or None if nothing is stored"""
+        path = os.path.join(self._partition(symbol, interval), self.META_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def covers(self, meta, since_ns):
+        """Whether the stored history reaches back to ``since_ns``"""
+        if meta is None or meta['rows'] == 0:
+            return False
+        if meta['full_history']:
+            return True
+        return since_ns is not None and meta['covered_from'] <= since_ns
+
+    def is_stale(self, meta, max_age):
+        """Whether the tail was last refreshed more than ``max_age`` seconds ago"""
+        return time.time() - meta['updated_at'] > max_age
+
+    def write(self, symbol, interval, df, covered_from=None):
+        """
+        Replace a partition with ``df``
+
+        Args:
+            symbol: Stock symbol
+            interval: Bar interval
+            df: Bars indexed by a tz-aware DatetimeIndex, as returned by yfinance
+            covered_from: UTC epoch ns the download was requested from, or
+                None if it is the full listing history
+        """
+        with self._lock:
+            partition = self._partition(symbol, interval)
+            os.makedirs(partition, exist_ok=True)
+            for name in os.listdir(partition):
+                os.remove(os.path.join(partition, name))
+            meta = {
+                'symbol': symbol,
+                'interval': interval,
+                'index_name': df.index.name or 'Date',
+                'tz': str(df.index.tz) if df.index.tz is not None else 'UTC',
+                'columns': list(df.columns),
+                'dtypes': [str(dtype) for dtype in df.dtypes],
+                'full_history': covered_from is None,
+                'covered_from': covered_from,
+                'rows': 0,
+                'last_ns': None,
+                'updated_at': time.time(),
+            }
+            self._append_rows(partition, meta, df)
+
+    def append(self, symbol, interval, df):
+        """
+        Append newer bars to a partition
+
+        Stored rows at or after the first timestamp of ``df`` are replaced,
+        so re-fetching the latest (possibly still forming) bar is safe.
+        """
+        with self._lock:
+            meta = self.meta(symbol, interval)
+            partition = self._partition(symbol, interval)
+            if not df.empty:
+                stamps = self._read_column(partition, self.TIMESTAMP_FILE, np.int64, meta['rows'])
+                meta['rows'] = int(np.searchsorted(stamps, self._to_ns(df.index)[0], side='left'))
+                df = df.reindex(columns=meta['columns'], fill_value=0)
+            meta['updated_at'] = time.time()
+            self._append_rows(partition, meta, df)
+
+    def read(self, symbol, interval, start_ns=None, end_ns=None):
+        """
+        Read stored bars in ``[start_ns, end_ns)`` as a yfinance-shaped DataFrame
+
+        Returns:
+            DataFrame indexed by a tz-aware DatetimeIndex, or None if nothing is stored
+        """
+        with self._lock:
+            meta = self.meta(symbol, interval)
+            if meta is None:
+                return None
+            partition = self._partition(symbol, interval)
+            stamps = self._read_column(partition, self.TIMESTAMP_FILE, np.int64, meta['rows'])
+            lo = 0 if start_ns is None else int(np.searchsorted(stamps, start_ns, side='left'))
+            hi = len(stamps) if end_ns is None else int(np.searchsorted(stamps, end_ns, side='left'))
+
+            index = pd.DatetimeIndex(pd.to_datetime(np.array(stamps[lo:hi]), unit='ns', utc=True))
+            index = index.tz_convert(meta['tz']).rename(meta['index_name'])
+            columns = {}
+            for column, dtype in zip(meta['columns'], meta['dtypes']):
+                values = self._read_column(partition, self._column_file(column), dtype, meta['rows'])
+                columns[column] = np.array(values[lo:hi])
+            return pd.DataFrame(columns, index=index)
+
+    def _append_rows(self, partition, meta, df):
+        rows = meta['rows']
+        files = [(self.TIMESTAMP_FILE, np.int64, self._to_ns(df.index))]
+        for column, dtype in zip(meta['columns'], meta['dtypes']):
+            files.append((self._column_file(column), dtype, df[column].to_numpy()))
+
+        for name, dtype, values in files:
+            itemsize = np.dtype(dtype).itemsize
+            with open(os.path.join(partition, name), 'ab') as f:
+                f.truncate(rows * itemsize)
+                np.ascontiguousarray(values, dtype=dtype).tofile(f)
+
+        # Committing the row count last makes a partial append invisible
+        meta['rows'] = rows + len(df)
+        if len(df):
+            meta['last_ns'] = int(self._to_ns(df.index)[-1])
+        tmp_path = os.path.join(partition, self.META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(partition, self.META_FILE))
+
+    @staticmethod
+    def _read_column(partition, name, dtype, rows):
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(partition, name), dtype=dtype, mode='r', shape=(rows,))
+
+    @staticmethod
+    def _to_ns(index):
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        return index.tz_convert('UTC').as_unit('ns').asi8
@@ -0,0 +1,121 @@
+"""
+Columnar payloads and fast, compressed JSON responses
+"""
+import json
+import zlib
+import numpy as np
+from flask import Response
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RESPONSE_FORMATS = ('records', 'columnar')
+
+_DAY_NS = 86_400 * 10**9
+
+
+def dates_to_epoch(values):
+    """
+    Encode date labels as integers
+
+    Labels are taken in their local wall-clock time: UTC offsets are
+    dropped, so a series whose offset changes across a DST switch still
+    encodes each bar's exchange date.
+
+    Returns:
+        Tuple of (list of ints, unit): whole days since 1970-01-01 when
+        every label falls on midnight, otherwise seconds. Labels that are
+        not dates are returned unchanged with unit None.
+    """
+    import pandas as pd
+    local = pd.Series(values, dtype=object).astype(str).str.replace(r'(?:Z|[+-]\d{2}:\d{2})$', '', regex=True)
+    parsed = pd.to_datetime(local, format='ISO8601', errors='coerce')
+    if len(values) == 0 or parsed.isna().any():
+        return list(values), None
+    ns = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    if (ns % _DAY_NS == 0).all():
+        return (ns // _DAY_NS).tolist(), 'day'
+    return (ns // 10**9).tolist(), 's'
+
+
+def records_to_columns(records, date_field):
+    """
+    Turn a list of row dicts into parallel arrays, one per field
+
+    Args:
+        records: List of dicts sharing the same keys
+        date_field: Key holding the date label, encoded by dates_to_epoch()
+
+    Returns:
+        Dict with one list per field plus 'date_unit'
+    """
+    import pandas as pd
+    frame = pd.DataFrame.from_records(records)
+    columns = {}
+    for name in frame.columns:
+        if name == date_field:
+            columns[name], columns['date_unit'] = dates_to_epoch(frame[name].tolist())
+        else:
+            columns[name] = frame[name].to_numpy().tolist()
+    if date_field not in columns:
+        columns['date_unit'] = None
+    return columns
+
+
+def backtest_to_columns(results):
+    """Columnar form of a Backtester.run_strategy() result"""
+    return {
+        'portfolio_value': records_to_columns(results['portfolio_value'], 'date'),
+        'trades': records_to_columns(results['trades'], 'date'),
+        'metrics': results['metrics'],
+    }
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(',', ':'), default=_default).encode()
+
+
+def _gzip_chunks(body, chunk_size):
+    compressor = zlib.compressobj(Config.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for start in range(0, len(body), chunk_size):
+        chunk = compressor.compress(body[start:start + chunk_size])
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def json_response(payload, request, status=200):
+    """
+    Build a JSON response, gzip-compressed when the client accepts it
+
+    Bodies above RESPONSE_GZIP_MIN_BYTES are compressed for clients that
+    send Accept-Encoding: gzip; bodies above RESPONSE_STREAM_MIN_BYTES are
+    compressed and written in chunks instead of in one piece.
+    """
+    body = dumps(payload)
+    accepts_gzip = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+    if not accepts_gzip or len(body) < Config.RESPONSE_GZIP_MIN_BYTES:
+        return Response(body, status=status, mimetype='application/json')
+
+    chunk_size = Config.RESPONSE_STREAM_CHUNK_BYTES
+    if len(body) >= Config.RESPONSE_STREAM_MIN_BYTES:
+        response = Response(_gzip_chunks(body, chunk_size), status=status, mimetype='application/json')
+    else:
+        response = Response(b''.join(_gzip_chunks(body, len(body))), status=status, mimetype='application/json')
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,208 @@
+"""
+Stateful technical indicators: bulk initialization plus O(1) per-bar updates
+"""
+import math
+import numpy as np
+import pandas as pd
+
+
+class Indicator:
+    """
+    Base class for streaming indicators
+
+    initialize() computes the indicator over a whole history (vectorized,
+    matching the pandas formulas used elsewhere in the repo) and leaves the
+    object ready for update(), which consumes one new bar in constant time.
+    Subclasses implement _initialize() and update().
+    """
+    def __init__(self):
+        self.value = np.nan
+        self.count = 0
+
+    def initialize(self, values):
+        """
+        Compute the indicator over a history and keep the state needed to extend it
+
+        Args:
+            values: 1-D sequence of prices, oldest first
+
+        Returns:
+            Array of indicator values, one per input value (NaN while warming up)
+        """
+        values = np.asarray(values, dtype=float)
+        result = self._initialize(values)
+        self.count = len(values)
+        self.value = result[-1] if len(result) else np.nan
+        return result
+
+    def _initialize(self, values):
+        raise NotImplementedError
+
+    def update(self, value):
+        """Consume the next price and return the new indicator value"""
+        raise NotImplementedError
+
+
+class _RollingSum:
+    """Sum over the last `window` values with O(1) add"""
+    def __init__(self, window):
+        self.window = window
+        self.buffer = np.zeros(window)
+        self.pos = 0
+        self.filled = 0
+        self.total = 0.0
+        self.since_resync = 0
+
+    def load(self, values):
+        tail = np.asarray(values[-self.window:], dtype=float)
+        self.buffer[:] = 0.0
+        self.buffer[:len(tail)] = tail
+        self.filled = len(tail)
+        self.pos = len(tail) % self.window
+        self.total = math.fsum(tail)
+        self.since_resync = 0
+
+    def add(self, value):
+        oldest = self.buffer[self.pos] if self.filled == self.window else 0.0
+        self.buffer[self.pos] = value
+        self.pos = (self.pos + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+        self.total += value - oldest
+        # Re-sum exactly once per window so rounding errors cannot accumulate
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.total = math.fsum(self.buffer[:self.filled])
+            self.since_resync = 0
+        return self.total
+
+
+class SMA(Indicator):
+    """Simple moving average, as Series.rolling(window).mean()"""
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self._sum = _RollingSum(window)
+
+    def _initialize(self, values):
+        self._sum.load(values)
+        return pd.Series(values).rolling(window=self.window).mean().to_numpy()
+
+    def update(self, value):
+        total = self._sum.add(float(value))
+        self.count += 1
+        self.value = total / self.window if self._sum.filled == self.window else np.nan
+        return self.value
+
+
+class EMA(Indicator):
+    """Exponential moving average, as Series.ewm(span, adjust=False).mean()"""
+    def __init__(self, span):
+        super().__init__()
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+
+    def _initialize(self, values):
+        return pd.Series(values).ewm(span=self.span, adjust=False).mean().to_numpy()
+
+    def update(self, value):
+        value = float(value)
+        self.value = value if self.count == 0 else self.value + self.alpha * (value - self.value)
+        self.count += 1
+        return self.value
+
+
+class RSI(Indicator):
+    """
+    Relative Strength Index over simple averages of gains and losses
+
+    Matches the formula in CNNLSTMModel: the first bar counts as an
+    unchanged bar, a window without losses gives 100, and a window without
+    any movement gives NaN.
+    """
+    def __init__(self, window=14):
+        super().__init__()
+        self.window = window
+        self._gains = _RollingSum(window)
+        self._losses = _RollingSum(window)
+        # Up and down bars in the window, so that empty sides are exactly zero
+        self._ups = _RollingSum(window)
+        self._downs = _RollingSum(window)
+        self._last = np.nan
+
+    def _initialize(self, values):
+        delta = np.diff(values, prepend=np.nan)
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+        self._gains.load(gains)
+        self._losses.load(losses)
+        self._ups.load((gains > 0).astype(float))
+        self._downs.load((losses > 0).astype(float))
+        self._last = values[-1] if len(values) else np.nan
+        gain = pd.Series(gains).rolling(window=self.window).mean().to_numpy()
+        loss = pd.Series(losses).rolling(window=self.window).mean().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + gain / loss))
+
+    def update(self, value):
+        value = float(value)
+        delta = value - self._last if self.count else 0.0
+        self._last = value
+        self.count += 1
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        gain_sum = self._gains.add(gain)
+        loss_sum = self._losses.add(loss)
+        up_bars = self._ups.add(float(gain > 0))
+        down_bars = self._downs.add(float(loss > 0))
+        if self._gains.filled < self.window:
+            self.value = np.nan
+            return self.value
+
+        gain_sum = max(gain_sum, 0.0) if up_bars else 0.0
+        loss_sum = max(loss_sum, 0.0) if down_bars else 0.0
+        if loss_sum == 0.0:
+            self.value = 100.0 if gain_sum > 0 else np.nan
+        else:
+            self.value = 100 - (100 / (1 + gain_sum / loss_sum))
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    A named set of indicators driven by one price column
+
+    Example:
+        engine = IndicatorEngine({'SMA_20': SMA(20), 'RSI': RSI(14)})
+        engine.apply(history)         # adds SMA_20 and RSI columns
+        engine.update(latest_close)   # {'SMA_20': ..., 'RSI': ...}
+    """
+    def __init__(self, indicators, column='Close'):
+        self.indicators = dict(indicators)
+        self.column = column
+
+    def initialize(self, values):
+        """Bulk-compute every indicator; returns a dict of name -> array"""
+        values = np.asarray(values, dtype=float)
+        return {name: indicator.initialize(values) for name, indicator in self.indicators.items()}
+
+    def apply(self, df):
+        """Initialize from df[column] and add one column per indicator to df"""
+        for name, result in self.initialize(df[self.column].to_numpy(dtype=float)).items():
+            df[name] = result
+        return df
+
+    def update(self, value):
+        """Consume one new price; returns a dict of name -> latest value"""
+        return {name: indicator.update(value) for name, indicator in self.indicators.items()}
+
+    def values(self):
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+
+def feature_indicators():
+    """The indicator set used as model features by CNNLSTMModel"""
+    return IndicatorEngine({
+        'SMA_20': SMA(20),
+        'SMA_50': SMA(50),
+        'EMA_20': EMA(20),
+        'RSI': RSI(14),
+    })
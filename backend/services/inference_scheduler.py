@@ -0,0 +1,121 @@
+"""
+Micro-batching scheduler for concurrent model inference
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from config import Config
+
+
+def keras_forward(model, batch):
+    """Run one batched forward pass through a Keras model"""
+    return np.asarray(model.predict_on_batch(batch))
+
+
+class InferenceScheduler:
+    """
+    Coalesces concurrent prediction requests into batched forward passes
+
+    Each model gets a worker thread. The worker takes the first waiting
+    request, keeps collecting requests for up to max_wait_ms or until
+    max_batch_size rows are gathered, runs them as one forward pass and
+    scatters the output rows back to the callers. Workers exit after
+    idle_timeout seconds without requests, so evicted models are not
+    kept alive.
+    """
+    def __init__(self, max_batch_size=None, max_wait_ms=None, forward=keras_forward,
+                 idle_timeout=30.0):
+        self.max_batch_size = max_batch_size or Config.INFERENCE_MAX_BATCH
+        self.max_wait = (Config.INFERENCE_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self.forward = forward
+        self.idle_timeout = idle_timeout
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'rows': 0, 'errors': 0}
+
+    def submit(self, model, inputs):
+        """
+        Queue inputs for model and return a Future of its output rows
+
+        Args:
+            model: Model object passed to the forward function
+            inputs: Array of shape (rows, ...) or a single sample without
+                the batch axis
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if inputs.ndim == 2:
+            inputs = inputs[np.newaxis]
+        future = Future()
+        with self._lock:
+            model_queue = self._queues.get(id(model))
+            if model_queue is None:
+                model_queue = self._queues[id(model)] = queue.Queue()
+                threading.Thread(target=self._worker, args=(model, model_queue), daemon=True).start()
+            model_queue.put((inputs, future))
+            self._stats['requests'] += 1
+        return future
+
+    def predict(self, model, inputs, timeout=None):
+        """Blocking form of submit()"""
+        return self.submit(model, inputs).result(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, active_models=len(self._queues))
+        stats['mean_batch_rows'] = round(stats['rows'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+    def _worker(self, model, model_queue):
+        carry = None
+        while True:
+            if carry is not None:
+                first, carry = carry, None
+            else:
+                try:
+                    first = model_queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        if model_queue.empty():
+                            del self._queues[id(model)]
+                            return
+                    continue
+
+            batch = [first]
+            rows = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = model_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if rows + len(item[0]) > self.max_batch_size:
+                    carry = item
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._run(model, batch, rows)
+
+    def _run(self, model, batch, rows):
+        try:
+            inputs = batch[0][0] if len(batch) == 1 else np.concatenate([x for x, _ in batch])
+            outputs = self.forward(model, inputs)
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['rows'] += rows
+        offset = 0
+        for x, future in batch:
+            future.set_result(outputs[offset:offset + len(x)])
+            offset += len(x)
@@ -0,0 +1,334 @@
+"""
+In-process job queue running backtests on a local process pool
+"""
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from config import Config
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TERMINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobNotFoundError(Exception):
+    pass
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker at the next progress checkpoint after cancel()"""
+    pass
+
+
+class Job:
+    """State of one submitted job, as seen by the API"""
+    def __init__(self, job_id, slot, kwargs):
+        self.id = job_id
+        self.slot = slot
+        self.kwargs = kwargs
+        self.status = QUEUED
+        self.stage = None
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.version = 0
+
+    def snapshot(self, include_result=True):
+        finished = self.finished_at or time.time()
+        snapshot = {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.progress, 4),
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queued_seconds': round((self.started_at or finished) - self.submitted_at, 4),
+            'run_seconds': round(finished - self.started_at, 4) if self.started_at else None,
+        }
+        if include_result and self.status == SUCCEEDED:
+            snapshot['result'] = self.result
+        return snapshot
+
+
+class JobQueue:
+    """
+    Runs jobs on a ProcessPoolExecutor and tracks their progress
+
+    Workers report progress over a multiprocessing queue that a listener
+    thread folds into the job table; each job owns a slot in a shared flag
+    array that cancel() sets and the worker checks at every progress
+    checkpoint. At most max_pending jobs may be queued or running at once,
+    and the last max_finished finished jobs are kept for polling.
+    """
+    def __init__(self, runner=None, max_workers=None, max_pending=None, max_finished=None,
+                 result_cache_path=None):
+        self.runner = runner or run_backtest_job
+        self.max_workers = max_workers or Config.JOB_WORKERS or os.cpu_count()
+        self.max_pending = max_pending or Config.JOB_MAX_PENDING
+        self.max_finished = max_finished or Config.JOB_MAX_FINISHED
+        self.result_cache_path = Config.BACKTEST_CACHE_PATH if result_cache_path is None else result_cache_path
+        self._jobs = OrderedDict()
+        self._free_slots = list(range(self.max_pending))
+        self._changed = threading.Condition()
+        self._executor = None
+        self._events = None
+        self._flags = None
+        self._counters = {'submitted': 0, 'rejected': 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+
+    def _start(self):
+        # Forking the threaded API process could copy locks held by request
+        # threads into the workers, and TensorFlow is not fork-safe, so
+        # workers are spawned
+        context = multiprocessing.get_context('spawn')
+        self._events = context.Queue()
+        self._flags = context.Array('b', self.max_pending, lock=False)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context,
+            initializer=_init_job_worker,
+            initargs=(self._events, self._flags, self.result_cache_path)
+        )
+        threading.Thread(target=self._listen, args=(self._events,), daemon=True).start()
+
+    def submit(self, **kwargs):
+        """
+        Queue a job and return its id
+
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        with self._changed:
+            if not self._free_slots:
+                self._counters['rejected'] += 1
+                raise QueueFullError(f'Job queue is full ({self.max_pending} pending jobs)')
+            if self._executor is None:
+                self._start()
+            job = Job(uuid.uuid4().hex, self._free_slots.pop(), kwargs)
+            self._flags[job.slot] = 0
+            self._jobs[job.id] = job
+            self._counters['submitted'] += 1
+            job.future = self._executor.submit(_execute_job, self.runner, job.id, job.slot, kwargs)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job.id
+
+    def get(self, job_id, include_result=True):
+        with self._changed:
+            return self._job(job_id).snapshot(include_result)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job
+
+        Queued jobs never start; running jobs stop at their next progress
+        checkpoint, and a job cancelled after its last checkpoint is
+        recorded as cancelled and its result discarded. Returns the job
+        snapshot.
+        """
+        with self._changed:
+            job = self._job(job_id)
+            if job.status in TERMINAL_STATES:
+                return job.snapshot()
+            self._flags[job.slot] = 1
+            if job.status == QUEUED:
+                # It may already sit in the pool's call queue, where it can no
+                # longer be withdrawn; the worker then drops it on arrival
+                self._settle(job, CANCELLED)
+            future = job.future
+        # Running jobs are recorded as cancelled by the done callback
+        future.cancel()
+        return self.get(job_id)
+
+    def watch(self, job_id, timeout=15.0):
+        """
+        Yield job snapshots as the job changes, ending at a terminal state
+
+        Yields None when nothing changed for timeout seconds, so that
+        callers can send keep-alives.
+        """
+        seen = -1
+        while True:
+            with self._changed:
+                job = self._job(job_id)
+                if job.version == seen:
+                    self._changed.wait_for(lambda: job.version != seen, timeout)
+                if job.version == seen:
+                    snapshot = None
+                else:
+                    seen = job.version
+                    snapshot = job.snapshot()
+            yield snapshot
+            if snapshot is not None and snapshot['status'] in TERMINAL_STATES:
+                return
+
+    def stats(self):
+        """Queue depth, job counts and mean timings"""
+        with self._changed:
+            jobs = list(self._jobs.values())
+            stats = dict(self._counters)
+        finished = [job for job in jobs if job.status == SUCCEEDED and job.started_at is not None]
+        stats.update(
+            queued=sum(job.status == QUEUED for job in jobs),
+            running=sum(job.status == RUNNING for job in jobs),
+            max_pending=self.max_pending,
+            workers=self.max_workers,
+            mean_queued_seconds=_mean(job.started_at - job.submitted_at for job in finished),
+            mean_run_seconds=_mean(job.finished_at - job.started_at for job in finished),
+        )
+        return stats
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            for slot in range(self.max_pending):
+                self._flags[slot] = 1
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._events.put(None)
+
+    def _job(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"No job with id '{job_id}'")
+        return job
+
+    def _listen(self, events):
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            job_id, stage, fraction, timestamp = event
+            with self._changed:
+                job = self._jobs.get(job_id)
+                if job is None or job.status in TERMINAL_STATES:
+                    continue
+                if job.status == QUEUED:
+                    job.status = RUNNING
+                    job.started_at = timestamp
+                job.stage = stage
+                job.progress = max(job.progress, fraction)
+                job.version += 1
+                self._changed.notify_all()
+
+    def _finish(self, job, future):
+        started_at = None
+        try:
+            started_at, result = future.result()
+        except (CancelledError, JobCancelled):
+            status, result, error = CANCELLED, None, None
+        except Exception as e:
+            status, result, error = FAILED, None, f'{type(e).__name__}: {e}'
+            started_at = getattr(e, 'job_started_at', None)
+        else:
+            status, error = SUCCEEDED, None
+        with self._changed:
+            if status == SUCCEEDED and self._flags[job.slot]:
+                # Cancelled after the worker passed its last checkpoint
+                status, result = CANCELLED, None
+            if job.status not in TERMINAL_STATES:
+                # The worker's progress events may still be in flight
+                if job.started_at is None:
+                    job.started_at = started_at
+                self._settle(job, status, result, error)
+            # The slot's cancel flag is only reused once the worker is done with it
+            self._free_slots.append(job.slot)
+            self._prune()
+
+    def _settle(self, job, status, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        if status == SUCCEEDED:
+            job.stage, job.progress = 'done', 1.0
+        job.kwargs = None
+        job.version += 1
+        self._counters[status] += 1
+        self._changed.notify_all()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in TERMINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+def _mean(values):
+    values = list(values)
+    return round(sum(values) / len(values), 4) if values else None
+
+
+# Worker side. Each pool process receives the event queue, the cancel flags
+# and the result cache location once, in its initializer.
+_worker_state = {}
+
+
+def _init_job_worker(events, flags, result_cache_path):
+    _worker_state.update(events=events, flags=flags, result_cache_path=result_cache_path,
+                         result_cache=None, model_registry=None, job=None)
+
+
+def _execute_job(runner, job_id, slot, kwargs):
+    """Run one job; returns (start time, result)"""
+    _worker_state['job'] = (job_id, slot)
+    started_at = time.time()
+    try:
+        report_progress('started', 0.0)
+        return started_at, runner(**kwargs)
+    except Exception as e:
+        e.job_started_at = started_at
+        raise
+    finally:
+        _worker_state['job'] = None
+
+
+def report_progress(stage, fraction):
+    """
+    Publish progress for the job running in this worker
+
+    Also the cancellation checkpoint: raises JobCancelled once the job has
+    been cancelled. Does nothing outside a job worker.
+
+    Args:
+        stage: Short description of the current step
+        fraction: Overall completion between 0 and 1
+    """
+    job = _worker_state.get('job')
+    if job is None:
+        return
+    job_id, slot = job
+    if _worker_state['flags'][slot]:
+        raise JobCancelled(job_id)
+    _worker_state['events'].put((job_id, stage, float(fraction), time.time()))
+
+
+def run_backtest_job(symbol, strategy, params=None, start_date=None, end_date=None,
+                     initial_capital=None):
+    """Default job runner: one Backtester.run_strategy call"""
+    from services.backtester import Backtester
+    from services.model_registry import ModelRegistry
+    from services.result_cache import BacktestResultCache
+
+    if _worker_state.get('result_cache_path') and _worker_state.get('result_cache') is None:
+        _worker_state['result_cache'] = BacktestResultCache(_worker_state['result_cache_path'])
+    # Spawned workers cannot share the API's registry; each keeps its own
+    # for the jobs it runs
+    if _worker_state.get('model_registry') is None:
+        _worker_state['model_registry'] = ModelRegistry()
+    backtester = Backtester(symbol, start_date, end_date,
+                            initial_capital=initial_capital or Config.INITIAL_CAPITAL,
+                            result_cache=_worker_state.get('result_cache'),
+                            model_registry=_worker_state['model_registry'])
+    return backtester.run_strategy(strategy, params, progress=report_progress)
@@ -0,0 +1,42 @@
+"""
+Deferred construction of module-level services
+"""
+import threading
+
+
+class LazyObject:
+    """
+    Stands in for an object that is only built on first use
+
+    Attribute reads and writes are forwarded to the instance, which
+    factory() creates (once, even under concurrent first use) the first
+    time it is touched. Route modules can declare their services at
+    import time without importing the libraries behind them.
+    """
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, '_instance', self._factory())
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+
+def load(lazy):
+    """Build a LazyObject's instance now, if it is not built yet, and return it"""
+    return lazy._get()
+
+
+def is_loaded(lazy):
+    """Whether a LazyObject has built its instance yet"""
+    return lazy._instance is not None
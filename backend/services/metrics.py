@@ -0,0 +1,183 @@
+"""
+Vectorized performance metrics over batches of equity curves
+"""
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _as_curves(equity):
+    """2-D float array of curves, one per row; 1-D input is a single curve"""
+    curves = np.asarray(equity, dtype=float)
+    if curves.ndim == 1:
+        curves = curves[np.newaxis]
+    if curves.ndim != 2:
+        raise ValueError('equity must be a 1-D curve or a 2-D array of curves')
+    return curves
+
+
+def _bar_returns(curves):
+    """Per-bar simple returns, NaN where either value is missing"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = curves[:, 1:] / curves[:, :-1] - 1
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def equity_metrics(equity, initial_capital=None, periods_per_year=TRADING_DAYS_PER_YEAR, risk_free_rate=0.0):
+    """
+    Performance metrics for many equity curves in one pass
+
+    Curves of different lengths can be stacked by right-padding the
+    shorter ones with NaN. A curve with no bars gets NaN metrics; a curve
+    whose returns have zero variance (or zero downside) gets a Sharpe
+    (or Sortino) ratio of 0 rather than a division by zero.
+
+    Args:
+        equity: Array of shape (runs, bars), or a single 1-D curve
+        initial_capital: Starting capital, scalar or one per run
+            (defaults to each curve's first value)
+        periods_per_year: Bars per year, for annualization
+        risk_free_rate: Annual risk-free rate, as a fraction
+
+    Returns:
+        Dict of arrays of shape (runs,): total_return, cagr, volatility,
+        max_drawdown and win_rate in percent; sharpe_ratio, sortino_ratio,
+        final_value and num_bars
+    """
+    curves = _as_curves(equity)
+    runs, bars = curves.shape
+    rows = np.arange(runs)
+    num_bars = np.count_nonzero(~np.isnan(curves), axis=1)
+    has_bars = num_bars > 0
+    first = curves[:, 0] if bars else np.full(runs, np.nan)
+    final = np.where(has_bars, curves[rows, np.maximum(num_bars - 1, 0)] if bars else np.nan, np.nan)
+    initial = first if initial_capital is None else np.broadcast_to(np.asarray(initial_capital, dtype=float), (runs,))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_return = np.where(has_bars, (final / initial - 1) * 100, np.nan)
+        years = (num_bars - 1) / periods_per_year
+        growth = final / initial
+        cagr = np.where((years > 0) & (growth > 0), (np.abs(growth) ** (1 / np.where(years > 0, years, 1)) - 1) * 100, np.nan)
+
+    returns = _bar_returns(curves) if bars > 1 else np.empty((runs, 0))
+    observed = ~np.isnan(returns)
+    count = np.count_nonzero(observed, axis=1)
+    filled = np.where(observed, returns, 0.0)
+    safe_count = np.maximum(count, 1)
+    excess_per_bar = risk_free_rate / periods_per_year
+    mean = filled.sum(axis=1) / safe_count
+    deviation = np.where(observed, returns - mean[:, np.newaxis], 0.0)
+    std = np.sqrt((deviation ** 2).sum(axis=1) / safe_count)
+    downside_gap = np.where(observed, np.minimum(returns - excess_per_bar, 0.0), 0.0)
+    downside = np.sqrt((downside_gap ** 2).sum(axis=1) / safe_count)
+
+    annualizer = np.sqrt(periods_per_year)
+    excess = mean - excess_per_bar
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, excess / std * annualizer, 0.0)
+        sortino = np.where(downside > 0, excess / downside * annualizer, 0.0)
+        moving = np.count_nonzero(observed & (returns != 0), axis=1)
+        win_rate = np.where(moving > 0, np.count_nonzero(observed & (returns > 0), axis=1) / moving * 100, np.nan)
+    volatility = std * annualizer * 100
+
+    # Drawdown from the running peak, which starts at the initial capital
+    peaks = np.fmax.accumulate(np.column_stack([initial, curves]), axis=1)[:, 1:] if bars else np.empty((runs, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(np.isnan(curves) | (peaks <= 0), 0.0, curves / peaks - 1)
+    max_drawdown = np.minimum(drawdown.min(axis=1) if bars else np.zeros(runs), 0.0) * 100
+
+    no_data = ~has_bars
+    for values in (sharpe, sortino, volatility, max_drawdown):
+        values[no_data] = np.nan
+
+    return {
+        'total_return': total_return,
+        'cagr': cagr,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'max_drawdown': max_drawdown,
+        'win_rate': win_rate,
+        'final_value': final,
+        'num_bars': num_bars,
+    }
+
+
+def rolling_metrics(equity, window, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Trailing-window return, volatility and Sharpe ratio for every bar
+
+    Args:
+        equity: Array of shape (runs, bars), or a single 1-D curve
+        window: Number of bar returns in each window
+
+    Returns:
+        Dict of arrays of shape (runs, bars): rolling_return (percent
+        change over the last window bars), rolling_volatility (annualized,
+        percent) and rolling_sharpe; NaN until a full window is available
+    """
+    curves = _as_curves(equity)
+    runs, bars = curves.shape
+    result = {name: np.full((runs, bars), np.nan)
+              for name in ('rolling_return', 'rolling_volatility', 'rolling_sharpe')}
+    if window < 1 or bars <= window:
+        return result
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['rolling_return'][:, window:] = (curves[:, window:] / curves[:, :-window] - 1) * 100
+
+    returns = _bar_returns(curves)
+    observed = ~np.isnan(returns)
+    # Centre each run's returns before summing to limit cancellation error
+    filled = np.where(observed, returns, 0.0)
+    centre = filled.sum(axis=1, keepdims=True) / np.maximum(observed.sum(axis=1, keepdims=True), 1)
+    shifted = np.where(observed, returns - centre, 0.0)
+    zeros = np.zeros((runs, 1))
+    csum = np.concatenate([zeros, np.cumsum(shifted, axis=1)], axis=1)
+    csq = np.concatenate([zeros, np.cumsum(shifted ** 2, axis=1)], axis=1)
+    cnt = np.concatenate([zeros, np.cumsum(observed, axis=1)], axis=1)
+    win_sum = csum[:, window:] - csum[:, :-window]
+    win_sq = csq[:, window:] - csq[:, :-window]
+    win_cnt = cnt[:, window:] - cnt[:, :-window]
+
+    full = win_cnt == window
+    shifted_mean = win_sum / window
+    variance = np.maximum(win_sq / window - shifted_mean ** 2, 0.0)
+    std = np.sqrt(variance)
+    mean = shifted_mean + centre
+    # Windows of identical returns would leave only rounding noise in the
+    # variance, so they are detected exactly by counting return changes
+    changed = np.concatenate([zeros, np.cumsum(filled[:, 1:] != filled[:, :-1], axis=1)], axis=1)
+    flat = (changed[:, window - 1:] - changed[:, :-window + 1 or None]) == 0
+    annualizer = np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(flat, 0.0, mean / std * annualizer)
+    result['rolling_volatility'][:, window:] = np.where(full, np.where(flat, 0.0, std) * annualizer * 100, np.nan)
+    result['rolling_sharpe'][:, window:] = np.where(full, sharpe, np.nan)
+    return result
+
+
+def metrics_table(equity, initial_capital=None, num_trades=None, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    equity_metrics() as one JSON-ready dict per run
+
+    Values are rounded to two decimals; undefined values become None.
+
+    Args:
+        num_trades: Trades per run, scalar or sequence, copied into each row
+    """
+    metrics = equity_metrics(equity, initial_capital, periods_per_year)
+    runs = len(metrics['final_value'])
+    trades = np.broadcast_to(np.asarray(0 if num_trades is None else num_trades), (runs,))
+    names = ('total_return', 'cagr', 'volatility', 'sharpe_ratio', 'sortino_ratio',
+             'max_drawdown', 'win_rate', 'final_value')
+    columns = {name: metrics[name].tolist() for name in names}
+    return [
+        dict({name: _rounded(columns[name][i]) for name in names}, num_trades=int(trades[i]))
+        for i in range(runs)
+    ]
+
+
+def _rounded(value):
+    return round(value, 2) if np.isfinite(value) else None
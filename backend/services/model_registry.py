@@ -0,0 +1,113 @@
+"""
+Per-symbol registry of warm StockPredictor instances
+"""
+import os
+import re
+from config import Config
+from services.cache import TTLCache
+from services.numpy_model import inference_artifact_path
+
+MODEL_FILENAME = 'cnn_lstm_model.h5'
+METADATA_FILENAME = 'metadata.json'
+VERSION_DIR = re.compile(r'^v(\d+)$')
+
+
+class ModelNotFoundError(Exception):
+    pass
+
+
+class ModelRegistry:
+    """
+    Lazily loads per-symbol models and keeps a bounded number warm
+
+    Artifacts are resolved under model_dir as the latest trained version,
+    <SYMBOL>/v<N>/cnn_lstm_model.h5, then an unversioned
+    <SYMBOL>/cnn_lstm_model.h5, falling back to the shared
+    cnn_lstm_model.h5 at the top level. Unless backend is 'keras', an
+    exported cnn_lstm_model.npz in the same directory is preferred, so
+    the model is served by NumPy without loading TensorFlow. Loaded
+    predictors are kept in an LRU of at most max_models entries; concurrent
+    first requests for the same symbol share a single load. Predictors are
+    attached to scheduler, if given, so their forward passes are batched.
+    """
+    def __init__(self, model_dir=None, max_models=None, loader=None, scheduler=None, backend=None):
+        self.model_dir = model_dir or Config.MODEL_PATH
+        self.max_models = max_models or Config.MAX_WARM_MODELS
+        self.backend = backend or Config.INFERENCE_BACKEND
+        self.scheduler = scheduler
+        self.loader = loader or self._load_predictor
+        # Every entry counts as one unit of size, so max_bytes bounds the model count
+        self._models = TTLCache(self.max_models, sizeof=lambda predictor: 1)
+
+    def resolve(self, symbol, version=None):
+        """
+        Find the model artifact for a symbol
+
+        Args:
+            symbol: Stock symbol
+            version: Specific trained version; defaults to the best available
+
+        Raises:
+            ModelNotFoundError: If no matching model exists
+        """
+        if version is not None:
+            directories = [version_dir(self.model_dir, symbol, version)]
+        else:
+            versions = model_versions(self.model_dir, symbol)
+            directories = [version_dir(self.model_dir, symbol, v) for v in versions[-1:]]
+            directories += [os.path.join(self.model_dir, symbol), self.model_dir]
+        for directory in directories:
+            keras_path = os.path.join(directory, MODEL_FILENAME)
+            paths = [keras_path] if self.backend == 'keras' else [inference_artifact_path(keras_path), keras_path]
+            for path in paths:
+                if os.path.exists(path):
+                    return path
+        label = f"{symbol} v{version}" if version is not None else symbol
+        raise ModelNotFoundError(f"No trained model found for {label} in {self.model_dir}")
+
+    def versions(self, symbol):
+        """Trained versions available for a symbol, oldest first"""
+        return model_versions(self.model_dir, symbol)
+
+    def get(self, symbol, version=None):
+        """Return a loaded StockPredictor for symbol, loading it on first use"""
+        path = self.resolve(symbol, version)
+        return self._models.get_or_load(path, lambda: self.loader(path), ttl=float('inf'))
+
+    def stats(self):
+        stats = self._models.stats()
+        return {
+            'loaded': stats['entries'],
+            'max_models': self.max_models,
+            'hits': stats['hits'],
+            'loads': stats['misses'],
+            'coalesced': stats['coalesced'],
+            'evictions': stats['evictions'],
+        }
+
+    def clear(self):
+        self._models.clear()
+
+    def _load_predictor(self, path):
+        # Imported here so that TensorFlow is only loaded once a model is needed
+        from services.predictor import StockPredictor
+        return StockPredictor(path, scheduler=self.scheduler)
+
+
+def version_dir(model_dir, symbol, version):
+    """Directory holding one trained version of a symbol's model"""
+    return os.path.join(model_dir, symbol, f'v{version}')
+
+
+def model_versions(model_dir, symbol):
+    """
+    Complete trained versions of a symbol's model, oldest first
+
+    Versions are published by renaming a finished staging directory to
+    v<N>, so a directory matching that name always holds a whole artifact.
+    """
+    try:
+        names = os.listdir(os.path.join(model_dir, symbol))
+    except FileNotFoundError:
+        return []
+    return sorted(int(match.group(1)) for match in map(VERSION_DIR.match, names) if match)
@@ -0,0 +1,184 @@
+"""
+TensorFlow-free CNN-LSTM inference from an exported weight artifact
+"""
+import json
+import numpy as np
+from services.windowing import sliding_windows
+
+ARTIFACT_SUFFIX = '.npz'
+ARTIFACT_FORMAT = 1
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, dtype=x.dtype),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: (0.5 * (np.tanh(0.5 * x) + 1)).astype(x.dtype, copy=False),
+    'hard_sigmoid': lambda x: np.clip(x / 6 + 0.5, 0, 1).astype(x.dtype, copy=False),
+}
+
+
+def inference_artifact_path(model_path):
+    """Inference artifact written alongside a .h5 model"""
+    return model_path.rsplit('.', 1)[0] + ARTIFACT_SUFFIX
+
+
+class ArrayScaler:
+    """The transform half of a fitted MinMaxScaler, as plain arrays"""
+    def __init__(self, min_, scale_):
+        self.min_ = np.asarray(min_, dtype=float)
+        self.scale_ = np.asarray(scale_, dtype=float)
+        self.n_features_in_ = len(self.min_)
+
+    def transform(self, X):
+        return np.asarray(X, dtype=float) * self.scale_ + self.min_
+
+    def inverse_transform(self, X):
+        return (np.asarray(X, dtype=float) - self.min_) / self.scale_
+
+
+class NumpyCNNLSTM:
+    """
+    Forward pass of an exported Conv1D/MaxPooling1D/LSTM/Dense stack
+
+    Mirrors Keras inference semantics (dropout is the identity) and
+    answers the predict()/predict_on_batch() calls StockPredictor and the
+    inference scheduler make, so it can stand in for the Keras model.
+    """
+    def __init__(self, layers, input_shape):
+        """
+        Args:
+            layers: List of (config dict, dict of float32 weight arrays)
+            input_shape: (sequence_length, n_features)
+        """
+        self.layers = layers
+        self.input_shape = tuple(input_shape)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model and its scaler; returns (model, ArrayScaler)"""
+        with np.load(path) as archive:
+            config = json.loads(str(archive['config']))
+            if config['format'] != ARTIFACT_FORMAT:
+                raise ValueError(f"Unsupported inference artifact format {config['format']}")
+            layers = [
+                (layer, {name: archive[f'layer{i}/{name}'].astype(np.float32) for name in layer['weights']})
+                for i, layer in enumerate(config['layers'])
+            ]
+            scaler = ArrayScaler(archive['scaler/min_'], archive['scaler/scale_'])
+        return cls(layers, config['input_shape']), scaler
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """Keras-style predict, in chunks of batch_size rows"""
+        x = np.asarray(x, dtype=np.float32)
+        if not batch_size or len(x) <= batch_size:
+            return self.predict_on_batch(x)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size])
+                               for i in range(0, len(x), batch_size)])
+
+    def predict_on_batch(self, x):
+        out = np.asarray(x, dtype=np.float32)
+        for config, weights in self.layers:
+            out = _FORWARD[config['type']](out, config, weights)
+        return out
+
+    __call__ = predict_on_batch
+
+
+def save_inference_artifact(path, layers, input_shape, scaler_min, scaler_scale):
+    """
+    Write an inference artifact
+
+    Args:
+        path: Destination .npz file
+        layers: List of (config dict with 'type' and layer options,
+            dict of named weight arrays)
+        input_shape: (sequence_length, n_features)
+        scaler_min, scaler_scale: Fitted MinMaxScaler min_ and scale_
+    """
+    arrays = {'scaler/min_': np.asarray(scaler_min, dtype=np.float64),
+              'scaler/scale_': np.asarray(scaler_scale, dtype=np.float64)}
+    configs = []
+    for i, (config, weights) in enumerate(layers):
+        configs.append(dict(config, weights=sorted(weights)))
+        for name, value in weights.items():
+            arrays[f'layer{i}/{name}'] = np.asarray(value, dtype=np.float32)
+    config = {'format': ARTIFACT_FORMAT, 'input_shape': list(input_shape), 'layers': configs}
+    with open(path, 'wb') as f:
+        np.savez(f, config=np.array(json.dumps(config)), **arrays)
+
+
+def _conv1d(x, config, weights):
+    """'valid' Conv1D with stride 1, as one matrix product over all windows"""
+    kernel = weights['kernel']
+    k, channels, filters = kernel.shape
+    windows = sliding_windows(x.transpose(1, 0, 2), k)  # (steps, k, batch, channels)
+    windows = windows.transpose(2, 0, 1, 3).reshape(-1, k * channels)
+    out = windows @ kernel.reshape(k * channels, filters) + weights['bias']
+    return _ACTIVATIONS[config['activation']](out.reshape(len(x), -1, filters))
+
+
+def _max_pool1d(x, config, weights):
+    pool, stride = config['pool_size'], config['strides']
+    steps = (x.shape[1] - pool) // stride + 1
+    if pool == stride:
+        return x[:, :steps * pool].reshape(len(x), steps, pool, -1).max(axis=2)
+    return np.stack([x[:, t * stride:t * stride + pool].max(axis=1) for t in range(steps)], axis=1)
+
+
+def _lstm(x, config, weights):
+    """LSTM with Keras gate order (input, forget, cell, output)"""
+    recurrent = weights['recurrent_kernel']
+    units = recurrent.shape[0]
+    fused = config['activation'] == 'tanh' and config['recurrent_activation'] == 'sigmoid'
+    if fused:
+        # sigmoid(z) = (tanh(z / 2) + 1) / 2: halving the sigmoid gates'
+        # weights lets one tanh call cover all four gates per step
+        half = np.ones(4 * units, dtype=np.float32)
+        half[:2 * units] = half[3 * units:] = 0.5
+        kernel, recurrent, bias = weights['kernel'] * half, recurrent * half, weights['bias'] * half
+    else:
+        activation = _ACTIVATIONS[config['activation']]
+        recurrent_activation = _ACTIVATIONS[config['recurrent_activation']]
+        kernel, bias = weights['kernel'], weights['bias']
+    # Input projections for every step at once, time-major; only the recurrence loops
+    projected = np.ascontiguousarray((x @ kernel + bias).transpose(1, 0, 2))
+    h = np.zeros((len(x), units), dtype=np.float32)
+    c = np.zeros((len(x), units), dtype=np.float32)
+    outputs = []
+    for z in projected:
+        z += h @ recurrent
+        if fused:
+            np.tanh(z, out=z)
+            gates = z[:, :2 * units] * 0.5 + 0.5
+            i, f = gates[:, :units], gates[:, units:]
+            g = z[:, 2 * units:3 * units]
+            o = z[:, 3 * units:] * 0.5 + 0.5
+            c = f * c + i * g
+            h = o * np.tanh(c)
+        else:
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+        if config['return_sequences']:
+            outputs.append(h)
+    return np.stack(outputs, axis=1) if config['return_sequences'] else h
+
+
+def _dense(x, config, weights):
+    return _ACTIVATIONS[config['activation']](x @ weights['kernel'] + weights['bias'])
+
+
+def _flatten(x, config, weights):
+    return x.reshape(len(x), -1)
+
+
+_FORWARD = {
+    'conv1d': _conv1d,
+    'max_pool1d': _max_pool1d,
+    'lstm': _lstm,
+    'dense': _dense,
+    'flatten': _flatten,
+}
@@ -0,0 +1,240 @@
+"""
+Multi-asset portfolio backtesting over a date-aligned price matrix
+"""
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from services.data_fetcher import DataFetcher
+from services.backtester import calculate_metrics, warmup_bars
+from config import Config
+
+PORTFOLIO_STRATEGIES = ('sma_crossover', 'buy_and_hold')
+
+
+class PortfolioBacktester:
+    """
+    Runs one strategy over many symbols sharing a single pool of capital
+
+    Prices are aligned into a (bars, symbols) matrix on the union of all
+    trading dates. Signals are computed for every symbol at once, and the
+    simulation steps through time with whole-row array operations.
+    """
+    def __init__(self, symbols, start_date, end_date, initial_capital=None,
+                 risk_per_trade=None, stop_loss=None):
+        """
+        Args:
+            symbols: List of stock symbols
+            start_date, end_date: Backtest date range
+            initial_capital: Starting capital for the whole portfolio
+            risk_per_trade: Fraction of equity risked per entry
+            stop_loss: Stop distance below the entry price, as a fraction
+        """
+        self.symbols = list(dict.fromkeys(symbols))
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_capital = Config.INITIAL_CAPITAL if initial_capital is None else initial_capital
+        self.risk_per_trade = Config.RISK_PER_TRADE if risk_per_trade is None else risk_per_trade
+        self.stop_loss = Config.PORTFOLIO_STOP_LOSS if stop_loss is None else stop_loss
+        self.data_fetcher = DataFetcher()
+
+    def run_strategy(self, strategy_name, params=None):
+        """
+        Load and align every symbol's prices, then backtest the portfolio
+
+        Each symbol is loaded between start_date and end_date, plus the
+        bars the strategy's indicators warm up on; only the requested
+        range is traded and reported.
+
+        Returns:
+            Dictionary with portfolio 'portfolio_value', 'trades' and
+            'metrics', plus per-symbol metrics under 'symbols'
+        """
+        params = dict(params or {})
+        dates, close = align_prices(self._load_frames(warmup_bars(strategy_name, params)))
+        first_bar = bisect.bisect_left(dates, str(self.start_date)[:10]) if self.start_date else 0
+        return self.run_on_prices(dates, close, strategy_name, params, first_bar=first_bar)
+
+    def run_on_prices(self, dates, close, strategy_name, params=None, first_bar=0):
+        """
+        Backtest over an already aligned price matrix
+
+        Args:
+            dates: Sequence of date labels, one per row
+            close: Array of shape (bars, symbols), columns in self.symbols
+                order, NaN where a symbol has no price yet
+            strategy_name: One of PORTFOLIO_STRATEGIES
+            params: Optional strategy parameters
+            first_bar: Rows before this one only warm up the signals and
+                are neither traded nor reported
+        """
+        buy, sell, strength = portfolio_signals(close, strategy_name, **(params or {}))
+        dates, close = dates[first_bar:], close[first_bar:]
+        buy, sell, strength = buy[first_bar:], sell[first_bar:], strength[first_bar:]
+        sim = simulate_portfolio(close, buy, sell, strength, self.initial_capital,
+                                 self.risk_per_trade, self.stop_loss)
+
+        dates = [str(d) for d in dates]
+        trades = [
+            {'date': dates[t], 'symbol': self.symbols[j], 'type': side, 'shares': qty,
+             'price': price, 'reason': reason}
+            for t, j, side, qty, price, reason in sim['fills']
+        ]
+        metrics = calculate_metrics(sim['values'], self.initial_capital, len(trades))
+        metrics['max_positions'] = int(sim['positions'].max()) if len(dates) else 0
+
+        per_symbol = {}
+        for j, symbol in enumerate(self.symbols):
+            closed = int(sim['closed'][j])
+            per_symbol[symbol] = {
+                'num_trades': int(sim['num_fills'][j]),
+                'pnl': round(float(sim['pnl'][j]), 2),
+                'return_contribution': round(float(sim['pnl'][j]) / self.initial_capital * 100, 2),
+                'win_rate': round(sim['wins'][j] / closed * 100, 2) if closed else None,
+                'shares_held': int(sim['shares'][j]),
+            }
+
+        return {
+            'portfolio_value': [{'date': date, 'value': value}
+                                for date, value in zip(dates, sim['values'].tolist())],
+            'trades': trades,
+            'metrics': metrics,
+            'symbols': per_symbol,
+        }
+
+    def _load_frames(self, warmup=0):
+        """Fetch every symbol's prices in the date range, plus warmup earlier bars, concurrently"""
+        def load(symbol):
+            records, _ = self.data_fetcher.fetch_window(symbol, self.start_date, self.end_date, warmup)
+            return pd.DataFrame(records)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(Config.BULK_FETCH_WORKERS, len(self.symbols)))) as pool:
+            return dict(zip(self.symbols, pool.map(load, self.symbols)))
+
+
+def align_prices(frames, column='Close'):
+    """
+    Align per-symbol price frames on the union of their dates
+
+    Prices are forward-filled across dates a symbol did not trade; dates
+    before a symbol's first bar stay NaN.
+
+    Args:
+        frames: Dict mapping symbol to a DataFrame with 'Date' and column
+
+    Returns:
+        Tuple of (list of 'YYYY-MM-DD' dates, array of shape (dates, symbols))
+    """
+    series = []
+    for symbol, df in frames.items():
+        dates = df['Date'].astype(str).str[:10] if len(df) else pd.Series([], dtype=str)
+        prices = pd.Series(df[column].to_numpy(dtype=float) if len(df) else [], index=dates, name=symbol)
+        series.append(prices[~prices.index.duplicated(keep='last')])
+    matrix = pd.concat(series, axis=1, join='outer').sort_index().ffill()
+    return matrix.index.tolist(), matrix.to_numpy(dtype=float)
+
+
+def portfolio_signals(close, strategy_name, short_window=50, long_window=200):
+    """
+    Entry/exit signals for every symbol at once
+
+    Returns:
+        Tuple of (buy, sell, strength) arrays shaped like close; strength
+        ranks competing entries on the same bar (strongest first)
+    """
+    if strategy_name not in PORTFOLIO_STRATEGIES:
+        raise ValueError(f"Unknown portfolio strategy '{strategy_name}', expected one of {list(PORTFOLIO_STRATEGIES)}")
+
+    if strategy_name == 'buy_and_hold':
+        valid = ~np.isnan(close)
+        buy = valid & ~np.vstack([np.zeros((1, close.shape[1]), dtype=bool), valid[:-1]])
+        return buy, np.zeros_like(buy), np.zeros(close.shape)
+
+    prices = pd.DataFrame(close)
+    fast = prices.rolling(window=short_window).mean().to_numpy()
+    slow = prices.rolling(window=long_window).mean().to_numpy()
+    above = fast > slow
+    # As in Backtester, trading starts one bar after the slow average is
+    # first defined; from then on, enter when the fast average crosses above
+    above[:long_window] = False
+    buy = above & ~np.vstack([np.zeros((1, close.shape[1]), dtype=bool), above[:-1]])
+    sell = fast < slow
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = np.nan_to_num(fast / slow - 1)
+    return buy, sell, strength
+
+
+def simulate_portfolio(close, buy, sell, strength, initial_capital, risk_per_trade, stop_loss):
+    """
+    Shared-capital long/flat simulation across symbols
+
+    On each bar, held positions are first closed on a sell signal or when
+    the price falls to the stop (stop_loss below entry). Entries are then
+    sized so that hitting the stop would lose risk_per_trade of current
+    equity, i.e. equity * risk_per_trade / stop_loss, in whole shares, and
+    filled strongest first for as long as cash lasts.
+
+    Returns:
+        Dict of 'values' (equity per bar), 'positions' (open positions per
+        bar), 'fills' [(bar, symbol index, side, shares, price, reason)],
+        and per-symbol 'shares', 'pnl', 'num_fills', 'closed' and 'wins'
+    """
+    n_bars, n_symbols = close.shape
+    shares = np.zeros(n_symbols, dtype=np.int64)
+    entry_price = np.zeros(n_symbols)
+    pnl = np.zeros(n_symbols)
+    num_fills = np.zeros(n_symbols, dtype=np.int64)
+    closed = np.zeros(n_symbols, dtype=np.int64)
+    wins = np.zeros(n_symbols, dtype=np.int64)
+    values = np.empty(n_bars)
+    positions = np.zeros(n_bars, dtype=np.int64)
+    fills = []
+    cash = float(initial_capital)
+    position_budget = risk_per_trade / stop_loss
+
+    for t in range(n_bars):
+        price = close[t]
+        valid = ~np.isnan(price)
+        marked = np.where(valid, price, 0.0)
+        held = (shares > 0) & valid
+
+        stopped = held & (marked <= entry_price * (1 - stop_loss))
+        exits = np.flatnonzero(held & (sell[t] | stopped))
+        if len(exits):
+            exit_price = marked[exits]
+            cash += float(shares[exits] @ exit_price)
+            pnl[exits] += shares[exits] * (exit_price - entry_price[exits])
+            wins[exits] += exit_price > entry_price[exits]
+            closed[exits] += 1
+            num_fills[exits] += 1
+            fills.extend(
+                (t, int(j), 'SELL', int(shares[j]), float(marked[j]), 'stop' if stopped[j] else 'signal')
+                for j in exits
+            )
+            shares[exits] = 0
+
+        entries = np.flatnonzero((shares == 0) & buy[t] & valid & (marked > 0))
+        if len(entries):
+            equity = cash + float(shares @ marked)
+            entries = entries[np.argsort(-strength[t, entries], kind='stable')]
+            qty = np.floor(equity * position_budget / marked[entries] + 1e-9).astype(np.int64)
+            cost = qty * marked[entries]
+            take = (qty > 0) & (np.cumsum(cost) <= cash)
+            entries, qty, cost = entries[take], qty[take], cost[take]
+            cash -= float(cost.sum())
+            shares[entries] = qty
+            entry_price[entries] = marked[entries]
+            num_fills[entries] += 1
+            fills.extend(
+                (t, int(j), 'BUY', int(q), float(marked[j]), 'signal') for j, q in zip(entries, qty)
+            )
+
+        values[t] = cash + float(shares @ marked)
+        positions[t] = np.count_nonzero(shares)
+
+    # Open positions count toward P&L at the last price
+    last = np.where(np.isnan(close[-1]), 0.0, close[-1]) if n_bars else np.zeros(n_symbols)
+    pnl += shares * (last - entry_price) * (shares > 0)
+
+    return {'values': values, 'positions': positions, 'fills': fills, 'shares': shares,
+            'pnl': pnl, 'num_fills': num_fills, 'closed': closed, 'wins': wins}
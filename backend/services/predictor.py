@@ -2,40 +2,67 @@
 Price prediction service using CNN-LSTM model
 """
 import numpy as np
-import pandas as pd
-from tensorflow import keras
-import joblib
+from services.windowing import sliding_windows
+from services.numpy_model import NumpyCNNLSTM, ARTIFACT_SUFFIX
+from services.telemetry import stage_timer
+
+# Feature layout the CNN-LSTM model is trained on (see CNNLSTMModel.prepare_data)
+FEATURE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CLOSE_INDEX = FEATURE_COLUMNS.index('Close')
 
 class StockPredictor:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, scheduler=None):
+        """
+        Args:
+            model_path: Path to a saved .h5 model (scaler alongside it), or
+                to an exported .npz inference artifact, which is served by
+                NumPy without importing TensorFlow
+            scheduler: Optional InferenceScheduler; when set, forward passes
+                are batched with those of other concurrent callers
+        """
         self.model = None
         self.scaler = None
         self.sequence_length = 60
+        self.feature_columns = FEATURE_COLUMNS
+        self.model_path = model_path
+        self.scheduler = scheduler
+        self._compiled = None
         
         if model_path:
             self.load_model(model_path)
     
+    @stage_timer('predictor', 'load')
     def load_model(self, model_path):
         """Load trained CNN-LSTM model"""
         try:
+            self._compiled = None
+            if model_path.endswith(ARTIFACT_SUFFIX):
+                self.model, self.scaler = NumpyCNNLSTM.load(model_path)
+                self.sequence_length = self.model.input_shape[0]
+                return
+            # Only the Keras path pays for the TensorFlow import
+            from tensorflow import keras
+            import joblib
             self.model = keras.models.load_model(model_path)
             self.scaler = joblib.load(model_path.replace('.h5', '_scaler.pkl'))
         except Exception as e:
             raise Exception(f"Error loading model: {str(e)}")
     
-    def prepare_data(self, df, feature_columns=['Close', 'Volume', 'High', 'Low']):
+    @stage_timer('predictor', 'prepare')
+    def prepare_data(self, df, feature_columns=None):
         """
         Prepare data for prediction
         
         Args:
             df: DataFrame with stock data
-            feature_columns: Columns to use as features
+            feature_columns: Columns to use as features (defaults to the
+                model's training features)
         
         Returns:
             Scaled and sequenced data
         """
         # Extract features
-        data = df[feature_columns].values
+        data = df[feature_columns or self.feature_columns].values
         
         # Scale data
         if self.scaler is None:
@@ -45,13 +72,10 @@ class StockPredictor:
         else:
             scaled_data = self.scaler.transform(data)
         
-        # Create sequences
-        sequences = []
-        for i in range(self.sequence_length, len(scaled_data)):
-            sequences.append(scaled_data[i-self.sequence_length:i])
-        
-        return np.array(sequences)
+        # Create sequences (a strided view, not a copy)
+        return sliding_windows(scaled_data, self.sequence_length)[:-1]
     
+    @stage_timer('predictor', 'predict')
     def predict(self, data):
         """
         Make predictions using the CNN-LSTM model
@@ -65,12 +89,45 @@ class StockPredictor:
         if self.model is None:
             raise Exception("Model not loaded. Call load_model() first.")
         
-        predictions = self.model.predict(data)
+        predictions = self._forward(data)
         
         # Inverse transform predictions
-        predictions = self.scaler.inverse_transform(predictions)
+        if predictions.shape[-1] == 1:
+            return self.inverse_close(predictions)
+        return self.scaler.inverse_transform(predictions)
+    
+    @stage_timer('predictor', 'forward_batch')
+    def predict_windows(self, windows, batch_size=1024):
+        """
+        Close predictions for many scaled windows in large batched passes
+        
+        Bypasses the request scheduler: meant for offline work such as
+        backtests, where all windows are known up front.
+        
+        Args:
+            windows: Scaled inputs of shape (n, sequence_length, features)
+            batch_size: Windows per forward pass
         
-        return predictions
+        Returns:
+            Array of predicted close prices, shape (n,)
+        """
+        if self.model is None:
+            raise Exception("Model not loaded. Call load_model() first.")
+        predictions = self.model.predict(np.asarray(windows, dtype=np.float32), batch_size=batch_size, verbose=0)
+        return self.inverse_close(predictions[:, 0])[:, 0]
+    
+    def _forward(self, batch):
+        """Run the model, through the batching scheduler when one is attached"""
+        if self.scheduler is not None:
+            return self.scheduler.predict(self.model, batch)
+        return self.model.predict(batch)
+    
+    def inverse_close(self, values):
+        """Map scaled close-price predictions back to prices"""
+        values = np.asarray(values, dtype=float).reshape(-1)
+        scaled = np.zeros((len(values), self.scaler.n_features_in_))
+        scaled[:, CLOSE_INDEX] = values
+        return self.scaler.inverse_transform(scaled)[:, CLOSE_INDEX].reshape(-1, 1)
     
     def predict_next_days(self, df, days=5):
         """
@@ -81,17 +138,72 @@ class StockPredictor:
             days: Number of days to predict
         
         Returns:
-            Array of predictions
+            Array of scaled close predictions, shape (days, 1)
+        """
+        return self.forecast(self.latest_window(df)[np.newaxis], days)[0].reshape(-1, 1)
+    
+    def predict_next_days_batch(self, dfs, days=5):
+        """
+        Forecast several symbols' horizons in lockstep with this model
+        
+        Args:
+            dfs: List of DataFrames with historical stock data
+            days: Number of days to predict
+        
+        Returns:
+            Array of scaled close predictions, shape (len(dfs), days)
+        """
+        return self.forecast(np.stack([self.latest_window(df) for df in dfs]), days)
+    
+    @stage_timer('predictor', 'prepare')
+    def latest_window(self, df):
+        """Scaled input window ending at the most recent bar"""
+        data = df[self.feature_columns].values[-self.sequence_length:]
+        return self.scaler.transform(data)
+    
+    @stage_timer('predictor', 'forecast')
+    def forecast(self, windows, days):
+        """
+        Autoregressive multi-step forecast for a batch of windows
+        
+        Windows live in one preallocated buffer of sequence_length + days
+        rows; each step reads the trailing window as a view and writes the
+        next row in place, instead of re-allocating the window per step.
+        The model predicts the close only, so each new row carries the
+        previous row's other features forward with the predicted close in
+        the close slot.
+        
+        Args:
+            windows: Scaled inputs of shape (batch, sequence_length, features)
+            days: Number of steps to forecast
+        
+        Returns:
+            Array of scaled close predictions, shape (batch, days)
         """
-        predictions = []
-        current_sequence = self.prepare_data(df)[-1:]
-        
-        for _ in range(days):
-            pred = self.model.predict(current_sequence)
-            predictions.append(pred[0])
-            
-            # Update sequence with prediction
-            current_sequence = np.append(current_sequence[:, 1:, :], 
-                                        pred.reshape(1, 1, -1), axis=1)
-        
-        return np.array(predictions)
+        windows = np.asarray(windows, dtype=np.float32)
+        batch, seq_len, n_features = windows.shape
+        buffer = np.empty((batch, seq_len + days, n_features), dtype=np.float32)
+        buffer[:, :seq_len] = windows
+        forecasts = np.empty((batch, days), dtype=np.float32)
+        
+        for t in range(days):
+            pred = np.asarray(self._step(buffer[:, t:t + seq_len])).reshape(batch, -1)[:, 0]
+            forecasts[:, t] = pred
+            buffer[:, seq_len + t] = buffer[:, seq_len + t - 1]
+            buffer[:, seq_len + t, CLOSE_INDEX] = pred
+        
+        return forecasts
+    
+    @stage_timer('predictor', 'forward')
+    def _step(self, batch):
+        """One forward pass of the forecasting loop"""
+        if self.scheduler is not None:
+            return self.scheduler.predict(self.model, batch)
+        if isinstance(self.model, NumpyCNNLSTM):
+            return self.model.predict_on_batch(batch)
+        if self._compiled is None:
+            # A traced graph call skips predict()'s per-call data-adapter setup
+            import tensorflow as tf
+            model = self.model
+            self._compiled = tf.function(lambda x: model(x, training=False), reduce_retracing=True)
+        return self._compiled(batch).numpy()
@@ -0,0 +1,145 @@
+"""
+Content-addressed cache of backtest results, in memory and on disk
+"""
+import os
+import json
+import hashlib
+import threading
+from services.cache import TTLCache
+from config import Config
+
+# Bump when a change to the strategies or metrics alters results, so that
+# entries computed by older code are never served
+ENGINE_VERSION = 1
+
+
+def data_fingerprint(df):
+    """
+    Hash of a price frame's contents, index and column names
+
+    Any change to the underlying data (a new bar, a revised close) yields
+    a different fingerprint.
+    """
+    import pandas as pd
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def result_key(strategy_name, params, initial_capital, data_hash):
+    """Fingerprint of everything a backtest result depends on"""
+    payload = json.dumps({
+        'engine': ENGINE_VERSION,
+        'strategy': strategy_name,
+        'params': params or {},
+        'initial_capital': float(initial_capital),
+        'data': data_hash,
+    }, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class BacktestResultCache:
+    """
+    Two-tier cache of backtest results keyed by result_key()
+
+    Hot results live in a size-bounded in-memory LRU; every result is also
+    written to <root>/<SYMBOL>[/<scope>]/<data hash>-<key>.json so it
+    survives restarts and is shared between worker processes. Because the
+    key includes the data fingerprint, changed data never hits a stale
+    entry; when a new fingerprint is seen for a symbol and scope, the
+    files computed from its previous data are deleted. The scope names
+    the slice of history a run loaded (e.g. its date range), so runs over
+    different slices of unchanged data do not evict each other.
+    """
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root if root is not None else Config.BACKTEST_CACHE_PATH
+        self.memory = TTLCache(max_bytes if max_bytes is not None else Config.BACKTEST_CACHE_MAX_BYTES,
+                               sizeof=lambda result: len(json.dumps(result, default=float)))
+        self._current = {}  # (symbol, scope) -> latest data hash seen
+        self._lock = threading.Lock()
+        self._counters = {'disk_hits': 0, 'computed': 0, 'invalidated': 0}
+
+    def get_or_compute(self, symbol, strategy_name, params, initial_capital, data_hash, compute, scope=None):
+        """
+        Return the cached result for this backtest, computing it on a miss
+
+        Args:
+            symbol: Stock symbol (groups entries for invalidation)
+            strategy_name: Strategy name
+            params: Dict of strategy parameters
+            initial_capital: Starting capital
+            data_hash: data_fingerprint() of the input prices
+            compute: Zero-argument callable producing the result dict
+            scope: Optional name of the slice of history the prices cover;
+                None for the full history
+
+        Returns:
+            Backtest result dict
+        """
+        directory = self._directory(symbol, scope)
+        self._track_data((symbol, scope), directory, data_hash)
+        key = result_key(strategy_name, params, initial_capital, data_hash)
+        path = os.path.join(directory, f'{data_hash}-{key}.json')
+
+        def load():
+            result = self._read(path)
+            if result is not None:
+                with self._lock:
+                    self._counters['disk_hits'] += 1
+                return result
+            result = compute()
+            self._write(path, result)
+            with self._lock:
+                self._counters['computed'] += 1
+            return result
+
+        return self.memory.get_or_load(key, load, ttl=float('inf'))
+
+    def _track_data(self, tracked, directory, data_hash):
+        with self._lock:
+            if self._current.get(tracked) == data_hash:
+                return
+            self._current[tracked] = data_hash
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if name.endswith('.json') and not name.startswith(data_hash):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                with self._lock:
+                    self._counters['invalidated'] += 1
+
+    def _directory(self, symbol, scope):
+        directory = os.path.join(self.root, _safe_name(symbol))
+        return directory if scope is None else os.path.join(directory, _safe_name(scope))
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, path, result):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(result, f, default=float)
+        os.replace(tmp, path)
+
+    def clear(self):
+        self.memory.clear()
+        with self._lock:
+            self._current.clear()
+
+    def stats(self):
+        """Memory-tier counters plus disk hits, computations and invalidations"""
+        with self._lock:
+            return dict(self.memory.stats(), **self._counters)
+
+
+def _safe_name(symbol):
+    return ''.join(c if c.isalnum() or c in '.-_^' else '_' for c in str(symbol))
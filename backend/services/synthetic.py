@@ -0,0 +1,175 @@
+"""
+Deterministic synthetic OHLCV data for offline runs, tests and benchmarks
+"""
+import zlib
+import numpy as np
+import pandas as pd
+
+EXCHANGE_TZ = 'Asia/Kolkata'
+
+BASE_PRICES = {'RELIANCE.NS': 2800, 'TCS.NS': 3500, 'INFY.NS': 1500, 'HDFCBANK.NS': 1600, 'ITC.NS': 450}
+
+# Calendar days covered by each yfinance period ('max' is treated as 20 years)
+PERIOD_DAYS = {
+    '1d': 1, '5d': 7, '1mo': 30, '3mo': 91, '6mo': 182, '1y': 365, '2y': 730,
+    '5y': 1826, '10y': 3652, 'max': 7305,
+}
+
+# pandas frequency per daily-or-longer interval
+BAR_FREQUENCIES = {'1d': 'B', '5d': '5B', '1wk': 'W-FRI', '1mo': 'BMS', '3mo': 'BQS'}
+
+# Minutes per bar for intraday intervals
+INTRADAY_MINUTES = {'1m': 1, '2m': 2, '5m': 5, '15m': 15, '30m': 30, '60m': 60, '90m': 90, '1h': 60}
+
+# NSE cash session, 09:15 to 15:30 IST
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_MINUTES = 375
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def stable_seed(symbol, salt=0):
+    """Seed derived from the symbol that is the same in every process"""
+    return zlib.crc32(f'{symbol}:{salt}'.encode()) & 0xFFFFFFFF
+
+
+def bar_index(period='1mo', interval='1d', bars=None, end=None):
+    """
+    Timestamps for a period/interval, as yfinance would return them
+
+    Args:
+        period: yfinance period string
+        interval: yfinance interval string
+        bars: Exact number of bars instead of a period
+        end: Last session date (defaults to today)
+
+    Returns:
+        tz-aware DatetimeIndex in exchange time
+    """
+    end = pd.Timestamp(end if end is not None else pd.Timestamp.now(tz=EXCHANGE_TZ).date()).normalize()
+    if end.tz is None:
+        end = end.tz_localize(EXCHANGE_TZ)
+
+    if interval in INTRADAY_MINUTES:
+        step = INTRADAY_MINUTES[interval]
+        per_day = -(-SESSION_MINUTES // step)
+        if bars:
+            n_days = -(-bars // per_day)
+        else:
+            start = end - pd.Timedelta(days=PERIOD_DAYS.get(period, 30) - 1)
+            n_days = max(1, len(pd.bdate_range(start, end)))
+        days = pd.bdate_range(end=end.tz_localize(None), periods=n_days)
+        offsets = SESSION_OPEN + pd.to_timedelta(np.arange(per_day) * step, unit='min')
+        index = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+        index = index.tz_localize(EXCHANGE_TZ)
+        if bars:
+            index = index[-bars:]
+        return index.rename('Datetime')
+
+    freq = BAR_FREQUENCIES.get(interval, 'B')
+    if bars is None and period in ('1d', '5d'):
+        # Trading-day periods count sessions, not calendar days
+        bars = int(period[:-1])
+    if bars:
+        index = pd.date_range(end=end, periods=bars, freq=freq)
+    else:
+        start = end - pd.Timedelta(days=PERIOD_DAYS.get(period, 30) - 1)
+        index = pd.date_range(start=start, end=end, freq=freq)
+    return index.rename('Date')
+
+
+def simulate_ohlcv(rng, n_bars, base_price, annual_vol=0.30, annual_drift=0.10, bars_per_day=1):
+    """
+    Vectorized OHLCV random walk
+
+    Closes follow geometric Brownian motion, anchored so the last close is
+    base_price (today's price level). Each bar opens with a small
+    gap from the previous close; the high/low extend beyond the open/close
+    range by a half-normal excursion scaled with volatility, and volume is
+    lognormal with more activity on large moves.
+
+    Returns:
+        Dict of 'Open', 'High', 'Low', 'Close' (float) and 'Volume' (int64) arrays
+    """
+    bars_per_year = TRADING_DAYS_PER_YEAR * bars_per_day
+    sigma = annual_vol / np.sqrt(bars_per_year)
+    mu = annual_drift / bars_per_year - 0.5 * sigma ** 2
+
+    returns = rng.normal(mu, sigma, n_bars)
+    log_path = np.cumsum(returns)
+    close = base_price * np.exp(log_path - log_path[-1]) if n_bars else np.empty(0)
+    prev_close = np.concatenate((close[:1] * np.exp(-returns[:1]), close[:-1]))
+    open_ = prev_close * np.exp(rng.normal(0.0, sigma * 0.25, n_bars))
+
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    high = body_high * (1 + np.abs(rng.normal(0.0, sigma * 0.5, n_bars)))
+    low = body_low * (1 - np.abs(rng.normal(0.0, sigma * 0.5, n_bars)))
+
+    activity = 1 + 4 * np.abs(returns) / sigma
+    volume = rng.lognormal(np.log(2_000_000 / bars_per_day), 0.35, n_bars) * activity
+
+    return {
+        'Open': np.round(open_, 2),
+        'High': np.round(high, 2),
+        'Low': np.round(low, 2),
+        'Close': np.round(close, 2),
+        'Volume': volume.astype(np.int64),
+    }
+
+
+def generate_ohlcv(symbol, period='1mo', interval='1d', bars=None, end=None, seed=None):
+    """
+    Synthetic bars for one symbol, shaped like yf.Ticker.history()
+
+    The same symbol, period, interval and end date always produce the
+    same data, in any process.
+
+    Args:
+        symbol: Stock symbol (selects the base price and seed)
+        period: yfinance period string, up to 'max'
+        interval: Daily-or-longer or intraday yfinance interval
+        bars: Exact number of bars instead of a period
+        end: Last session date (defaults to today)
+        seed: Override the symbol-derived seed
+
+    Returns:
+        DataFrame indexed by a tz-aware DatetimeIndex
+    """
+    index = bar_index(period, interval, bars, end)
+    rng = np.random.default_rng(stable_seed(symbol) if seed is None else seed)
+    bars_per_day = -(-SESSION_MINUTES // INTRADAY_MINUTES[interval]) if interval in INTRADAY_MINUTES else 1
+    columns = simulate_ohlcv(rng, len(index), BASE_PRICES.get(symbol, 1000), bars_per_day=bars_per_day)
+    return pd.DataFrame(columns, index=index)
+
+
+def generate_universe(n_symbols, period='1y', interval='1d', bars=None, end=None, prefix='SYN'):
+    """
+    Synthetic bars for a universe of symbols sharing one calendar
+
+    Each symbol's series is identical to generate_ohlcv() for that symbol.
+
+    Returns:
+        Dict mapping symbol to DataFrame
+    """
+    index = bar_index(period, interval, bars, end)
+    bars_per_day = -(-SESSION_MINUTES // INTRADAY_MINUTES[interval]) if interval in INTRADAY_MINUTES else 1
+    universe = {}
+    for i in range(n_symbols):
+        symbol = f'{prefix}{i:04d}.NS'
+        rng = np.random.default_rng(stable_seed(symbol))
+        columns = simulate_ohlcv(rng, len(index), BASE_PRICES.get(symbol, 1000), bars_per_day=bars_per_day)
+        universe[symbol] = pd.DataFrame(columns, index=index)
+    return universe
+
+
+def generate_close_matrix(n_bars, n_symbols, seed=0, base_price=1000.0, annual_vol=0.30):
+    """
+    Close prices for many symbols in one pass, shape (n_bars, n_symbols)
+
+    For high-volume benchmarks where per-symbol seeding is not needed.
+    """
+    rng = np.random.default_rng(seed)
+    sigma = annual_vol / np.sqrt(TRADING_DAYS_PER_YEAR)
+    returns = rng.normal(0.10 / TRADING_DAYS_PER_YEAR - 0.5 * sigma ** 2, sigma, (n_bars, n_symbols))
+    return base_price * np.exp(np.cumsum(returns, axis=0))
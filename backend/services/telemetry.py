@@ -0,0 +1,204 @@
+"""
+Latency histograms, stage timers and an on-demand sampling profiler
+"""
+import os
+import sys
+import time
+import threading
+import itertools
+from collections import Counter, deque
+from contextlib import contextmanager
+from config import Config
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by label values
+
+    Observations only take a lock and bump a few integers, so it is cheap
+    enough to sit on hot paths.
+    """
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record one value for the given label values (in labelnames order)"""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """{labels: {'buckets': cumulative counts, 'sum', 'count'}}"""
+        with self._lock:
+            return {labels: {'buckets': list(itertools.accumulate(counts)), 'sum': total, 'count': count}
+                    for labels, (counts, total, count) in self._series.items()}
+
+    def render(self):
+        """Prometheus text exposition lines"""
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.snapshot().items()):
+            pairs = list(zip(self.labelnames, labels))
+            for bound, count in zip(self.buckets, series['buckets']):
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', repr(float(bound)))])} {count}")
+            lines.append(f"{self.name}_bucket{_labels(pairs + [('le', '+Inf')])} {series['count']}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {series['sum']!r}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {series['count']}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Registry:
+    """Named histograms, rendered together for the metrics endpoint"""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Return the histogram called name, creating it on first use"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+            return self._metrics[name]
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+    def clear(self):
+        with self._lock:
+            for metric in self._metrics.values():
+                metric.clear()
+
+
+REGISTRY = Registry()
+REQUEST_SECONDS = REGISTRY.histogram(
+    'finanz_http_request_duration_seconds', 'API request latency', ('method', 'endpoint', 'status')
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    'finanz_stage_duration_seconds', 'Time spent in instrumented processing stages', ('component', 'stage')
+)
+
+
+@contextmanager
+def stage_timer(component, stage):
+    """
+    Time the enclosed block into the stage histogram
+
+    Args:
+        component: Service doing the work ('data_fetcher', 'backtester', ...)
+        stage: Step within it; keep the set of names small and fixed
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, component, stage)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for selected threads
+
+    While a thread is registered, a shared background thread records its
+    Python stack every interval seconds. Stacks are kept as collapsed
+    "frame;frame;frame count" lines, the input format of flame graph
+    tools. Finished profiles worth keeping are held in a bounded list.
+    """
+    def __init__(self, interval=None, max_profiles=None):
+        self.interval = (Config.PROFILER_INTERVAL_MS if interval is None else interval * 1000) / 1000
+        self._active = {}
+        self._profiles = deque(maxlen=max_profiles or Config.PROFILER_MAX_PROFILES)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self, thread_id=None):
+        """Begin sampling a thread (default: the calling one)"""
+        thread_id = threading.get_ident() if thread_id is None else thread_id
+        with self._lock:
+            self._active[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def stop(self, thread_id=None):
+        """Stop sampling a thread; returns its stack counts"""
+        thread_id = threading.get_ident() if thread_id is None else thread_id
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def keep(self, samples, **details):
+        """Store a finished profile; returns its id"""
+        with self._lock:
+            profile_id = next(self._ids)
+            self._profiles.append(dict(details, id=profile_id, created=time.time(),
+                                       samples=sum(samples.values()), stacks=samples))
+        return profile_id
+
+    def profiles(self):
+        """Summaries of the kept profiles, newest first"""
+        with self._lock:
+            return [{key: value for key, value in profile.items() if key != 'stacks'}
+                    for profile in reversed(self._profiles)]
+
+    def collapsed(self, profile_id):
+        """A kept profile as collapsed stack lines, or None if it is gone"""
+        with self._lock:
+            profile = next((p for p in self._profiles if p['id'] == profile_id), None)
+        if profile is None:
+            return None
+        return ''.join(f'{stack} {count}\n' for stack, count in profile['stacks'].most_common())
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._wake.wait()
+                targets = list(self._active)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id in targets:
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own and thread_id in self._active:
+                        self._active[thread_id][_collapse(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
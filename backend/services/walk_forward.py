@@ -0,0 +1,147 @@
+"""
+Batched and walk-forward model predictions for backtesting
+"""
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from services.windowing import sliding_windows
+from config import Config
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def predict_closes(predictor, features, batch_size=None):
+    """
+    Next-bar close predictions for every bar of a history, in batched passes
+
+    Args:
+        predictor: StockPredictor (or anything with sequence_length, scaler
+            and predict_windows())
+        features: Array of shape (bars, features) in the model's feature order
+        batch_size: Windows per forward pass
+
+    Returns:
+        Array of length bars: entry t is the close predicted for bar t + 1
+        from the window ending at bar t, NaN where no full window exists
+    """
+    seq = predictor.sequence_length
+    predictions = np.full(len(features), np.nan)
+    if len(features) < seq:
+        return predictions
+    windows = sliding_windows(predictor.scaler.transform(features), seq)
+    predictions[seq - 1:] = predictor.predict_windows(windows, batch_size or Config.WALK_FORWARD_BATCH_SIZE)
+    return predictions
+
+
+def walk_forward_folds(n_bars, train_window, retrain_every):
+    """(train_start, test_start, test_end) bar ranges of each walk-forward fold"""
+    return [(test_start - train_window, test_start, min(test_start + retrain_every, n_bars))
+            for test_start in range(train_window, n_bars, retrain_every)]
+
+
+def walk_forward_predictions(features, sequence_length=60, train_window=None, retrain_every=None,
+                             epochs=None, batch_size=None, max_workers=None, model_factory=None):
+    """
+    Next-bar close predictions from models retrained on rolling windows
+
+    Fold k fits a fresh model and scaler on the train_window bars before
+    its test segment and predicts the following retrain_every bars, so no
+    prediction uses data from its own future. Folds are independent and
+    are trained in parallel worker processes.
+
+    Args:
+        features: Array of shape (bars, features); column 3 is the close
+        sequence_length: Input window length
+        train_window: Bars each fold trains on
+        retrain_every: Bars predicted by each fold before retraining
+        epochs: Training epochs per fold
+        batch_size: Training and prediction batch size
+        max_workers: Worker processes; 1 trains in-process
+        model_factory: Picklable callable(sequence_length, n_features)
+            returning a compiled Keras model (defaults to CNNLSTMModel)
+
+    Returns:
+        Tuple of (predictions, folds): predictions as in predict_closes(),
+        NaN before the first test segment
+    """
+    features = np.asarray(features, dtype=float)
+    train_window = train_window or Config.WALK_FORWARD_TRAIN_WINDOW
+    retrain_every = retrain_every or Config.WALK_FORWARD_RETRAIN_EVERY
+    epochs = epochs or Config.WALK_FORWARD_EPOCHS
+    batch_size = batch_size or Config.WALK_FORWARD_BATCH_SIZE
+    model_factory = model_factory or build_cnn_lstm
+    if train_window <= sequence_length + 1:
+        raise ValueError('train_window must be longer than sequence_length + 1')
+
+    folds = walk_forward_folds(len(features), train_window, retrain_every)
+    tasks = [(features[train_start:test_end], test_start - train_start, sequence_length,
+              epochs, batch_size, model_factory, seed)
+             for seed, (train_start, test_start, test_end) in enumerate(folds)]
+
+    max_workers = max_workers or Config.WALK_FORWARD_WORKERS or os.cpu_count()
+    if max_workers == 1 or len(tasks) <= 1:
+        segments = [_fit_and_predict(*task) for task in tasks]
+    else:
+        workers = min(max_workers, len(tasks))
+        # TensorFlow is not fork-safe once initialized, so workers are spawned
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=limit_tf_threads,
+                                 initargs=(max(1, (os.cpu_count() or 1) // workers),)) as pool:
+            segments = list(pool.map(_fit_and_predict, *zip(*tasks)))
+
+    predictions = np.full(len(features), np.nan)
+    for (_, test_start, test_end), segment in zip(folds, segments):
+        predictions[test_start:test_end] = segment
+    return predictions, folds
+
+
+def build_cnn_lstm(sequence_length, n_features):
+    """Default walk-forward model: the repo's CNN-LSTM architecture"""
+    if REPO_ROOT not in sys.path:
+        sys.path.append(REPO_ROOT)
+    from models.cnn_lstm_model import CNNLSTMModel
+    return CNNLSTMModel(sequence_length=sequence_length, n_features=n_features).build_model()
+
+
+def limit_tf_threads(intra_op_threads, inter_op_threads=1):
+    """
+    Cap TensorFlow's thread pools in a worker process
+
+    Must run before TensorFlow executes anything in the process, e.g. as a
+    process pool initializer, so that parallel workers share the cores
+    instead of each sizing its pools to the whole machine.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(intra_op_threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def _fit_and_predict(features, split, sequence_length, epochs, batch_size, model_factory, seed):
+    """
+    Train on features[:split] and predict the next close for bars split onward
+
+    The scaler is fit on the training bars only.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow import keras
+
+    keras.utils.set_random_seed(seed)
+    scaler = MinMaxScaler().fit(features[:split])
+    scaled = scaler.transform(features)
+
+    train = scaled[:split]
+    X = sliding_windows(train, sequence_length)[:-1]
+    y = train[sequence_length:, 3]
+    model = model_factory(sequence_length, features.shape[1])
+    model.fit(np.ascontiguousarray(X), y, epochs=epochs, batch_size=batch_size, verbose=0)
+
+    windows = sliding_windows(scaled, sequence_length)[split - sequence_length + 1:]
+    predicted = model.predict(windows, batch_size=batch_size, verbose=0).reshape(-1)
+
+    # Map scaled closes back to prices with this fold's scaler
+    padded = np.zeros((len(predicted), features.shape[1]))
+    padded[:, 3] = predicted
+    return scaler.inverse_transform(padded)[:, 3]
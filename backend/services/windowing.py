@@ -0,0 +1,55 @@
+"""
+Sliding-window sequence builders for model input
+"""
+import numpy as np
+
+
+def sliding_windows(data, window):
+    """
+    Build overlapping windows over the first axis without copying
+
+    windows[i] is data[i:i + window]. The result is a read-only strided
+    view onto ``data``, so it costs no memory beyond the input itself.
+
+    Args:
+        data: Array of shape (N, features) or (N,)
+        window: Number of time steps per window
+
+    Returns:
+        View of shape (N - window + 1, window, features) or (N - window + 1, window)
+    """
+    data = np.asarray(data)
+    if len(data) < window:
+        return np.empty((0, window) + data.shape[1:], dtype=data.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(data, window, axis=0)
+    # sliding_window_view puts the window axis last; move it next to the batch axis
+    return np.moveaxis(windows, -1, 1)
+
+
+def window_batches(data, window, batch_size, targets=None, stop=None):
+    """
+    Lazily yield contiguous batches of windows
+
+    Only one batch of windows is materialized at a time, which keeps peak
+    memory at batch_size * window * features regardless of history length.
+
+    Args:
+        data: Array of shape (N, features)
+        window: Number of time steps per window
+        batch_size: Windows per batch
+        targets: Optional array aligned with the windows; yielded alongside
+        stop: Only yield the first ``stop`` windows
+
+    Yields:
+        Batches of shape (<= batch_size, window, features), or
+        (batch, targets) tuples when targets is given
+    """
+    windows = sliding_windows(data, window)
+    total = len(windows) if stop is None else min(stop, len(windows))
+    for start in range(0, total, batch_size):
+        end = min(start + batch_size, total)
+        batch = np.ascontiguousarray(windows[start:end])
+        if targets is None:
+            yield batch
+        else:
+            yield batch, targets[start:end]
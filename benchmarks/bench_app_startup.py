@@ -0,0 +1,113 @@
+"""
+Benchmark: app startup time and per-worker memory, with and without preloading
+
+Each mode runs in a fresh interpreter that builds the app, forks worker
+processes the way a pre-forking server does, and has every worker serve
+price and prediction requests. Workers report their RSS, PSS (shared
+pages split between the processes mapping them) and private memory.
+Models are full-size CNN-LSTM inference artifacts with random weights,
+so no network access or TensorFlow is needed.
+
+Usage:
+    python benchmarks/bench_app_startup.py [--workers 4] [--symbols TCS.NS,INFY.NS]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+from benchmarks.fixtures import write_model_artifact
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+CHILD = '''
+import json, os, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app(preload=sys.argv[1] == 'preload')
+startup = time.perf_counter() - start
+symbols = os.environ['PRELOAD_SYMBOLS'].split(',')
+
+def memory():
+    fields = {}
+    for line in open('/proc/self/smaps_rollup'):
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'private': fields['Private_Clean'] + fields['Private_Dirty']}
+
+# Workers stay alive until the parent closes this pipe, so that every PSS
+# reading splits the shared pages across all of them
+release_read, release_write = os.pipe()
+pipes = []
+for _ in range(int(sys.argv[2])):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.close(release_write)
+        client = app.test_client()
+        start = time.perf_counter()
+        for symbol in symbols:
+            assert client.get(f'/api/stock/price/{symbol}').status_code == 200
+            assert client.post(f'/api/stock/predict/{symbol}', json={'days': 5}).status_code == 200
+        first_requests = time.perf_counter() - start
+        os.write(write_fd, json.dumps(dict(memory(), first_requests=first_requests)).encode())
+        os.close(write_fd)
+        os.read(release_read, 1)
+        os._exit(0)
+    os.close(write_fd)
+    pipes.append((pid, read_fd))
+os.close(release_read)
+workers = []
+for pid, read_fd in pipes:
+    with os.fdopen(read_fd) as f:
+        workers.append(json.loads(f.read()))
+os.close(release_write)
+for pid, _ in pipes:
+    os.waitpid(pid, 0)
+print(json.dumps({'startup': startup, 'workers': workers}))
+'''
+
+
+def measure(mode, workers, env):
+    output = subprocess.run([sys.executable, '-c', CHILD, mode, str(workers)], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--symbols', default='TCS.NS,INFY.NS,RELIANCE.NS')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        symbols = args.symbols.split(',')
+        for i, symbol in enumerate(symbols):
+            os.makedirs(os.path.join(root, 'models', symbol))
+            write_model_artifact(os.path.join(root, 'models', symbol, 'cnn_lstm_model.npz'), seed=i)
+        env = dict(os.environ, MODEL_PATH=os.path.join(root, 'models'), PRELOAD_SYMBOLS=args.symbols,
+                   OHLCV_STORE_PATH=os.path.join(root, 'ohlcv'))
+
+        print(f"{'mode':>8} {'startup s':>10} {'first req s':>12} {'RSS MB':>8} {'PSS MB':>8} {'private MB':>11}")
+        for mode in ('lazy', 'preload'):
+            result = measure(mode, args.workers, env)
+            mean = {key: np.mean([w[key] for w in result['workers']]) for key in result['workers'][0]}
+            print(f"{mode:>8} {result['startup']:>10.2f} {mean['first_requests']:>12.2f} {mean['rss']:>8.0f} "
+                  f"{mean['pss']:>8.0f} {mean['private']:>11.0f}")
+        print(f"(means over {args.workers} workers serving {len(symbols)} symbols)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
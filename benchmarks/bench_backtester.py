@@ -0,0 +1,45 @@
+"""
+Benchmark: vectorized vs. bar-by-bar SMA crossover backtest
+
+Usage:
+    python benchmarks/bench_backtester.py [--sizes 10000 50000 100000]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import time
+from services.backtester import Backtester
+from benchmarks.fixtures import make_price_frame
+
+
+def time_strategy(strategy, df, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        portfolio = {'capital': 100000, 'shares': 0, 'trades': [], 'portfolio_value': []}
+        frame = df.copy()
+        start = time.perf_counter()
+        strategy(frame, portfolio)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    backtester = Backtester('BENCH', None, None)
+    print(f"{'bars':>10} {'loop (s)':>12} {'vectorized (s)':>16} {'speedup':>10}")
+    for n_bars in args.sizes:
+        df = make_price_frame(n_bars)
+        loop_time = time_strategy(backtester._sma_crossover_strategy_loop, df, 1)
+        vec_time = time_strategy(backtester._sma_crossover_strategy, df, args.repeats)
+        print(f"{n_bars:>10} {loop_time:>12.3f} {vec_time:>16.4f} {loop_time / vec_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
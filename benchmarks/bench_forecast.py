@@ -0,0 +1,74 @@
+"""
+Benchmark: multi-step forecasting, per-step predict() vs. compiled buffered loop
+
+Usage:
+    python benchmarks/bench_forecast.py [--days 30] [--symbols 16]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from models.cnn_lstm_model import CNNLSTMModel
+from services.predictor import StockPredictor, CLOSE_INDEX
+
+
+def make_ohlcv_frame(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 1000.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+    return pd.DataFrame({
+        'Open': close * 0.99, 'High': close * 1.02, 'Low': close * 0.98,
+        'Close': close, 'Volume': rng.uniform(1e6, 1e7, n_bars),
+    })
+
+
+def naive_forecast(predictor, df, days):
+    """The previous implementation: predict() per day plus np.append"""
+    sequence = predictor.latest_window(df)[np.newaxis]
+    predictions = []
+    for _ in range(days):
+        pred = predictor.model.predict(sequence, verbose=0)
+        predictions.append(pred[0])
+        next_row = sequence[:, -1:, :].copy()
+        next_row[0, 0, CLOSE_INDEX] = pred[0, 0]
+        sequence = np.append(sequence[:, 1:, :], next_row, axis=1)
+    return np.array(predictions)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--symbols', type=int, default=16)
+    args = parser.parse_args()
+
+    frames = [make_ohlcv_frame(300, seed) for seed in range(args.symbols)]
+    trainer = CNNLSTMModel()
+    trainer.prepare_data(frames[0].copy())
+    predictor = StockPredictor()
+    predictor.model = trainer.build_model()
+    predictor.scaler = trainer.scaler
+    predictor.predict_next_days(frames[0], days=2)  # trace the compiled call
+
+    naive = timed(lambda: [naive_forecast(predictor, df, args.days) for df in frames])
+    fast = timed(lambda: [predictor.predict_next_days(df, args.days) for df in frames])
+    batched = timed(lambda: predictor.predict_next_days_batch(frames, args.days))
+
+    print(f"{args.symbols} symbols x {args.days}-day horizon")
+    print(f"{'mode':<28} {'total (s)':>10} {'speedup':>9}")
+    for name, elapsed in [('predict() per step', naive), ('compiled loop per symbol', fast),
+                          ('compiled loop, lockstep', batched)]:
+        print(f"{name:<28} {elapsed:>10.3f} {naive / elapsed:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: per-request vs. micro-batched CNN-LSTM inference
+
+Usage:
+    python benchmarks/bench_inference.py [--clients 32] [--requests 20]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import threading
+import time
+import numpy as np
+from models.cnn_lstm_model import CNNLSTMModel
+from services.inference_scheduler import InferenceScheduler
+
+
+def run_load(predict, n_clients, n_requests):
+    """Fire n_requests sequential predictions from each of n_clients threads"""
+    latencies = []
+    lock = threading.Lock()
+    rng = np.random.default_rng(0)
+    window = rng.random((1, 60, 5), dtype=np.float32)
+
+    def client():
+        local = []
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            predict(window)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(n_clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    model = CNNLSTMModel().build_model()
+    model.predict_on_batch(np.zeros((1, 60, 5), dtype=np.float32))  # warm up
+    lock = threading.Lock()
+
+    def direct(window):
+        with lock:  # Keras models are not safe to call from many threads at once
+            return model.predict(window, verbose=0)
+
+    scheduler = InferenceScheduler(max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+    print(f"{'mode':<12} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, predict in [('per-request', direct),
+                          ('batched', lambda window: scheduler.predict(model, window))]:
+        throughput, p50, p99 = run_load(predict, args.clients, args.requests)
+        print(f"{name:<12} {throughput:>10.1f} {p50:>10.1f} {p99:>10.1f}")
+    print(f"mean batch size: {scheduler.stats()['mean_batch_rows']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark: scoring thousands of equity curves, batched vs one curve at a time
+
+Usage:
+    python benchmarks/bench_metrics.py [--curves 100 1000 5000] [--bars 2520]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import time
+from services.metrics import equity_metrics, metrics_table
+from services.synthetic import generate_close_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--curves', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--bars', type=int, default=2520, help='Daily bars (2520 is ~10 years)')
+    args = parser.parse_args()
+
+    print(f"{'curves':>8} {'bars':>8} {'batched s':>10} {'table s':>9} {'per-curve s':>12}")
+    for n_curves in args.curves:
+        curves = generate_close_matrix(args.bars, n_curves, seed=n_curves).T * 100
+        start = time.perf_counter()
+        equity_metrics(curves, 100_000)
+        batched = time.perf_counter() - start
+        start = time.perf_counter()
+        metrics_table(curves, 100_000)
+        table = time.perf_counter() - start
+        start = time.perf_counter()
+        for row in curves:
+            metrics_table(row, 100_000)
+        per_curve = time.perf_counter() - start
+        print(f"{n_curves:>8} {args.bars:>8} {batched:>10.3f} {table:>9.3f} {per_curve:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: ML strategy backtest, one predict() per bar vs. batched predictions
+
+Usage:
+    python benchmarks/bench_ml_strategy.py [--bars 1000] [--naive-bars 200]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import time
+from models.cnn_lstm_model import CNNLSTMModel
+from services.backtester import Backtester, ML_FEATURE_COLUMNS
+from services.predictor import StockPredictor
+from services.synthetic import generate_ohlcv
+
+
+def naive_predictions(predictor, features):
+    """The per-bar approach: one predict() call for every window"""
+    seq = predictor.sequence_length
+    scaled = predictor.scaler.transform(features)
+    return [predictor.model.predict(scaled[None, t - seq + 1:t + 1], verbose=0)[0, 0]
+            for t in range(seq - 1, len(features))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=1000)
+    parser.add_argument('--naive-bars', type=int, default=200,
+                        help='Bars timed for the per-bar baseline (extrapolated to --bars)')
+    args = parser.parse_args()
+
+    df = generate_ohlcv('BENCH.NS', bars=args.bars).reset_index(drop=True)
+    trainer = CNNLSTMModel()
+    trainer.prepare_data(df.copy())
+    predictor = StockPredictor()
+    predictor.model = trainer.build_model()
+    predictor.scaler = trainer.scaler
+
+    backtester = Backtester('BENCH.NS', None, None, predictor=predictor)
+    backtester._load_data = lambda warmup=0: df.copy()
+    backtester.run_strategy('ml_predictions')  # warm up
+    results = backtester.run_strategy('ml_predictions')
+    timings = results['timings']
+
+    features = df[ML_FEATURE_COLUMNS].to_numpy(dtype=float)[:args.naive_bars + predictor.sequence_length - 1]
+    start = time.perf_counter()
+    naive_predictions(predictor, features)
+    per_bar = (time.perf_counter() - start) / args.naive_bars
+    naive_total = per_bar * timings['bars_predicted']
+
+    print(f"{timings['bars_predicted']} bars predicted")
+    print(f"{'phase':<34} {'seconds':>9}")
+    print(f"{'per-bar predict() (extrapolated)':<34} {naive_total:>9.3f}")
+    print(f"{'batched prediction':<34} {timings['prediction_seconds']:>9.3f}")
+    print(f"{'vectorized simulation':<34} {timings['simulation_seconds']:>9.4f}")
+    print(f"prediction speedup: {naive_total / timings['prediction_seconds']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: Keras vs. NumPy inference: startup time, memory and call latency
+
+A CNN-LSTM is saved both ways, then each backend is loaded in a fresh
+subprocess so its import cost and RSS are measured alone.
+
+Usage:
+    python benchmarks/bench_numpy_inference.py [--calls 200] [--batch 64]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import json
+import shutil
+import subprocess
+import tempfile
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+CHILD = '''
+import json, resource, sys, time
+import numpy as np
+start = time.perf_counter()
+from services.predictor import StockPredictor
+predictor = StockPredictor(sys.argv[1])
+startup = time.perf_counter() - start
+rng = np.random.default_rng(0)
+timings = {}
+for rows in (1, int(sys.argv[3])):
+    x = rng.random((rows, 60, 5), dtype=np.float32)
+    predictor._step(x)
+    start = time.perf_counter()
+    for _ in range(int(sys.argv[2])):
+        predictor._step(x)
+    timings[rows] = (time.perf_counter() - start) / int(sys.argv[2]) * 1000
+# ru_maxrss carries over the parent's peak across fork/exec, so prefer VmHWM
+try:
+    rss = next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmHWM')) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({'startup': startup, 'rss': rss, 'latency': timings}))
+'''
+
+
+def measure(path, calls, batch):
+    output = subprocess.run([sys.executable, '-c', CHILD, path, str(calls), str(batch)], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=64)
+    args = parser.parse_args()
+
+    from models.cnn_lstm_model import CNNLSTMModel
+    from services.numpy_model import inference_artifact_path
+    root = tempfile.mkdtemp()
+    try:
+        model = CNNLSTMModel()
+        model.scaler.fit(np.random.default_rng(0).random((100, 5)))
+        model.build_model()
+        h5 = os.path.join(root, 'cnn_lstm_model.h5')
+        model.save_model(h5)
+        model.export_inference(inference_artifact_path(h5))
+
+        print(f"{'backend':>8} {'startup s':>10} {'RSS MB':>8} {'1-row ms':>9} {f'{args.batch}-row ms':>10}")
+        for name, path in (('keras', h5), ('numpy', inference_artifact_path(h5))):
+            result = measure(path, args.calls, args.batch)
+            latency = result['latency']
+            print(f"{name:>8} {result['startup']:>10.2f} {result['rss']:>8.0f} "
+                  f"{latency['1']:>9.2f} {latency[str(args.batch)]:>10.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
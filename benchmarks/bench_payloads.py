@@ -0,0 +1,59 @@
+"""
+Benchmark: records vs. columnar JSON payloads for prices and backtest results
+
+Usage:
+    python benchmarks/bench_payloads.py [--period max] [--repeats 5]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import gzip
+import json
+import time
+import pandas as pd
+from services.backtester import Backtester
+from services.data_fetcher import DataFetcher
+from services.encoding import records_to_columns, backtest_to_columns, dumps, orjson
+
+
+def best_time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, records_fn, columnar_fn, repeats):
+    # The current format is what flask.jsonify produces: json.dumps of the records
+    records_time, records_body = best_time(lambda: json.dumps(records_fn()).encode(), repeats)
+    columnar_time, columnar_body = best_time(lambda: dumps(columnar_fn()), repeats)
+    for label, elapsed, body in [('records', records_time, records_body),
+                                 ('columnar', columnar_time, columnar_body)]:
+        gz_time, gz_body = best_time(lambda: gzip.compress(body, compresslevel=5), repeats)
+        print(f"{name:<10} {label:<9} {len(body) / 1024:>10.1f} {len(gz_body) / 1024:>10.1f} "
+              f"{elapsed * 1000:>12.2f} {gz_time * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--period', default='max')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    records = DataFetcher(store=False)._generate_mock_data('RELIANCE.NS', args.period)
+    backtester = Backtester('RELIANCE.NS', None, None)
+    frame = pd.DataFrame(records).set_index('Date')
+    results = backtester._run_on_data(frame, 'sma_crossover', {})
+
+    print(f"{len(records)} bars, encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'payload':<10} {'format':<9} {'size (KB)':>10} {'gzip (KB)':>10} {'encode (ms)':>12} {'gzip (ms)':>10}")
+    report('prices', lambda: records, lambda: records_to_columns(records, 'Date'), args.repeats)
+    report('backtest', lambda: results, lambda: backtest_to_columns(results), args.repeats)
+
+
+if __name__ == '__main__':
+    main()
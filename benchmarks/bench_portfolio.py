@@ -0,0 +1,37 @@
+"""
+Benchmark: portfolio backtest over hundreds of symbols and decades of bars
+
+Usage:
+    python benchmarks/bench_portfolio.py [--symbols 100 500] [--bars 7500]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import time
+import pandas as pd
+from services.portfolio_backtester import PortfolioBacktester
+from services.synthetic import generate_close_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[50, 100, 500])
+    parser.add_argument('--bars', type=int, default=7500, help='Daily bars (7500 is ~30 years)')
+    args = parser.parse_args()
+
+    dates = pd.bdate_range('1995-01-02', periods=args.bars).strftime('%Y-%m-%d')
+    print(f"{'symbols':>8} {'bars':>8} {'trades':>8} {'seconds':>9}")
+    for n_symbols in args.symbols:
+        close = generate_close_matrix(args.bars, n_symbols, seed=n_symbols)
+        symbols = [f'SYN{j:04d}.NS' for j in range(n_symbols)]
+        backtester = PortfolioBacktester(symbols, None, None, initial_capital=10_000_000)
+        start = time.perf_counter()
+        results = backtester.run_on_prices(dates, close, 'sma_crossover')
+        elapsed = time.perf_counter() - start
+        print(f"{n_symbols:>8} {args.bars:>8} {len(results['trades']):>8} {elapsed:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
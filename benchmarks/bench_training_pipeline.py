@@ -0,0 +1,87 @@
+"""
+Benchmark: materialized training arrays vs. the streaming tf.data pipeline
+
+Each mode runs in a fresh subprocess so its peak RSS is measured alone.
+Throughput is windows per second through one pass over the input (and,
+with --fit, through one training epoch of the CNN-LSTM).
+
+Usage:
+    python benchmarks/bench_training_pipeline.py [--symbols 20] [--bars 2500] [--fit]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import resource
+import subprocess
+import time
+
+
+def run_mode(mode, n_symbols, bars, batch_size, fit):
+    """Build the training input in one mode; prints 'windows seconds fit_seconds peak_mb'"""
+    import numpy as np
+    from models.cnn_lstm_model import CNNLSTMModel
+    from services.synthetic import generate_ohlcv
+
+    frames = [generate_ohlcv(f'SYN{j:03d}.NS', bars=bars).reset_index(drop=True) for j in range(n_symbols)]
+    model = CNNLSTMModel()
+    start = time.perf_counter()
+    if mode == 'materialized':
+        # The current path: prepare_data() per symbol, concatenated for fit()
+        parts = [model.prepare_data(df.copy()) for df in frames]
+        X = np.concatenate([p[0] for p in parts])
+        y = np.concatenate([p[1] for p in parts])
+        # Batched as Keras does for in-memory arrays, which copies them into tensors
+        import tensorflow as tf
+        windows = 0
+        for batch, _ in tf.data.Dataset.from_tensor_slices((X, y)).batch(batch_size):
+            windows += len(batch)
+        train = (X, y)
+    else:
+        train_ds, _ = model.prepare_datasets(frames, batch_size=batch_size)
+        windows = 0
+        for batch, _ in train_ds:
+            windows += len(batch)
+        train = (train_ds, None)
+    elapsed = time.perf_counter() - start
+
+    fit_seconds = 0.0
+    if fit:
+        model.build_model()
+        start = time.perf_counter()
+        model.model.fit(train[0], train[1], batch_size=batch_size if mode == 'materialized' else None,
+                        epochs=1, verbose=0)
+        fit_seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    print(windows, elapsed, fit_seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--bars', type=int, default=2500)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--fit', action='store_true', help='Also time one training epoch')
+    parser.add_argument('--mode', choices=['materialized', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.symbols, args.bars, args.batch_size, args.fit)
+        return
+
+    print(f"{'mode':>13} {'windows':>9} {'input win/s':>12} {'fit win/s':>10} {'peak RSS MB':>12}")
+    for mode in ('materialized', 'streaming'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--symbols', str(args.symbols),
+             '--bars', str(args.bars), '--batch-size', str(args.batch_size)] + (['--fit'] if args.fit else []),
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        windows, seconds, fit_seconds, peak = int(output[-4]), float(output[-3]), float(output[-2]), float(output[-1])
+        fit_rate = f'{windows / fit_seconds:>10.0f}' if fit_seconds else f"{'-':>10}"
+        print(f"{mode:>13} {windows:>9} {windows / seconds:>12.0f} {fit_rate} {peak:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
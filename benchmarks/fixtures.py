@@ -0,0 +1,49 @@
+"""
+Generated price histories and models shared by the benchmarks
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import numpy as np
+from services.data_fetcher import DataFetcher
+from services.numpy_model import save_inference_artifact
+from services.synthetic import generate_ohlcv
+
+
+def make_price_frame(n_bars, symbol='BENCH.NS'):
+    """Minute bars, so that 100k-bar series stay within a realistic calendar"""
+    return generate_ohlcv(symbol, interval='1m', bars=n_bars).reset_index(drop=True)
+
+
+class FixtureFetcher(DataFetcher):
+    """DataFetcher whose upstream serves generated daily bars instead of Yahoo Finance"""
+    def __init__(self, n_bars, **kwargs):
+        super().__init__(**kwargs)
+        self.n_bars = n_bars
+        self.downloads = 0
+
+    def _download(self, symbol, interval, **kwargs):
+        self.downloads += 1
+        return generate_ohlcv(symbol, interval=interval, bars=self.n_bars)
+
+
+def write_model_artifact(path, seed=0):
+    """Inference artifact with random weights in the CNNLSTMModel layer layout"""
+    rng = np.random.default_rng(seed)
+    w = lambda *shape: rng.normal(0, 0.05, shape)
+    lstm = {'activation': 'tanh', 'recurrent_activation': 'sigmoid'}
+    layers = [
+        ({'type': 'conv1d', 'activation': 'relu'}, {'kernel': w(3, 5, 64), 'bias': w(64)}),
+        ({'type': 'max_pool1d', 'pool_size': 2, 'strides': 2}, {}),
+        ({'type': 'conv1d', 'activation': 'relu'}, {'kernel': w(3, 64, 128), 'bias': w(128)}),
+        ({'type': 'max_pool1d', 'pool_size': 2, 'strides': 2}, {}),
+        (dict(lstm, type='lstm', return_sequences=True),
+         {'kernel': w(128, 512), 'recurrent_kernel': w(128, 512), 'bias': w(512)}),
+        (dict(lstm, type='lstm', return_sequences=False),
+         {'kernel': w(128, 512), 'recurrent_kernel': w(128, 512), 'bias': w(512)}),
+        ({'type': 'dense', 'activation': 'relu'}, {'kernel': w(128, 64), 'bias': w(64)}),
+        ({'type': 'dense', 'activation': 'relu'}, {'kernel': w(64, 32), 'bias': w(32)}),
+        ({'type': 'dense', 'activation': 'linear'}, {'kernel': w(32, 1), 'bias': w(1)}),
+    ]
+    save_inference_artifact(path, layers, (60, 5), np.full(5, -0.5), np.full(5, 1e-3))
@@ -0,0 +1,167 @@
+"""
+Load test: throughput and tail latency of the price and backtest APIs on replayed market data
+
+The API is served by a threaded local server whose data source is a
+ReplaySource, so no request reaches Yahoo Finance. Recordings come from
+--recordings (made with DATA_SOURCE=record), or are generated from
+synthetic bars. Upstream behaviour is set with --latency, --error-rate and
+--max-rps; with the default --seed, every run draws the same delays and
+failures. The price cache is disabled and stored bars count as stale, so
+requests reach the data source instead of a cache (concurrent identical
+price requests still share one upstream fetch).
+
+Usage:
+    python benchmarks/load_test.py [--endpoint price|backtest|mixed] [--concurrency 8] [--duration 10]
+                                   [--latency lognormal:0.05,0.5] [--error-rate 0.01] [--max-rps 50]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+
+DEFAULT_SYMBOLS = 'RELIANCE.NS,TCS.NS,INFY.NS,HDFCBANK.NS,ICICIBANK.NS'
+
+
+def record_synthetic(directory, symbols):
+    """Recordings of generated daily bars, for runs without real ones"""
+    from services.data_sources import RecordingSource, SyntheticSource
+    recorder = RecordingSource(SyntheticSource(), directory)
+    for symbol in symbols:
+        recorder.history(symbol, '1d', period='max')
+        recorder.info(symbol)
+
+
+def request(url, body=None):
+    """Issue one request; returns (HTTP status, seconds)"""
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    latencies = np.array([seconds for _, seconds in samples]) * 1000
+    errors = sum(status != 200 for status, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput': len(samples) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)) if len(samples) else None,
+        'p90_ms': float(np.percentile(latencies, 90)) if len(samples) else None,
+        'p99_ms': float(np.percentile(latencies, 99)) if len(samples) else None,
+        'max_ms': float(latencies.max()) if len(samples) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--endpoint', choices=['price', 'backtest', 'mixed'], default='mixed')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load')
+    parser.add_argument('--symbols', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--period', default='1y', help='price history period requested')
+    parser.add_argument('--recordings', help='directory of recorded responses (default: synthetic)')
+    parser.add_argument('--latency', default='lognormal:0.05,0.5', help='upstream delay spec')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-rps', type=float, default=0, help='upstream rate limit (0 = none)')
+    parser.add_argument('--throttle', choices=['delay', 'reject'], default='delay')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(',')
+    root = tempfile.mkdtemp()
+    try:
+        recordings = args.recordings or os.path.join(root, 'recordings')
+        # Settings are read when config is first imported, so set them up front
+        os.environ.update({
+            'DATA_SOURCE': 'replay', 'DATA_RECORDINGS_PATH': recordings,
+            'REPLAY_LATENCY': args.latency, 'REPLAY_ERROR_RATE': str(args.error_rate),
+            'REPLAY_MAX_RPS': str(args.max_rps), 'REPLAY_THROTTLE': args.throttle,
+            'REPLAY_SEED': str(args.seed), 'MOCK_DATA_FALLBACK': 'False',
+            'OHLCV_STORE_PATH': os.path.join(root, 'ohlcv'), 'OHLCV_STORE_MAX_AGE': '0',
+            'PRICE_CACHE_MAX_BYTES': '0', 'BACKTEST_CACHE_PATH': os.path.join(root, 'backtests'),
+        })
+        if not args.recordings:
+            record_synthetic(recordings, symbols)
+
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        from app import create_app
+        from services.data_sources import default_data_source
+        server = make_server('127.0.0.1', 0, create_app(preload=False), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        endpoints = ['price', 'backtest'] if args.endpoint == 'mixed' else [args.endpoint]
+        samples = {endpoint: [] for endpoint in endpoints}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.duration
+
+        def client(worker):
+            rng = np.random.default_rng([args.seed, worker])
+            while time.perf_counter() < deadline:
+                endpoint = endpoints[rng.integers(len(endpoints))]
+                symbol = symbols[rng.integers(len(symbols))]
+                if endpoint == 'price':
+                    result = request(f'{base}/api/stock/price/{symbol}?period={args.period}')
+                else:
+                    result = request(f'{base}/api/backtest/run', {'symbol': symbol, 'strategy': 'sma_crossover'})
+                with lock:
+                    samples[endpoint].append(result)
+
+        started = time.perf_counter()
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(args.concurrency)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+
+        summary = {
+            'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+            'endpoints': {endpoint: summarize(samples[endpoint], elapsed) for endpoint in endpoints},
+            'upstream': default_data_source().stats(),
+        }
+        print(f"{args.concurrency} clients, {elapsed:.1f}s, upstream latency {args.latency}, "
+              f"error rate {args.error_rate}, max rps {args.max_rps or 'unlimited'}")
+        print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8}")
+        for endpoint, row in summary['endpoints'].items():
+            if not row['requests']:
+                print(f"{endpoint:<10} {0:>9}")
+                continue
+            print(f"{endpoint:<10} {row['requests']:>9} {row['errors']:>7} {row['throughput']:>8.1f} "
+                  f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+        upstream = summary['upstream']
+        print(f"upstream: {upstream['requests']} requests, {upstream['errors']} injected errors, "
+              f"{upstream['throttled']} throttled")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(summary, f, indent=2)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
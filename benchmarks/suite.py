@@ -0,0 +1,270 @@
+"""
+Benchmark suite: offline timings of the data, backtest and model hot paths
+
+Every case runs on generated fixtures (no network access): price fetching
+through DataFetcher with and without the local store, each Backtester
+strategy, metric calculation, feature preparation and single/batched
+inference, at each requested data size. Results are saved as JSON; given
+a baseline file from an earlier run, cases whose best time is more than
+--threshold slower are flagged and the exit status is 1.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000 10000] [--repeats 3] [--cases 'backtest.*']
+                               [--output results.json] [--baseline previous.json] [--threshold 0.2]
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import argparse
+import fnmatch
+import importlib.util
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+from benchmarks.fixtures import FixtureFetcher, make_price_frame, write_model_artifact
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_THRESHOLD = 0.2
+
+CASES = {}
+
+
+def case(name, sized=True, requires=None):
+    """
+    Register a benchmark case
+
+    The decorated setup(size, workdir) builds its fixtures and returns
+    (run, prepare): run(*prepare()) is the timed call, and prepare (or
+    None) produces fresh untimed inputs for each call, e.g. a copy of a
+    frame that run modifies. Unsized cases run once, with size None.
+    requires names a module the case is skipped without.
+    """
+    def register(setup):
+        CASES[name] = {'setup': setup, 'sized': sized, 'requires': requires}
+        return setup
+    return register
+
+
+def _backtester(workdir):
+    from services.backtester import Backtester
+    from services.predictor import StockPredictor
+    path = os.path.join(workdir, 'cnn_lstm_model.npz')
+    if not os.path.exists(path):
+        write_model_artifact(path)
+    return Backtester('BENCH.NS', None, None, predictor=StockPredictor(path))
+
+
+@case('fetch_stock_data.uncached')
+def fetch_uncached(size, workdir):
+    fetcher = FixtureFetcher(size, store=False)
+    return lambda: fetcher.fetch_stock_data('BENCH.NS', period='max'), None
+
+
+@case('fetch_stock_data.cached')
+def fetch_cached(size, workdir):
+    from services.data_store import OHLCVStore
+    fetcher = FixtureFetcher(size, store=OHLCVStore(os.path.join(workdir, f'ohlcv-{size}')),
+                             max_age=float('inf'))
+    fetcher.fetch_stock_data('BENCH.NS', period='max')
+    return lambda: fetcher.fetch_stock_data('BENCH.NS', period='max'), None
+
+
+def _strategy_case(strategy_name):
+    def setup(size, workdir):
+        backtester = _backtester(workdir)
+        df = make_price_frame(size)
+        return (lambda frame: backtester._run_on_data(frame, strategy_name, {}),
+                lambda: (df.copy(),))
+    return setup
+
+
+for _strategy in ('sma_crossover', 'buy_and_hold', 'ml_predictions'):
+    case(f'backtest.{_strategy}')(_strategy_case(_strategy))
+
+
+@case('backtest.calculate_metrics')
+def calculate_metrics(size, workdir):
+    backtester = _backtester(workdir)
+    results = backtester._buy_and_hold_strategy(
+        make_price_frame(size), {'capital': backtester.initial_capital, 'shares': 0, 'trades': [], 'portfolio_value': []}
+    )
+    return lambda: backtester._calculate_metrics(results), None
+
+
+@case('features.add_technical_indicators', requires='tensorflow')
+def add_technical_indicators(size, workdir):
+    from models.cnn_lstm_model import CNNLSTMModel
+    model, df = CNNLSTMModel(), make_price_frame(size)
+    return model.add_technical_indicators, lambda: (df.copy(),)
+
+
+@case('features.prepare_data', requires='tensorflow')
+def prepare_data(size, workdir):
+    from models.cnn_lstm_model import CNNLSTMModel
+    model, df = CNNLSTMModel(), make_price_frame(size)
+    return model.prepare_data, lambda: (df.copy(),)
+
+
+@case('inference.single', sized=False)
+def inference_single(size, workdir):
+    predictor = _backtester(workdir).predictor
+    window = np.random.default_rng(0).random((1, predictor.sequence_length, 5), dtype=np.float32)
+    return lambda: predictor._step(window), None
+
+
+@case('inference.batched')
+def inference_batched(size, workdir):
+    predictor = _backtester(workdir).predictor
+    windows = np.random.default_rng(0).random((size, predictor.sequence_length, 5), dtype=np.float32)
+    return lambda: predictor.predict_windows(windows), None
+
+
+def time_case(run, prepare=None, repeats=3):
+    """Seconds taken by each of repeats calls, after one untimed warm-up call"""
+    prepare = prepare or (lambda: ())
+    run(*prepare())
+    timings = []
+    for _ in range(repeats):
+        args = prepare()
+        start = time.perf_counter()
+        run(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeats=3, patterns=('*',), log=print):
+    """
+    Run the matching cases at every size
+
+    Args:
+        sizes: Bars (or windows, for batched inference) per sized case
+        repeats: Timed calls per case and size
+        patterns: fnmatch patterns selecting case names
+        log: Callable receiving one progress line per result
+
+    Returns:
+        Result document: environment details, plus per-run timings keyed
+        by '<case>/<size>' ('<case>' for unsized cases)
+    """
+    results, skipped = {}, []
+    workdir = tempfile.mkdtemp()
+    try:
+        for name, spec in CASES.items():
+            if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                continue
+            if spec['requires'] and importlib.util.find_spec(spec['requires']) is None:
+                skipped.append(name)
+                log(f"{name:<36} skipped ({spec['requires']} is not installed)")
+                continue
+            for size in sizes if spec['sized'] else [None]:
+                run, prepare = spec['setup'](size, workdir)
+                timings = time_case(run, prepare, repeats)
+                key = name if size is None else f'{name}/{size}'
+                results[key] = {
+                    'case': name, 'size': size,
+                    'best': min(timings), 'median': statistics.median(timings), 'timings': timings,
+                }
+                log(f"{key:<36} best {min(timings):>10.4f}s  median {statistics.median(timings):>10.4f}s")
+    finally:
+        shutil.rmtree(workdir)
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeats': repeats,
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare best times against a baseline result document
+
+    Returns:
+        One row per case in current: key, baseline and current best
+        seconds, their ratio, and a status of 'regression' (more than
+        threshold slower), 'improvement' (more than threshold faster),
+        'ok', or 'new' (not in the baseline)
+    """
+    rows = []
+    for key, result in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            rows.append({'key': key, 'baseline': None, 'current': result['best'], 'ratio': None, 'status': 'new'})
+            continue
+        ratio = result['best'] / before['best'] if before['best'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'key': key, 'baseline': before['best'], 'current': result['best'],
+                     'ratio': ratio, 'status': status})
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--cases', nargs='+', default=['*'], help='fnmatch patterns of case names')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', help='earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fractional slowdown flagged as a regression')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+
+    document = run_suite(args.sizes, args.repeats, args.cases)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"results written to {output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(document, baseline, args.threshold)
+    print(f"\ncompared with {args.baseline} (commit {baseline.get('commit')})")
+    print(f"{'case':<36} {'baseline s':>11} {'current s':>11} {'ratio':>7}  status")
+    for row in rows:
+        before = '-' if row['baseline'] is None else f"{row['baseline']:.4f}"
+        ratio = '-' if row['ratio'] is None else f"{row['ratio']:.2f}"
+        print(f"{row['key']:<36} {before:>11} {row['current']:>11.4f} {ratio:>7}  {row['status']}")
+    regressions = [row['key'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,10 @@ from tensorflow.keras.layers import Dense, LSTM, Dropout, Conv1D, MaxPooling1D,
 from tensorflow.keras.optimizers import Adam
 from sklearn.preprocessing import MinMaxScaler
 import joblib
+from backend.services.windowing import sliding_windows
+from backend.services.indicators import feature_indicators
+from backend.services.numpy_model import save_inference_artifact
+from models.data_pipeline import window_dataset, DEFAULT_SHUFFLE_BUFFER
 
 class CNNLSTMModel:
     def __init__(self, sequence_length=60, n_features=5):
@@ -22,6 +26,7 @@ class CNNLSTMModel:
         self.n_features = n_features
         self.model = None
         self.scaler = MinMaxScaler()
+        self.scalers = []
         
     def build_model(self):
         """Build CNN-LSTM architecture"""
@@ -79,13 +84,9 @@ class CNNLSTMModel:
         # Scale data
         scaled_data = self.scaler.fit_transform(data)
         
-        # Create sequences
-        X, y = [], []
-        for i in range(self.sequence_length, len(scaled_data)):
-            X.append(scaled_data[i-self.sequence_length:i])
-            y.append(scaled_data[i, 3])  # Close price index
-        
-        X, y = np.array(X), np.array(y)
+        # Create sequences (strided views; the window ending at the last bar has no target)
+        X = sliding_windows(scaled_data, self.sequence_length)[:-1]
+        y = scaled_data[self.sequence_length:, 3]  # Close price index
         
         # Split into train and test
         split_idx = int(len(X) * 0.8)
@@ -94,36 +95,70 @@ class CNNLSTMModel:
         
         return X_train, y_train, X_test, y_test
     
-    def add_technical_indicators(self, df):
-        """Add technical indicators to dataframe"""
-        # Simple Moving Averages
-        df['SMA_20'] = df['Close'].rolling(window=20).mean()
-        df['SMA_50'] = df['Close'].rolling(window=50).mean()
+    def prepare_datasets(self, frames, batch_size=32, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER,
+                         validation_split=0.2, seed=None):
+        """
+        Prepare streaming training and validation datasets
         
-        # Exponential Moving Average
-        df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
+        Unlike prepare_data(), no window is materialized up front: windows
+        are generated per batch from the scaled series (see
+        models.data_pipeline). Passing several frames pools their windows
+        into one shuffled dataset; each symbol is scaled by its own scaler,
+        kept in self.scalers (self.scaler is the last one fitted).
+        
+        Args:
+            frames: DataFrame with OHLCV data, or a list of them
+            batch_size: Windows per batch
+            shuffle_buffer: Training shuffle buffer size, in windows
+            validation_split: Trailing fraction of each symbol's windows
+                held out for validation
+            seed: Shuffle seed
         
-        # Relative Strength Index (RSI)
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+        Returns:
+            train_dataset, val_dataset
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        
+        feature_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
+        self.scalers = []
+        series = []
+        for df in frames:
+            self.scaler = MinMaxScaler()
+            series.append(self.scaler.fit_transform(df[feature_cols].values))
+            self.scalers.append(self.scaler)
+        
+        split = 1 - validation_split
+        train = window_dataset(series, self.sequence_length, batch_size, stop=split,
+                               shuffle_buffer=shuffle_buffer, seed=seed)
+        val = window_dataset(series, self.sequence_length, batch_size, start=split)
+        return train, val
+    
+    def add_technical_indicators(self, df):
+        """
+        Add technical indicators to dataframe
+        
+        SMA_20, SMA_50, EMA_20 and RSI come from the shared indicator
+        engine, so live updates and the backtester compute them identically.
+        """
+        feature_indicators().apply(df)
         
         # Fill NaN values
         df = df.bfill().fillna(0)
         
         return df
     
-    def train(self, X_train, y_train, X_val, y_val, epochs=100, batch_size=32):
+    def train(self, X_train, y_train=None, X_val=None, y_val=None, epochs=100, batch_size=32, verbose=1):
         """
         Train the model
         
         Args:
-            X_train, y_train: Training data
-            X_val, y_val: Validation data
+            X_train, y_train: Training data, or a batched dataset from
+                prepare_datasets() as X_train with y_train None
+            X_val, y_val: Validation data, or a dataset as X_val
             epochs: Number of training epochs
-            batch_size: Batch size for training
+            batch_size: Batch size for array training data
+            verbose: Keras progress output level
         
         Returns:
             Training history
@@ -131,12 +166,17 @@ class CNNLSTMModel:
         if self.model is None:
             self.build_model()
         
+        if y_train is None:
+            # Datasets are already batched
+            history = self.model.fit(X_train, validation_data=X_val, epochs=epochs, verbose=verbose)
+            return history
+        
         history = self.model.fit(
             X_train, y_train,
             validation_data=(X_val, y_val),
             epochs=epochs,
             batch_size=batch_size,
-            verbose=1
+            verbose=verbose
         )
         
         return history
@@ -154,6 +194,51 @@ class CNNLSTMModel:
         self.model.save(filepath)
         joblib.dump(self.scaler, filepath.replace('.h5', '_scaler.pkl'))
     
+    def export_inference(self, filepath):
+        """
+        Write the TensorFlow-free inference artifact (.npz)
+        
+        Holds the layer weights and options plus the scaler parameters,
+        everything services.numpy_model needs to serve predictions.
+        Dropout layers are the identity at inference and are left out.
+        """
+        layers = []
+        for layer in self.model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            if kind == 'Dropout':
+                continue
+            if kind == 'Conv1D':
+                if config['padding'] != 'valid' or tuple(config['strides']) != (1,) or tuple(config['dilation_rate']) != (1,):
+                    raise ValueError(f"Unsupported Conv1D options in layer {layer.name}")
+                spec = {'type': 'conv1d', 'activation': config['activation']}
+            elif kind == 'MaxPooling1D':
+                if config['padding'] != 'valid':
+                    raise ValueError(f"Unsupported MaxPooling1D padding in layer {layer.name}")
+                spec = {'type': 'max_pool1d', 'pool_size': int(config['pool_size'][0]),
+                        'strides': int(config['strides'][0])}
+            elif kind == 'LSTM':
+                if config['go_backwards']:
+                    raise ValueError(f"Unsupported LSTM options in layer {layer.name}")
+                spec = {'type': 'lstm', 'activation': config['activation'],
+                        'recurrent_activation': config['recurrent_activation'],
+                        'return_sequences': bool(config['return_sequences'])}
+            elif kind == 'Dense':
+                spec = {'type': 'dense', 'activation': config['activation']}
+            elif kind == 'Flatten':
+                spec = {'type': 'flatten'}
+            else:
+                raise ValueError(f"Layer type {kind} cannot be exported")
+            names = {'LSTM': ('kernel', 'recurrent_kernel', 'bias'), 'MaxPooling1D': (), 'Flatten': ()}.get(
+                kind, ('kernel', 'bias'))
+            weights = layer.get_weights()
+            if len(weights) != len(names):
+                raise ValueError(f"Layer {layer.name} must have weights {list(names)}")
+            layers.append((spec, dict(zip(names, weights))))
+        
+        save_inference_artifact(filepath, layers, (self.sequence_length, self.n_features),
+                                self.scaler.min_, self.scaler.scale_)
+    
     def load_model(self, filepath):
         """Load model and scaler"""
         from tensorflow.keras.models import load_model
@@ -0,0 +1,80 @@
+"""
+Streaming tf.data input pipelines for CNN-LSTM training
+"""
+import numpy as np
+import tensorflow as tf
+
+CLOSE_INDEX = 3
+DEFAULT_SHUFFLE_BUFFER = 10000
+
+
+def window_starts(lengths, sequence_length, start=0.0, stop=1.0):
+    """
+    Row offsets of every training window in a concatenation of series
+
+    Each series of length L has L - sequence_length windows with a target
+    (the close after the window). Only the windows from fraction start up
+    to fraction stop of each series are kept, split as prepare_data() does,
+    so no window ever spans two series.
+
+    Args:
+        lengths: Length of each series, in concatenation order
+        sequence_length: Rows per window
+        start, stop: Fractions of each series' windows to keep
+
+    Returns:
+        int64 array of window start rows
+    """
+    starts = []
+    offset = 0
+    for length in lengths:
+        n_windows = max(length - sequence_length, 0)
+        starts.append(offset + np.arange(int(n_windows * start), int(n_windows * stop), dtype=np.int64))
+        offset += length
+    return np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+
+
+def window_dataset(series, sequence_length=60, batch_size=32, start=0.0, stop=1.0,
+                   shuffle_buffer=None, seed=None, target_index=CLOSE_INDEX):
+    """
+    Batched (windows, next close) dataset built on the fly from price series
+
+    Only the series themselves and one int64 start offset per window are
+    held in memory. Offsets are shuffled through a bounded buffer, batched,
+    and turned into window tensors by a parallel gather, with batches
+    prefetched while the model trains on the previous one.
+
+    Args:
+        series: Scaled array of shape (bars, features), or a list of them
+            (one per symbol) to pool into a single dataset
+        sequence_length: Rows per window
+        batch_size: Windows per batch
+        start, stop: Fractions of each series' windows to use (see
+            window_starts)
+        shuffle_buffer: Shuffle buffer size in windows; None keeps order
+        seed: Shuffle seed
+        target_index: Feature column predicted one bar ahead
+
+    Returns:
+        tf.data.Dataset of (float32 (batch, sequence_length, features),
+        float32 (batch,)) pairs
+    """
+    if isinstance(series, np.ndarray):
+        series = [series]
+    series = [np.asarray(s, dtype=np.float32) for s in series]
+    starts = window_starts([len(s) for s in series], sequence_length, start, stop)
+    data = tf.constant(np.concatenate(series) if series else np.empty((0, 0), dtype=np.float32))
+    targets = data[:, target_index]
+    steps = tf.range(sequence_length, dtype=tf.int64)
+
+    def gather(batch_starts):
+        return (tf.gather(data, batch_starts[:, tf.newaxis] + steps),
+                tf.gather(targets, batch_starts + sequence_length))
+
+    dataset = tf.data.Dataset.from_tensor_slices(starts)
+    if shuffle_buffer:
+        dataset = dataset.shuffle(min(shuffle_buffer, max(len(starts), 1)), seed=seed,
+                                  reshuffle_each_iteration=True)
+    return (dataset.batch(batch_size)
+            .map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
@@ -4,6 +4,7 @@ Model evaluation and testing script
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from models.cnn_lstm_model import CNNLSTMModel
 from backend.services.data_fetcher import DataFetcher
@@ -4,66 +4,130 @@ Training script for CNN-LSTM model
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from models.cnn_lstm_model import CNNLSTMModel
 from backend.services.data_fetcher import DataFetcher
+from backend.services.model_registry import MODEL_FILENAME, METADATA_FILENAME, model_versions, version_dir
+from backend.services.numpy_model import inference_artifact_path
+from backend.services.walk_forward import limit_tf_threads
+import argparse
+import joblib
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
 
-def train_model(symbol='RELIANCE.NS', period='5y'):
+SAVED_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saved_models')
+DEFAULT_SYMBOLS = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFCBANK.NS']
+
+def train_model(symbol='RELIANCE.NS', period='5y', epochs=50, batch_size=32, model_dir=None, verbose=1,
+                plot=True):
     """
     Train CNN-LSTM model for stock prediction
     
+    The model, scaler, training plot and metadata are published as a new
+    version under <model_dir>/<symbol>/v<N>/, so earlier runs are kept.
+    
     Args:
         symbol: Stock symbol to train on
         period: Historical data period
+        epochs: Training epochs
+        batch_size: Training batch size
+        model_dir: Artifact root (defaults to models/saved_models)
+        verbose: Keras verbosity; 0 also silences progress output here
+        plot: Save a plot of the loss curves and test predictions
+    
+    Returns:
+        model, history, metadata
     """
-    print(f"Training CNN-LSTM model for {symbol}...")
+    log = print if verbose else (lambda *args, **kwargs: None)
+    started = time.perf_counter()
+    log(f"Training CNN-LSTM model for {symbol}...")
     
     # Fetch data
-    print("Fetching historical data...")
+    log("Fetching historical data...")
     data_fetcher = DataFetcher()
     stock_data = data_fetcher.fetch_stock_data(symbol, period=period)
     df = pd.DataFrame(stock_data)
     
-    print(f"Data shape: {df.shape}")
+    log(f"Data shape: {df.shape}")
     
     # Initialize model
     model = CNNLSTMModel(sequence_length=60, n_features=5)
     
     # Prepare data
-    print("Preparing data...")
+    log("Preparing data...")
     X_train, y_train, X_test, y_test = model.prepare_data(df)
     
-    print(f"Training data shape: {X_train.shape}")
-    print(f"Test data shape: {X_test.shape}")
+    log(f"Training data shape: {X_train.shape}")
+    log(f"Test data shape: {X_test.shape}")
     
     # Build and train model
-    print("Building model...")
+    log("Building model...")
     model.build_model()
-    print(model.model.summary())
+    if verbose:
+        model.model.summary()
     
-    print("Training model...")
-    history = model.train(X_train, y_train, X_test, y_test, epochs=50, batch_size=32)
+    log("Training model...")
+    history = model.train(X_train, y_train, X_test, y_test, epochs=epochs, batch_size=batch_size,
+                          verbose=verbose)
     
     # Evaluate model
-    print("\nEvaluating model...")
-    test_loss, test_mae, test_mse = model.model.evaluate(X_test, y_test)
-    print(f"Test Loss: {test_loss:.4f}")
-    print(f"Test MAE: {test_mae:.4f}")
-    print(f"Test MSE: {test_mse:.4f}")
+    log("\nEvaluating model...")
+    test_loss, test_mae, test_mse = model.model.evaluate(X_test, y_test, verbose=verbose)
+    log(f"Test Loss: {test_loss:.4f}")
+    log(f"Test MAE: {test_mae:.4f}")
+    log(f"Test MSE: {test_mse:.4f}")
     
     # Make predictions
-    predictions = model.predict(X_test)
+    predictions = model.model.predict(X_test, verbose=verbose)
     
     # Calculate metrics
     rmse = np.sqrt(test_mse)
-    print(f"RMSE: {rmse:.4f}")
+    log(f"RMSE: {rmse:.4f}")
     
     # Plot training history
-    plt.figure(figsize=(12, 4))
+    figure = plot_results(history, y_test, predictions) if plot else None
+    
+    # Save model
+    metadata = {
+        'symbol': symbol,
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'period': period,
+        'bars': len(df),
+        'first_date': str(df['Date'].iloc[0])[:10] if len(df) else None,
+        'last_date': str(df['Date'].iloc[-1])[:10] if len(df) else None,
+        'sequence_length': model.sequence_length,
+        'n_features': model.n_features,
+        'epochs': epochs,
+        'batch_size': batch_size,
+        'train_samples': len(X_train),
+        'test_samples': len(X_test),
+        'metrics': {
+            'test_loss': float(test_loss),
+            'test_mae': float(test_mae),
+            'test_mse': float(test_mse),
+            'rmse': float(rmse),
+        },
+        'train_seconds': round(time.perf_counter() - started, 2),
+    }
+    version, directory = save_artifacts(model, symbol, metadata, model_dir, figure)
+    metadata['version'] = version
+    log(f"Model saved to {directory}")
+    
+    return model, history, metadata
+
+def plot_results(history, y_test, predictions):
+    """Figure of the loss curves and the first 100 test predictions"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    figure = plt.figure(figsize=(12, 4))
     
     plt.subplot(1, 2, 1)
     plt.plot(history.history['loss'], label='Training Loss')
@@ -82,28 +146,202 @@ def train_model(symbol='RELIANCE.NS', period='5y'):
     plt.legend()
     
     plt.tight_layout()
-    plt.savefig('../data/training_results.png')
-    print("Training results saved to data/training_results.png")
+    plt.close(figure)
+    return figure
+
+def save_artifacts(model, symbol, metadata, model_dir=None, figure=None):
+    """
+    Publish a trained model as the next version of a symbol's artifacts
     
-    # Save model
-    model_path = './saved_models/cnn_lstm_model.h5'
-    os.makedirs('./saved_models', exist_ok=True)
-    model.save_model(model_path)
+    Files are written to a staging directory that is renamed to v<N> only
+    once complete, so the model registry never sees a partial version.
+    
+    Args:
+        model: Trained CNNLSTMModel
+        symbol: Stock symbol
+        metadata: JSON-serializable dict, written as metadata.json with
+            the version added
+        model_dir: Artifact root (defaults to models/saved_models)
+        figure: Optional matplotlib figure, saved as training_results.png
+    
+    Returns:
+        version, directory
+    """
+    model_dir = model_dir or SAVED_MODELS_DIR
+    versions = model_versions(model_dir, symbol)
+    version = (versions[-1] if versions else 0) + 1
+    directory = version_dir(model_dir, symbol, version)
+    staging = os.path.join(model_dir, symbol, f'.v{version}-{os.getpid()}')
+    os.makedirs(staging)
+    
+    model.save_model(os.path.join(staging, MODEL_FILENAME))
+    model.export_inference(inference_artifact_path(os.path.join(staging, MODEL_FILENAME)))
+    with open(os.path.join(staging, METADATA_FILENAME), 'w') as f:
+        json.dump(dict(metadata, version=version), f, indent=2)
+    if figure is not None:
+        figure.savefig(os.path.join(staging, 'training_results.png'))
+    
+    os.rename(staging, directory)
+    return version, directory
+
+def train_symbols(symbols=None, period='5y', epochs=50, batch_size=32, max_workers=None, model_dir=None,
+                  plot=True):
+    """
+    Train one model per symbol in parallel worker processes
+    
+    Each worker's TensorFlow thread pools are capped to its share of the
+    machine's cores, so concurrent trainings do not oversubscribe the CPU.
+    A failure is recorded in the summary without stopping other symbols.
+    
+    Args:
+        symbols: Stock symbols (defaults to DEFAULT_SYMBOLS)
+        period: Historical data period
+        epochs: Training epochs per symbol
+        batch_size: Training batch size
+        max_workers: Worker processes (defaults to one per core, at most
+            one per symbol); 1 trains in-process
+        model_dir: Artifact root (defaults to models/saved_models)
+        plot: Save each symbol's training plot (needs matplotlib)
+    
+    Returns:
+        List of per-symbol summaries, in symbol order; also written to
+        <model_dir>/training_summary.json
+    """
+    symbols = list(dict.fromkeys(symbols or DEFAULT_SYMBOLS))
+    model_dir = model_dir or SAVED_MODELS_DIR
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(symbols)))
+    tasks = [(symbol, period, epochs, batch_size, model_dir, plot) for symbol in symbols]
+    started = time.perf_counter()
+    
+    if workers == 1:
+        summaries = [_train_symbol(*task) for task in tasks]
+    else:
+        cores = os.cpu_count() or 1
+        intra_op = max(1, cores // workers)
+        inter_op = min(2, intra_op)
+        # TensorFlow is not fork-safe once initialized, so workers are spawned
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=limit_tf_threads, initargs=(intra_op, inter_op)) as pool:
+            futures = [pool.submit(_train_symbol, *task) for task in tasks]
+            for future in as_completed(futures):
+                row = future.result()
+                print(f"{row['symbol']}: {row['status']} in {row['wall_seconds']:.1f}s")
+            summaries = [future.result() for future in futures]
+    
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, 'training_summary.json'), 'w') as f:
+        json.dump({'workers': workers, 'wall_seconds': round(time.perf_counter() - started, 2),
+                   'symbols': summaries}, f, indent=2)
+    return summaries
+
+def _train_symbol(symbol, period, epochs, batch_size, model_dir, plot):
+    """Worker entry point: train one symbol and summarize the outcome"""
+    started = time.perf_counter()
+    try:
+        _, _, metadata = train_model(symbol, period, epochs, batch_size, model_dir, verbose=0, plot=plot)
+    except Exception as e:
+        return {'symbol': symbol, 'status': 'failed', 'error': str(e),
+                'wall_seconds': round(time.perf_counter() - started, 2)}
+    return {
+        'symbol': symbol,
+        'status': 'ok',
+        'version': metadata['version'],
+        'path': os.path.join(version_dir(model_dir, symbol, metadata['version']), MODEL_FILENAME),
+        'bars': metadata['bars'],
+        'metrics': metadata['metrics'],
+        'wall_seconds': round(time.perf_counter() - started, 2),
+    }
+
+def format_summary(summaries):
+    """Plain-text table of train_symbols() results"""
+    lines = [f"{'symbol':<14} {'status':<7} {'version':>7} {'seconds':>8} {'test MAE':>9} {'RMSE':>8}"]
+    for row in summaries:
+        if row['status'] == 'ok':
+            lines.append(f"{row['symbol']:<14} {'ok':<7} {row['version']:>7} {row['wall_seconds']:>8.1f} "
+                         f"{row['metrics']['test_mae']:>9.4f} {row['metrics']['rmse']:>8.4f}")
+        else:
+            lines.append(f"{row['symbol']:<14} {'failed':<7} {'-':>7} {row['wall_seconds']:>8.1f}   {row['error']}")
+    return '\n'.join(lines)
+
+POOLED_MODEL_FILENAME = 'cnn_lstm_pooled.h5'
+POOLED_SCALERS_FILENAME = 'cnn_lstm_pooled_scalers.pkl'
+
+def train_pooled_model(symbols, period='5y', epochs=50, batch_size=32, model_dir=None):
+    """
+    Train one CNN-LSTM model on the pooled windows of several stocks
+    
+    Windows are streamed from the price series (see
+    models.data_pipeline), so memory grows with the number of bars rather
+    than bars * sequence_length. Each symbol is scaled by its own scaler;
+    all of them are saved next to the model, keyed by symbol, and
+    load_pooled_model() pairs the network with the right one.
+    
+    Args:
+        symbols: Stock symbols to pool
+        period: Historical data period
+        model_dir: Artifact directory (defaults to models/saved_models)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    print(f"Training pooled CNN-LSTM model for {', '.join(symbols)}...")
+    
+    data_fetcher = DataFetcher()
+    frames = [pd.DataFrame(data_fetcher.fetch_stock_data(symbol, period=period)) for symbol in symbols]
+    print(f"Bars per symbol: {[len(df) for df in frames]}")
+    
+    model = CNNLSTMModel(sequence_length=60, n_features=5)
+    train_ds, val_ds = model.prepare_datasets(frames, batch_size=batch_size)
+    
+    model.build_model()
+    history = model.train(train_ds, X_val=val_ds, epochs=epochs)
+    
+    test_loss, test_mae, test_mse = model.model.evaluate(val_ds)
+    print(f"Validation Loss: {test_loss:.4f}")
+    print(f"Validation MAE: {test_mae:.4f}")
+    print(f"RMSE: {np.sqrt(test_mse):.4f}")
+    
+    model_dir = model_dir or SAVED_MODELS_DIR
+    model_path = os.path.join(model_dir, POOLED_MODEL_FILENAME)
+    os.makedirs(model_dir, exist_ok=True)
+    model.model.save(model_path)
+    joblib.dump(dict(zip(symbols, model.scalers)), os.path.join(model_dir, POOLED_SCALERS_FILENAME))
     print(f"Model saved to {model_path}")
     
     return model, history
 
+def load_pooled_model(symbol, model_dir=None):
+    """
+    Load the pooled model with the scaler of one of its symbols
+    
+    Args:
+        symbol: A symbol the model was trained on
+        model_dir: Artifact directory (defaults to models/saved_models)
+    
+    Returns:
+        CNNLSTMModel ready for predict()
+    """
+    from tensorflow.keras.models import load_model
+    model_dir = model_dir or SAVED_MODELS_DIR
+    scalers = joblib.load(os.path.join(model_dir, POOLED_SCALERS_FILENAME))
+    if symbol not in scalers:
+        raise ValueError(f"{symbol} is not one of the pooled model's symbols {sorted(scalers)}")
+    model = CNNLSTMModel(sequence_length=60, n_features=5)
+    model.model = load_model(os.path.join(model_dir, POOLED_MODEL_FILENAME))
+    model.scaler = scalers[symbol]
+    return model
+
 if __name__ == '__main__':
-    # Train model for multiple NSE stocks
-    stocks = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFCBANK.NS']
-    
-    for stock in stocks:
-        print(f"\n{'='*50}")
-        print(f"Training model for {stock}")
-        print(f"{'='*50}\n")
-        
-        try:
-            model, history = train_model(stock, period='5y')
-        except Exception as e:
-            print(f"Error training {stock}: {str(e)}")
-            continue
+    # Train one model per NSE stock, in parallel
+    parser = argparse.ArgumentParser(description='Train per-symbol CNN-LSTM models')
+    parser.add_argument('symbols', nargs='*', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--no-plot', action='store_true', help='Skip the per-symbol training plots')
+    args = parser.parse_args()
+    
+    summaries = train_symbols(args.symbols, args.period, args.epochs, args.batch_size,
+                              args.workers, args.model_dir, plot=not args.no_plot)
+    print()
+    print(format_summary(summaries))
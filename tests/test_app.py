@@ -0,0 +1,76 @@
+"""
+Test suite for the application factory and preloading
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import gc
+import shutil
+import subprocess
+import tempfile
+import unittest
+from tests.test_numpy_model import random_artifact
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+class TestCreateApp(unittest.TestCase):
+    def test_import_defers_heavy_libraries(self):
+        script = (
+            "import sys\n"
+            "from app import app\n"
+            "response = app.test_client().get('/api/health')\n"
+            "assert response.get_json()['status'] == 'healthy'\n"
+            "print(sorted(m for m in ('pandas', 'yfinance', 'tensorflow') if m in sys.modules))\n"
+        )
+        output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
+    def test_routes_registered(self):
+        from app import create_app
+        rules = {rule.rule for rule in create_app(preload=False).url_map.iter_rules()}
+        self.assertIn('/api/health', rules)
+        self.assertIn('/api/stock/price/<symbol>', rules)
+        self.assertIn('/api/backtest/run', rules)
+
+
+class TestPreload(unittest.TestCase):
+    def setUp(self):
+        from api import stock_routes
+        self.stock_routes = stock_routes
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, 'TCS.NS'))
+        random_artifact(os.path.join(self.root, 'TCS.NS', 'cnn_lstm_model.npz'))
+        self.original_dir = stock_routes.model_registry.model_dir
+        stock_routes.model_registry.model_dir = self.root
+        self.original_fetch = stock_routes.data_fetcher.fetch_stock_data
+        self.fetched = []
+        stock_routes.data_fetcher.fetch_stock_data = (
+            lambda symbol, period, interval: self.fetched.append(symbol) or [{'Close': 1.0}]
+        )
+
+    def tearDown(self):
+        gc.unfreeze()
+        self.stock_routes.data_fetcher.fetch_stock_data = self.original_fetch
+        self.stock_routes.model_registry.model_dir = self.original_dir
+        self.stock_routes.model_registry.clear()
+        self.stock_routes.price_cache.clear()
+        shutil.rmtree(self.root)
+
+    def test_preload_warms_prices_and_numpy_models(self):
+        from app import preload_app
+        summary = preload_app(['TCS.NS', 'INFY.NS'], '1y')
+        self.assertEqual(summary, {'prices': ['TCS.NS', 'INFY.NS'], 'models': ['TCS.NS']})
+        self.assertGreater(gc.get_freeze_count(), 0)
+        # Served from the warm caches without fetching or loading again
+        self.stock_routes.load_prices('TCS.NS', '1y')
+        self.assertEqual(self.fetched, ['TCS.NS', 'INFY.NS'])
+        self.stock_routes.model_registry.get('TCS.NS')
+        self.assertEqual(self.stock_routes.model_registry.stats()['loads'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,27 @@ Test suite for backtesting service
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from backend.services.backtester import Backtester
+from services.data_fetcher import DataFetcher
+from services.data_sources import SyntheticSource
 import unittest
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 
+
+def make_price_frame(n_bars, seed=0, start_price=1000.0):
+    """Random-walk price frame with the columns the strategies use"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars)))
+    return pd.DataFrame({'Close': close})
+
+
+def empty_portfolio(capital):
+    return {'capital': capital, 'shares': 0, 'trades': [], 'portfolio_value': []}
+
 class TestBacktester(unittest.TestCase):
     def setUp(self):
         end_date = datetime.now()
@@ -32,5 +48,115 @@ class TestBacktester(unittest.TestCase):
         self.assertIsNotNone(results)
         self.assertGreater(len(results['trades']), 0)
 
+class TestVectorizedSMACrossover(unittest.TestCase):
+    """Regression tests: vectorized engine vs. the bar-by-bar loop"""
+    def setUp(self):
+        self.backtester = Backtester('TEST', None, None)
+    
+    def assert_same_results(self, df, capital=100000):
+        expected = self.backtester._sma_crossover_strategy_loop(df.copy(), empty_portfolio(capital))
+        actual = self.backtester._sma_crossover_strategy(df.copy(), empty_portfolio(capital))
+        self.assertEqual(actual['trades'], expected['trades'])
+        self.assertEqual(actual['portfolio_value'], expected['portfolio_value'])
+        self.assertEqual(actual['shares'], expected['shares'])
+        self.assertEqual(actual['capital'], expected['capital'])
+        return actual
+    
+    def test_matches_loop_on_random_walks(self):
+        """Same trades and portfolio values across several price paths"""
+        for seed in range(5):
+            results = self.assert_same_results(make_price_frame(3000, seed=seed))
+            self.assertGreater(len(results['trades']), 0)
+    
+    def test_matches_loop_when_capital_cannot_buy_a_share(self):
+        """Zero-share buy attempts are recorded exactly like the loop"""
+        df = make_price_frame(2000, seed=3, start_price=900.0)
+        self.assert_same_results(df, capital=1000)
+    
+    def test_history_shorter_than_long_window(self):
+        """No bars to trade on yields an empty result, as before"""
+        results = self.assert_same_results(make_price_frame(150))
+        self.assertEqual(results['portfolio_value'], [])
+    
+    def test_buy_and_hold_values(self):
+        """Buy and hold marks every bar to market"""
+        df = make_price_frame(500)
+        results = self.backtester._buy_and_hold_strategy(df, empty_portfolio(100000))
+        self.assertEqual(len(results['portfolio_value']), len(df))
+        shares = results['trades'][0]['shares']
+        expected = results['capital'] + shares * df['Close'].iloc[-1]
+        self.assertEqual(results['portfolio_value'][-1]['value'], expected)
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        self.df = make_price_frame(1500, seed=7)
+        self.backtester = Backtester('TEST', None, None)
+        self.backtester._load_data = lambda warmup=0: self.df.copy()
+        self.grid = {'short_window': [10, 20, 50], 'long_window': [50, 100, 200]}
+    
+    def test_matches_single_runs(self):
+        """Each combination scores the same as a standalone backtest"""
+        results = self.backtester.run_sweep(self.grid, max_workers=1)
+        row = next(r for r in results if r['params'] == {'short_window': 50, 'long_window': 200})
+        expected = self.backtester.run_strategy('sma_crossover')['metrics']
+        self.assertEqual(row['metrics'], expected)
+    
+    def test_process_pool_matches_in_process(self):
+        """Shared-memory workers produce the same ranked table"""
+        sequential = self.backtester.run_sweep(self.grid, max_workers=1)
+        parallel = self.backtester.run_sweep(self.grid, max_workers=2)
+        self.assertEqual(parallel, sequential)
+    
+    def test_ranking_and_invalid_combinations(self):
+        """Results are ranked best first; short >= long is skipped"""
+        results = self.backtester.run_sweep(self.grid, rank_by='total_return', max_workers=1)
+        self.assertEqual(len(results), 8)
+        returns = [r['metrics']['total_return'] for r in results]
+        self.assertEqual(returns, sorted(returns, reverse=True))
+    
+    def test_unknown_parameter(self):
+        with self.assertRaises(ValueError):
+            self.backtester.run_sweep({'window': [10]})
+
+class TestDateRange(unittest.TestCase):
+    def setUp(self):
+        self.backtester = Backtester('TEST.NS', '2023-01-01', '2023-06-30')
+        self.backtester.data_fetcher = DataFetcher(source=SyntheticSource(), store=False)
+    
+    def assert_within_range(self, results):
+        dates = [row['date'][:10] for row in results['portfolio_value']]
+        self.assertGreater(len(dates), 0)
+        self.assertGreaterEqual(min(dates), '2023-01-01')
+        self.assertLessEqual(max(dates), '2023-06-30')
+        for trade in results['trades']:
+            self.assertGreaterEqual(trade['date'][:10], '2023-01-01')
+    
+    def test_warmup_bars_precede_start(self):
+        """Only the range and the requested warm-up bars are loaded"""
+        df = self.backtester._load_data(warmup=200)
+        self.assertEqual(df.attrs['first_bar'], 200)
+        self.assertLess(str(df.index[199]), '2023-01-01')
+        self.assertGreaterEqual(str(df.index[200]), '2023-01-01')
+        self.assertLessEqual(str(df.index[-1])[:10], '2023-06-30')
+    
+    def test_results_bounded_to_range(self):
+        """Strategies trade and report only the requested dates"""
+        for strategy in ('buy_and_hold', 'sma_crossover'):
+            results = self.backtester.run_strategy(strategy)
+            self.assert_within_range(results)
+            # Warm-up covers the long window, so the curve starts on the first day
+            self.assertEqual(results['portfolio_value'][0]['date'][:10], '2023-01-02')
+    
+    def test_sweep_trades_the_range(self):
+        results = self.backtester.run_sweep({'short_window': [20, 50], 'long_window': [100, 200]}, max_workers=1)
+        expected = self.backtester.run_strategy('sma_crossover', {'short_window': 50, 'long_window': 200})
+        row = next(r for r in results if r['params'] == {'short_window': 50, 'long_window': 200})
+        self.assertEqual(row['metrics'], expected['metrics'])
+    
+    def test_empty_range(self):
+        self.backtester.start_date = self.backtester.end_date = '2023-01-01'
+        with self.assertRaises(ValueError):
+            self.backtester.run_strategy('buy_and_hold')
+
 if __name__ == '__main__':
     unittest.main()
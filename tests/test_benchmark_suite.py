@@ -0,0 +1,43 @@
+"""
+Test suite for the offline benchmark suite
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import unittest
+from benchmarks.suite import CASES, compare, run_suite, time_case
+
+
+def document(**best):
+    return {'results': {key: {'best': value} for key, value in best.items()}}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_time_case_prepares_fresh_inputs(self):
+        calls = []
+        timings = time_case(calls.append, lambda: (len(calls),), repeats=3)
+        self.assertEqual(len(timings), 3)
+        self.assertEqual(calls, [0, 1, 2, 3])
+
+    def test_run_suite_offline(self):
+        result = run_suite(sizes=[300], repeats=1, patterns=['fetch_stock_data.*', 'backtest.sma_crossover'],
+                           log=lambda line: None)
+        self.assertEqual(sorted(result['results']), [
+            'backtest.sma_crossover/300', 'fetch_stock_data.cached/300', 'fetch_stock_data.uncached/300',
+        ])
+        for entry in result['results'].values():
+            self.assertEqual(entry['size'], 300)
+            self.assertGreater(entry['best'], 0)
+        self.assertIn('inference.single', CASES)
+
+    def test_compare_flags_regressions(self):
+        rows = compare(document(a=1.5, b=1.0, c=0.5, d=1.0), document(a=1.0, b=1.1, c=1.0), threshold=0.2)
+        self.assertEqual({row['key']: row['status'] for row in rows},
+                         {'a': 'regression', 'b': 'ok', 'c': 'improvement', 'd': 'new'})
+        self.assertAlmostEqual(rows[0]['ratio'], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
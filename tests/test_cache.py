@@ -0,0 +1,89 @@
+"""
+Test suite for the TTL/LRU price cache
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.cache import TTLCache
+import threading
+import time
+import unittest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_bytes=100, sizeof=lambda value: 10, clock=self.clock)
+
+    def test_hit_after_miss(self):
+        """Second lookup is served from the cache"""
+        calls = []
+        loader = lambda: calls.append(1) or 'value'
+        self.assertEqual(self.cache.get_or_load('k', loader, ttl=60), 'value')
+        self.assertEqual(self.cache.get_or_load('k', loader, ttl=60), 'value')
+        self.assertEqual(len(calls), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_entries_expire(self):
+        """Values are reloaded once their TTL has passed"""
+        self.cache.get_or_load('k', lambda: 'old', ttl=60)
+        self.clock.now = 61
+        self.assertEqual(self.cache.get_or_load('k', lambda: 'new', ttl=60), 'new')
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    def test_lru_eviction_by_size(self):
+        """Least recently used entries are evicted when over max_bytes"""
+        for i in range(10):
+            self.cache.get_or_load(i, lambda: i, ttl=60)
+        self.cache.get_or_load(0, lambda: 'reloaded', ttl=60)  # touch 0
+        self.cache.get_or_load('new', lambda: 'new', ttl=60)
+        stats = self.cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['bytes'], 100)
+        self.assertEqual(self.cache.get_or_load(0, lambda: 'reloaded', ttl=60), 0)
+        self.assertEqual(self.cache.get_or_load(1, lambda: 'reloaded', ttl=60), 'reloaded')
+
+    def test_concurrent_misses_coalesce(self):
+        """N concurrent misses for one key trigger a single load"""
+        cache = TTLCache(max_bytes=1000)
+        calls = []
+        def slow_loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return [1, 2, 3]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load('k', slow_loader, ttl=60)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1, 2, 3]] * 8)
+        self.assertEqual(cache.stats()['coalesced'], 7)
+
+    def test_failed_load_is_not_cached(self):
+        """Loader errors propagate and the next lookup retries"""
+        def failing():
+            raise ValueError('upstream down')
+        with self.assertRaises(ValueError):
+            self.cache.get_or_load('k', failing, ttl=60)
+        self.assertEqual(self.cache.get_or_load('k', lambda: 'ok', ttl=60), 'ok')
+        self.assertEqual(self.cache.stats()['load_errors'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
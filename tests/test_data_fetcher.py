@@ -4,9 +4,42 @@ Test suite for data fetching service
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from backend.services.data_fetcher import DataFetcher
+from backend.services.data_store import OHLCVStore
+import shutil
+import tempfile
+import time
 import unittest
+import numpy as np
+import pandas as pd
+
+
+def make_history(start, end, tz='Asia/Kolkata'):
+    """Business-day bars shaped like yf.Ticker.history()"""
+    index = pd.bdate_range(start, end, tz=tz, name='Date').as_unit('ns')
+    close = np.linspace(100.0, 200.0, len(index))
+    return pd.DataFrame({
+        'Open': close - 1, 'High': close + 2, 'Low': close - 2, 'Close': close,
+        'Volume': np.arange(len(index), dtype=np.int64) * 1000,
+        'Dividends': 0.0, 'Stock Splits': 0.0,
+    }, index=index)
+
+
+class FakeUpstreamFetcher(DataFetcher):
+    """DataFetcher whose upstream is a fixed in-memory history"""
+    def __init__(self, history, **kwargs):
+        super().__init__(**kwargs)
+        self.history = history
+        self.downloads = []
+    
+    def _download(self, symbol, interval, period=None, start=None, end=None):
+        self.downloads.append({'period': period, 'start': start, 'end': end})
+        df = self.history
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start).tz_localize(df.index.tz)]
+        return df
 
 class TestDataFetcher(unittest.TestCase):
     def setUp(self):
@@ -24,5 +57,169 @@ class TestDataFetcher(unittest.TestCase):
         self.assertIsNotNone(info)
         self.assertIn('symbol', info)
 
+class LatencyFetcher(DataFetcher):
+    """Stand-in upstream that injects latency and scripted failures"""
+    def __init__(self, latency, failures=None, slow=None):
+        super().__init__(store=False)
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.slow = slow or {}
+        self.calls = []
+    
+    def _download(self, symbol, interval, period=None, start=None, end=None):
+        self.calls.append(symbol)
+        time.sleep(self.slow.get(symbol, self.latency))
+        if self.failures.get(symbol, 0) > 0:
+            self.failures[symbol] -= 1
+            raise ConnectionError('injected failure')
+        if symbol.startswith('EMPTY'):
+            return pd.DataFrame()
+        return make_history('2024-01-01', '2024-03-31')
+
+
+class TestBulkFetch(unittest.TestCase):
+    def test_concurrency_bounds_wall_time(self):
+        """Latency overlaps across symbols instead of adding up"""
+        fetcher = LatencyFetcher(latency=0.1)
+        symbols = [f'SYM{i}.NS' for i in range(20)]
+        result = fetcher.fetch_bulk(symbols, '2024-01-01', '2024-04-01', max_workers=10)
+        self.assertEqual(result['succeeded'], symbols)
+        self.assertLess(result['elapsed'], 1.0)
+    
+    def test_retries_with_backoff(self):
+        """Transient failures are retried and reported per symbol"""
+        fetcher = LatencyFetcher(latency=0.0, failures={'FLAKY.NS': 2, 'DOWN.NS': 10})
+        result = fetcher.fetch_bulk(['FLAKY.NS', 'DOWN.NS', 'EMPTY.NS'], retries=2, backoff=0.01)
+        results = result['results']
+        self.assertTrue(results['FLAKY.NS']['success'])
+        self.assertEqual(results['FLAKY.NS']['attempts'], 3)
+        self.assertFalse(results['DOWN.NS']['success'])
+        self.assertIn('injected failure', results['DOWN.NS']['error'])
+        self.assertEqual(results['EMPTY.NS']['attempts'], 1)
+        self.assertEqual(result['failed'], ['DOWN.NS', 'EMPTY.NS'])
+    
+    def test_per_symbol_timeout(self):
+        """A hung symbol times out without holding up the others"""
+        fetcher = LatencyFetcher(latency=0.01, slow={'HUNG.NS': 2.0})
+        result = fetcher.fetch_bulk(['HUNG.NS', 'TCS.NS'], timeout=0.2, retries=0)
+        self.assertEqual(result['succeeded'], ['TCS.NS'])
+        self.assertIn('timed out', result['results']['HUNG.NS']['error'])
+        self.assertLess(result['elapsed'], 1.0)
+    
+    def test_fetch_nse_bse_stocks_returns_frames(self):
+        """The legacy API still returns a dict of DataFrames"""
+        fetcher = LatencyFetcher(latency=0.0, failures={'DOWN.NS': 10})
+        data = fetcher.fetch_nse_bse_stocks(['TCS.NS', 'DOWN.NS'], '2024-01-01', '2024-04-01')
+        self.assertEqual(list(data), ['TCS.NS'])
+        self.assertFalse(data['TCS.NS'].empty)
+
+
+class TestOHLCVStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = OHLCVStore(self.root)
+        self.history = make_history('2020-01-01', '2020-12-31')
+    
+    def tearDown(self):
+        shutil.rmtree(self.root)
+    
+    def test_write_read_roundtrip(self):
+        """Stored bars come back with the same index, columns and dtypes"""
+        self.store.write('TCS.NS', '1d', self.history)
+        df = self.store.read('TCS.NS', '1d')
+        pd.testing.assert_frame_equal(df, self.history, check_freq=False)
+    
+    def test_append_replaces_overlapping_tail(self):
+        """Appending from the last stored date replaces that bar"""
+        head, tail = self.history.iloc[:200], self.history.iloc[199:]
+        self.store.write('TCS.NS', '1d', head)
+        self.store.append('TCS.NS', '1d', tail)
+        df = self.store.read('TCS.NS', '1d')
+        pd.testing.assert_frame_equal(df, self.history, check_freq=False)
+    
+    def test_read_window(self):
+        """Reads are sliced to [start, end)"""
+        self.store.write('TCS.NS', '1d', self.history)
+        start = pd.Timestamp('2020-03-01', tz='Asia/Kolkata').value
+        end = pd.Timestamp('2020-04-01', tz='Asia/Kolkata').value
+        df = self.store.read('TCS.NS', '1d', start_ns=start, end_ns=end)
+        self.assertEqual(df.index[0].month, 3)
+        self.assertEqual(df.index[-1].month, 3)
+
+
+class TestDataFetcherStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.history = make_history('2015-01-01', pd.Timestamp.now().strftime('%Y-%m-%d'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.root)
+    
+    def make_fetcher(self, max_age=3600):
+        return FakeUpstreamFetcher(self.history, store=OHLCVStore(self.root), max_age=max_age)
+    
+    def test_repeat_fetch_reads_locally(self):
+        """A second fetch of the same history does not go upstream"""
+        fetcher = self.make_fetcher()
+        first = fetcher.fetch_stock_data('INFY.NS', period='max')
+        second = fetcher.fetch_stock_data('INFY.NS', period='1y')
+        self.assertEqual(len(fetcher.downloads), 1)
+        self.assertEqual(first[-1], second[-1])
+        self.assertLess(len(second), len(first))
+    
+    def test_stale_partition_fetches_only_tail(self):
+        """A stale partition refreshes from its last stored date"""
+        fetcher = self.make_fetcher()
+        fetcher.history = self.history.iloc[:-10]
+        fetcher.fetch_stock_data('INFY.NS', period='max')
+        
+        fetcher.history = self.history
+        fetcher.max_age = 0
+        data = fetcher.fetch_stock_data('INFY.NS', period='max')
+        self.assertEqual(len(data), len(self.history))
+        tail_start = fetcher.downloads[-1]['start']
+        self.assertEqual(tail_start, self.history.index[-11].strftime('%Y-%m-%d'))
+    
+    def test_earlier_start_refetches(self):
+        """Requesting further back than stored downloads again"""
+        fetcher = self.make_fetcher()
+        fetcher.fetch_stock_data('INFY.NS', period='1y')
+        data = fetcher.fetch_stock_data('INFY.NS', period='5y')
+        self.assertEqual(len(fetcher.downloads), 2)
+        self.assertGreater(len(data), 1000)
+    
+    def test_ytd_period_reads_store(self):
+        """'ytd' is served from the store from January 1st, not mistaken for a day count"""
+        fetcher = self.make_fetcher()
+        fetcher.mock_fallback = False
+        fetcher.fetch_stock_data('INFY.NS', period='max')
+        data = fetcher.fetch_stock_data('INFY.NS', period='ytd')
+        self.assertEqual(len(fetcher.downloads), 1)
+        year = str(self.history.index[-1].year)
+        self.assertEqual(data[0]['Date'][:4], year)
+        self.assertEqual(len(data), int((self.history.index.year == int(year)).sum()))
+    
+    def test_fetch_nse_bse_stocks_reads_store(self):
+        """Bulk fetches are served from the store and bounded to the range"""
+        fetcher = self.make_fetcher()
+        fetcher.fetch_stock_data('INFY.NS', period='max')
+        data = fetcher.fetch_nse_bse_stocks(['INFY.NS'], '2019-01-01', '2020-01-01')
+        self.assertEqual(len(fetcher.downloads), 1)
+        df = data['INFY.NS']
+        self.assertEqual(df.index[0].year, 2019)
+        self.assertEqual(df.index[-1].year, 2019)
+
+    def test_fetch_window_downloads_only_the_range(self):
+        """A date window fetches its range plus a warm-up margin, not the full history"""
+        fetcher = FakeUpstreamFetcher(self.history, store=False)
+        records, n_warmup = fetcher.fetch_window('INFY.NS', '2020-01-01', '2020-12-31', warmup=50)
+        self.assertEqual(fetcher.downloads[0]['period'], None)
+        self.assertEqual(fetcher.downloads[0]['end'], '2021-01-01')
+        self.assertGreater(fetcher.downloads[0]['start'], '2019-09-01')
+        self.assertEqual(n_warmup, 50)
+        self.assertLess(records[n_warmup - 1]['Date'], '2020-01-01')
+        self.assertEqual(records[n_warmup]['Date'][:10], '2020-01-01')
+        self.assertEqual(records[-1]['Date'][:10], '2020-12-31')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+"""
+Test suite for the streaming training input pipeline
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.synthetic import generate_ohlcv
+import importlib.util
+import unittest
+import numpy as np
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+def collect(dataset):
+    batches = list(dataset.as_numpy_iterator())
+    return np.concatenate([x for x, _ in batches]), np.concatenate([y for _, y in batches])
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestWindowDataset(unittest.TestCase):
+    def setUp(self):
+        from models.cnn_lstm_model import CNNLSTMModel
+        self.model = CNNLSTMModel(sequence_length=20)
+        self.frames = [generate_ohlcv(symbol, bars=bars).reset_index(drop=True)
+                       for symbol, bars in (('AAA.NS', 300), ('BBB.NS', 150))]
+
+    def test_matches_materialized_windows(self):
+        X_train, y_train, X_test, y_test = self.model.prepare_data(self.frames[0].copy())
+        train, val = self.model.prepare_datasets(self.frames[0], batch_size=16, shuffle_buffer=None)
+        for dataset, X, y in ((train, X_train, y_train), (val, X_test, y_test)):
+            windows, targets = collect(dataset)
+            np.testing.assert_allclose(windows, X, rtol=1e-6)
+            np.testing.assert_allclose(targets, y, rtol=1e-6)
+
+    def test_pooled_windows_stay_within_a_symbol(self):
+        from models.data_pipeline import window_starts
+        starts = window_starts([300, 150], 20, stop=0.8)
+        self.assertEqual(len(starts), int(280 * 0.8) + int(130 * 0.8))
+        self.assertTrue(((starts + 20 < 300) | (starts >= 300)).all())
+
+        train, _ = self.model.prepare_datasets(self.frames, batch_size=32, shuffle_buffer=None)
+        windows, _ = collect(train)
+        self.assertEqual(len(windows), len(starts))
+        self.assertEqual(len(self.model.scalers), 2)
+
+    def test_shuffle_is_a_permutation(self):
+        ordered, _ = self.model.prepare_datasets(self.frames, shuffle_buffer=None)
+        shuffled, _ = self.model.prepare_datasets(self.frames, shuffle_buffer=64, seed=1)
+        _, y_ordered = collect(ordered)
+        _, y_shuffled = collect(shuffled)
+        self.assertFalse(np.array_equal(y_ordered, y_shuffled))
+        np.testing.assert_array_equal(np.sort(y_ordered), np.sort(y_shuffled))
+
+    def test_trains_on_datasets(self):
+        train, val = self.model.prepare_datasets(self.frames, batch_size=64)
+        history = self.model.train(train, X_val=val, epochs=1)
+        self.assertIn('val_loss', history.history)
+
+if __name__ == '__main__':
+    unittest.main()
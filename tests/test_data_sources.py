@@ -0,0 +1,140 @@
+"""
+Test suite for the pluggable market-data sources
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.data_fetcher import DataFetcher
+from services.data_sources import (
+    RecordingSource, ReplaySource, SyntheticSource, RecordingNotFoundError, InjectedError,
+    ThrottledError, create_data_source, latency_distribution
+)
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+
+class TestLatencyDistribution(unittest.TestCase):
+    def test_specs(self):
+        rng = np.random.default_rng(0)
+        self.assertEqual(latency_distribution(None)(rng), 0.0)
+        self.assertEqual(latency_distribution('0.05')(rng), 0.05)
+        self.assertEqual(latency_distribution('fixed:0.02')(rng), 0.02)
+        draws = [latency_distribution('uniform:0.01,0.02')(rng) for _ in range(100)]
+        self.assertTrue(all(0.01 <= d <= 0.02 for d in draws))
+        self.assertTrue(all(latency_distribution('normal:0,1')(rng) >= 0 for _ in range(100)))
+        self.assertTrue(all(latency_distribution('pareto:0.01,2')(rng) >= 0.01 for _ in range(100)))
+        median = np.median([latency_distribution('lognormal:0.05,0.5')(rng) for _ in range(2000)])
+        self.assertAlmostEqual(median, 0.05, delta=0.005)
+
+    def test_invalid_specs(self):
+        for spec in ('gamma:1,2', 'uniform:1', 'fixed:fast'):
+            with self.assertRaises(ValueError):
+                latency_distribution(spec)
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.recorder = RecordingSource(SyntheticSource(), self.root)
+        self.recorded = self.recorder.history('TCS.NS', '1d', period='2y')
+        self.recorded.index = self.recorded.index.as_unit('ns')
+        self.recorder.info('TCS.NS')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_replay_serves_recording(self):
+        replay = ReplaySource(self.root)
+        pd.testing.assert_frame_equal(replay.history('TCS.NS', '1d', period='max'), self.recorded,
+                                      check_freq=False)
+        self.assertEqual(replay.info('TCS.NS')['symbol'], 'TCS.NS')
+        with self.assertRaises(RecordingNotFoundError):
+            replay.history('INFY.NS', '1d', period='1y')
+
+    def test_periods_end_at_last_recorded_bar(self):
+        replay = ReplaySource(self.root)
+        last = self.recorded.index[-1]
+        year = replay.history('TCS.NS', '1d', period='1y')
+        self.assertEqual(year.index[-1], last)
+        self.assertGreaterEqual(year.index[0], last.normalize() - pd.DateOffset(years=1))
+        self.assertEqual(len(replay.history('TCS.NS', '1d', period='5d')), 5)
+        ytd = replay.history('TCS.NS', '1d', period='ytd')
+        self.assertEqual(ytd.index[-1], last)
+        self.assertEqual(ytd.index[0].year, last.year)
+        self.assertEqual(len(ytd), int((self.recorded.index.year == last.year).sum()))
+        start = self.recorded.index[100].strftime('%Y-%m-%d')
+        end = self.recorded.index[110].strftime('%Y-%m-%d')
+        window = replay.history('TCS.NS', '1d', start=start, end=end)
+        pd.testing.assert_frame_equal(window, self.recorded.iloc[100:110], check_freq=False)
+
+    def test_recordings_merge(self):
+        tail = self.recorder.history('TCS.NS', '1d', start=self.recorded.index[-5].strftime('%Y-%m-%d'))
+        self.assertEqual(len(tail), 5)
+        self.assertEqual(len(ReplaySource(self.root).history('TCS.NS', '1d', period='max')), len(self.recorded))
+
+    def test_injected_errors(self):
+        replay = ReplaySource(self.root, error_rate=1.0)
+        with self.assertRaises(InjectedError):
+            replay.history('TCS.NS', '1d', period='1y')
+        fetcher = DataFetcher(store=False, source=replay, mock_fallback=False)
+        with self.assertRaises(InjectedError):
+            fetcher.fetch_stock_data('TCS.NS', period='1y')
+        self.assertGreater(len(DataFetcher(store=False, source=replay, mock_fallback=True)
+                               .fetch_stock_data('TCS.NS', period='1y')), 0)
+        self.assertEqual(replay.stats()['errors'], 3)
+
+    def test_seeded_latency_is_repeatable(self):
+        delays = []
+        for _ in range(2):
+            replay = ReplaySource(self.root, latency='uniform:0,0.002', error_rate=0.3, seed=7)
+            for _ in range(10):
+                try:
+                    replay.history('TCS.NS', '1d', period='5d')
+                except InjectedError:
+                    pass
+            delays.append(replay.stats())
+        self.assertEqual(delays[0], delays[1])
+        self.assertGreater(delays[0]['delay_seconds'], 0)
+
+    def test_throttle_reject(self):
+        replay = ReplaySource(self.root, max_rps=2, throttle='reject')
+        replay.history('TCS.NS', '1d', period='5d')
+        replay.history('TCS.NS', '1d', period='5d')
+        with self.assertRaises(ThrottledError):
+            replay.history('TCS.NS', '1d', period='5d')
+        self.assertEqual(replay.stats()['throttled'], 1)
+
+    def test_throttle_delay(self):
+        replay = ReplaySource(self.root, max_rps=50)
+        start = time.perf_counter()
+        for _ in range(50 + 5):
+            replay.history('TCS.NS', '1d', period='5d')
+        # The first second's burst is free; the 5 requests beyond it wait 1/50 s each
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+    def test_fetcher_reads_replay_through_store(self):
+        store_root = tempfile.mkdtemp()
+        try:
+            from services.data_store import OHLCVStore
+            fetcher = DataFetcher(store=OHLCVStore(store_root), source=ReplaySource(self.root),
+                                  mock_fallback=False)
+            records = fetcher.fetch_stock_data('TCS.NS', period='max')
+            self.assertEqual(len(records), len(self.recorded))
+            self.assertEqual(records[-1]['Close'], self.recorded['Close'].iloc[-1])
+        finally:
+            shutil.rmtree(store_root)
+
+    def test_create_data_source(self):
+        self.assertIsInstance(create_data_source('synthetic'), SyntheticSource)
+        with self.assertRaises(ValueError):
+            create_data_source('bloomberg')
+
+
+if __name__ == '__main__':
+    unittest.main()
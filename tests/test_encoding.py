@@ -0,0 +1,107 @@
+"""
+Test suite for columnar and compressed API responses
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.encoding import dates_to_epoch, records_to_columns, backtest_to_columns, dumps
+from services.data_fetcher import DataFetcher
+import gzip
+import json
+import unittest
+import numpy as np
+
+
+class TestColumnarEncoding(unittest.TestCase):
+    def test_daily_dates_become_epoch_days(self):
+        self.assertEqual(dates_to_epoch(['1970-01-02', '2024-01-01']), ([1, 19723], 'day'))
+        self.assertEqual(dates_to_epoch(['2024-01-01 00:00:00+05:30']), ([19723], 'day'))
+
+    def test_dates_spanning_dst_change(self):
+        """US daily bars switch from -05:00 to -04:00 in March"""
+        days, unit = dates_to_epoch(['2024-03-08 00:00:00-05:00', '2024-03-11 00:00:00-04:00'])
+        self.assertEqual(unit, 'day')
+        self.assertEqual(days, [19790, 19793])
+
+    def test_intraday_dates_become_epoch_seconds(self):
+        seconds, unit = dates_to_epoch(['1970-01-01 09:15:00', '1970-01-01 09:16:00'])
+        self.assertEqual((seconds, unit), ([33300, 33360], 's'))
+
+    def test_non_date_labels_pass_through(self):
+        self.assertEqual(dates_to_epoch(['0', '1']), (['0', '1'], None))
+
+    def test_price_records_roundtrip(self):
+        records = DataFetcher(store=False)._generate_mock_data('TCS.NS', '1y')
+        columns = records_to_columns(records, 'Date')
+        self.assertEqual(columns['date_unit'], 'day')
+        self.assertEqual(columns['Close'], [r['Close'] for r in records])
+        self.assertEqual(columns['Volume'], [r['Volume'] for r in records])
+        self.assertEqual(len(columns['Date']), len(records))
+
+    def test_backtest_results(self):
+        results = {
+            'portfolio_value': [{'date': '2024-01-01', 'value': 100.0}, {'date': '2024-01-02', 'value': 101.5}],
+            'trades': [],
+            'metrics': {'total_return': 1.5},
+        }
+        columns = backtest_to_columns(results)
+        self.assertEqual(columns['portfolio_value'], {'date': [19723, 19724], 'value': [100.0, 101.5], 'date_unit': 'day'})
+        self.assertEqual(columns['trades'], {'date_unit': None})
+        self.assertEqual(columns['metrics'], results['metrics'])
+
+    def test_dumps_handles_numpy(self):
+        payload = {'a': np.float64(1.5), 'b': np.int64(2), 'c': np.arange(3)}
+        self.assertEqual(json.loads(dumps(payload)), {'a': 1.5, 'b': 2, 'c': [0, 1, 2]})
+
+
+class TestColumnarEndpoints(unittest.TestCase):
+    def setUp(self):
+        from flask import Flask
+        from api import stock_routes, backtest_routes
+        from config import Config
+        self.stock_routes = stock_routes
+        self.original_fetch = stock_routes.data_fetcher.fetch_stock_data
+        self.records = DataFetcher(store=False)._generate_mock_data('TCS.NS', '5y')
+        stock_routes.data_fetcher.fetch_stock_data = lambda symbol, period, interval: self.records
+        stock_routes.price_cache.clear()
+        self.original_stream_min = Config.RESPONSE_STREAM_MIN_BYTES
+        self.config = Config
+        app = Flask(__name__)
+        app.register_blueprint(stock_routes.stock_bp)
+        app.register_blueprint(backtest_routes.backtest_bp)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.stock_routes.data_fetcher.fetch_stock_data = self.original_fetch
+        self.stock_routes.price_cache.clear()
+        self.config.RESPONSE_STREAM_MIN_BYTES = self.original_stream_min
+
+    def test_default_format_unchanged(self):
+        response = self.client.get('/api/stock/price/TCS.NS?period=5y')
+        self.assertEqual(response.get_json()['data'], self.records)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_columnar_gzip(self):
+        response = self.client.get('/api/stock/price/TCS.NS?period=5y&format=columnar',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        payload = json.loads(gzip.decompress(response.get_data()))
+        self.assertEqual(payload['format'], 'columnar')
+        self.assertEqual(payload['data']['Close'], [r['Close'] for r in self.records])
+
+    def test_streamed_body_is_valid_gzip(self):
+        self.config.RESPONSE_STREAM_MIN_BYTES = 1
+        response = self.client.get('/api/stock/price/TCS.NS?period=5y&format=columnar',
+                                   headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue(response.is_streamed)
+        payload = json.loads(gzip.decompress(response.get_data()))
+        self.assertEqual(len(payload['data']['Date']), len(self.records))
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/stock/price/TCS.NS?format=xml')
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
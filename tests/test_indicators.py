@@ -0,0 +1,91 @@
+"""
+Test suite for the streaming indicator engine
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.indicators import SMA, EMA, RSI, IndicatorEngine, feature_indicators
+import importlib.util
+import unittest
+import numpy as np
+import pandas as pd
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+def make_prices(n_bars, seed=0):
+    """Random walk with flat stretches, so RSI hits its 100 and NaN cases"""
+    rng = np.random.default_rng(seed)
+    close = np.round(1000.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_bars))), 2)
+    close[100:130] = close[100]
+    close[300:320] = np.linspace(close[300], close[300] * 1.2, 20)
+    return close
+
+
+def pandas_indicators(close):
+    """The formulas CNNLSTMModel used before the indicator engine"""
+    df = pd.DataFrame({'Close': close})
+    df['SMA_20'] = df['Close'].rolling(window=20).mean()
+    df['SMA_50'] = df['Close'].rolling(window=50).mean()
+    df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['RSI'] = 100 - (100 / (1 + gain / loss))
+    return df
+
+
+class TestIndicators(unittest.TestCase):
+    def setUp(self):
+        self.close = make_prices(2000)
+        self.expected = pandas_indicators(self.close)
+
+    def test_bulk_matches_pandas(self):
+        results = feature_indicators().initialize(self.close)
+        for name, values in results.items():
+            np.testing.assert_array_equal(values, self.expected[name].to_numpy(), err_msg=name)
+
+    def test_updates_match_bulk(self):
+        """Initializing on a prefix and streaming the rest gives the same series"""
+        for split in (0, 10, 500):
+            engine = feature_indicators()
+            engine.initialize(self.close[:split])
+            streamed = [engine.update(price) for price in self.close[split:]]
+            for name in engine.indicators:
+                actual = np.array([row[name] for row in streamed])
+                np.testing.assert_allclose(actual, self.expected[name].to_numpy()[split:],
+                                           rtol=1e-10, atol=1e-9, err_msg=f'{name} from bar {split}')
+
+    def test_rsi_edge_cases(self):
+        rsi = RSI(14)
+        rsi.initialize(self.close[:101])
+        flat = [rsi.update(self.close[100]) for _ in range(14)]
+        self.assertTrue(np.isnan(flat[-1]))
+        rising = [rsi.update(self.close[100] + step) for step in range(1, 15)]
+        self.assertEqual(rising[-1], 100.0)
+
+    def test_warm_up_is_nan(self):
+        sma = SMA(5)
+        values = [sma.update(price) for price in [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]]
+        self.assertTrue(np.isnan(values[:4]).all())
+        self.assertEqual(values[4:], [3.0, 4.0])
+        ema = EMA(3)
+        self.assertEqual([ema.update(price) for price in [2.0, 4.0]], [2.0, 3.0])
+
+    def test_engine_apply(self):
+        engine = IndicatorEngine({'fast': SMA(3), 'slow': SMA(10)})
+        df = engine.apply(pd.DataFrame({'Close': self.close[:50]}))
+        np.testing.assert_array_equal(df['fast'], pd.Series(self.close[:50]).rolling(3).mean())
+        self.assertEqual(engine.values()['slow'], df['slow'].iloc[-1])
+
+    @unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+    def test_model_features_unchanged(self):
+        from models.cnn_lstm_model import CNNLSTMModel
+        df = CNNLSTMModel().add_technical_indicators(pd.DataFrame({'Close': self.close}))
+        expected = self.expected.bfill().fillna(0)
+        pd.testing.assert_frame_equal(df, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Test suite for the micro-batching inference scheduler
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.inference_scheduler import InferenceScheduler
+import threading
+import time
+import unittest
+import numpy as np
+
+
+class FakeModel:
+    """Sums each window; every call has a fixed overhead"""
+    def __init__(self, overhead=0.02, fail=False):
+        self.overhead = overhead
+        self.fail = fail
+        self.batch_sizes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, model, batch):
+        with self.lock:
+            self.batch_sizes.append(len(batch))
+        time.sleep(self.overhead)
+        if self.fail:
+            raise RuntimeError('model failed')
+        return batch.sum(axis=(1, 2)).reshape(-1, 1)
+
+
+def run_clients(scheduler, model, n_clients):
+    results = [None] * n_clients
+    errors = [None] * n_clients
+    def client(i):
+        try:
+            results[i] = scheduler.predict(model, np.full((60, 5), i, dtype=np.float32), timeout=5)
+        except Exception as e:
+            errors[i] = e
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+class TestInferenceScheduler(unittest.TestCase):
+    def test_concurrent_requests_are_batched(self):
+        """Concurrent callers share forward passes and get their own rows back"""
+        model = FakeModel()
+        scheduler = InferenceScheduler(max_batch_size=64, max_wait_ms=20, forward=model)
+        results, _ = run_clients(scheduler, model, 32)
+        for i, result in enumerate(results):
+            np.testing.assert_allclose(result, [[i * 300.0]])
+        self.assertLess(len(model.batch_sizes), 8)
+        self.assertEqual(sum(model.batch_sizes), 32)
+
+    def test_max_batch_size(self):
+        """No forward pass exceeds max_batch_size rows"""
+        model = FakeModel()
+        scheduler = InferenceScheduler(max_batch_size=4, max_wait_ms=20, forward=model)
+        run_clients(scheduler, model, 20)
+        self.assertLessEqual(max(model.batch_sizes), 4)
+        self.assertEqual(sum(model.batch_sizes), 20)
+
+    def test_lone_request_waits_at_most_max_wait(self):
+        model = FakeModel(overhead=0.0)
+        scheduler = InferenceScheduler(max_batch_size=64, max_wait_ms=10, forward=model)
+        start = time.perf_counter()
+        scheduler.predict(model, np.zeros((1, 60, 5)))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_errors_reach_every_caller_in_the_batch(self):
+        model = FakeModel(fail=True)
+        scheduler = InferenceScheduler(max_batch_size=64, max_wait_ms=20, forward=model)
+        _, errors = run_clients(scheduler, model, 5)
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+        self.assertEqual(scheduler.stats()['errors'], len(model.batch_sizes))
+
+    def test_idle_worker_exits(self):
+        model = FakeModel(overhead=0.0)
+        scheduler = InferenceScheduler(max_wait_ms=1, forward=model, idle_timeout=0.05)
+        scheduler.predict(model, np.zeros((1, 60, 5)))
+        time.sleep(0.2)
+        self.assertEqual(scheduler.stats()['active_models'], 0)
+        scheduler.predict(model, np.zeros((1, 60, 5)))
+        self.assertEqual(scheduler.stats()['batches'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Test suite for the background backtest job queue
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.job_queue import JobQueue, QueueFullError, JobNotFoundError, report_progress
+import json
+import shutil
+import tempfile
+import time
+import unittest
+
+
+def echo_runner(value, steps=3):
+    for step in range(steps):
+        report_progress(f'step {step}', (step + 1) / steps)
+    return {'value': value}
+
+
+def failing_runner():
+    raise ValueError('bad strategy')
+
+
+def slow_runner(seconds):
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        report_progress('working', 0.5)
+        time.sleep(0.02)
+    return 'finished'
+
+
+def late_runner(seconds):
+    report_progress('finishing', 0.9)
+    time.sleep(seconds)
+    return 'finished'
+
+
+def wait_for(queue, job_id, timeout=30.0):
+    for snapshot in queue.watch(job_id, timeout=timeout):
+        if snapshot is not None and snapshot['status'] in ('succeeded', 'failed', 'cancelled'):
+            return snapshot
+    return queue.get(job_id)
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(runner=echo_runner, max_workers=1, max_pending=4, result_cache_path='')
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_runs_job_and_reports_progress(self):
+        job_id = self.queue.submit(value=42)
+        snapshots = [s for s in self.queue.watch(job_id, timeout=30.0) if s is not None]
+        final = snapshots[-1]
+        self.assertEqual(final['status'], 'succeeded')
+        self.assertEqual(final['result'], {'value': 42})
+        self.assertEqual(final['progress'], 1.0)
+        self.assertIsNotNone(final['run_seconds'])
+        progress = [s['progress'] for s in snapshots]
+        self.assertEqual(progress, sorted(progress))
+        stats = self.queue.stats()
+        self.assertEqual((stats['succeeded'], stats['queued'], stats['running']), (1, 0, 0))
+
+    def test_failed_job(self):
+        self.queue.runner = failing_runner
+        final = wait_for(self.queue, self.queue.submit())
+        self.assertEqual(final['status'], 'failed')
+        self.assertIn('bad strategy', final['error'])
+
+    def test_cancel_running_and_queued_jobs(self):
+        self.queue.runner = slow_runner
+        running = self.queue.submit(seconds=30)
+        queued = self.queue.submit(seconds=30)
+        for snapshot in self.queue.watch(running, timeout=30.0):
+            if snapshot is not None and snapshot['status'] == 'running':
+                break
+        self.assertEqual(self.queue.cancel(queued)['status'], 'cancelled')
+        self.queue.cancel(running)
+        final = wait_for(self.queue, running)
+        self.assertEqual(final['status'], 'cancelled')
+        self.assertLess(final['run_seconds'], 10)
+        self.assertIsNone(self.queue.get(queued)['started_at'])
+
+    def test_cancel_after_last_checkpoint(self):
+        """A job cancelled past its last progress checkpoint is not reported as succeeded"""
+        self.queue.runner = late_runner
+        job_id = self.queue.submit(seconds=1.0)
+        for snapshot in self.queue.watch(job_id, timeout=30.0):
+            if snapshot is not None and snapshot['progress'] >= 0.9:
+                break
+        self.queue.cancel(job_id)
+        final = wait_for(self.queue, job_id)
+        self.assertEqual(final['status'], 'cancelled')
+        self.assertNotIn('result', final)
+        self.assertEqual(self.queue.stats()['succeeded'], 0)
+
+    def test_queue_depth_is_bounded(self):
+        self.queue.runner = slow_runner
+        jobs = [self.queue.submit(seconds=30) for _ in range(4)]
+        with self.assertRaises(QueueFullError):
+            self.queue.submit(seconds=30)
+        self.assertEqual(self.queue.stats()['rejected'], 1)
+        for job_id in jobs:
+            self.queue.cancel(job_id)
+        for job_id in jobs:
+            wait_for(self.queue, job_id)
+        # Slots are released once jobs finish
+        self.queue.runner = echo_runner
+        self.assertEqual(wait_for(self.queue, self.queue.submit(value=1))['status'], 'succeeded')
+
+    def test_unknown_job(self):
+        with self.assertRaises(JobNotFoundError):
+            self.queue.get('missing')
+
+
+class TestBacktestJobs(unittest.TestCase):
+    def setUp(self):
+        from flask import Flask
+        from api import backtest_routes
+        self.root = tempfile.mkdtemp()
+        self.routes = backtest_routes
+        self.original_queue = backtest_routes.job_queue
+        backtest_routes.job_queue = JobQueue(max_workers=1, result_cache_path=self.root)
+        app = Flask(__name__)
+        app.register_blueprint(backtest_routes.backtest_bp)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.routes.job_queue.shutdown()
+        self.routes.job_queue = self.original_queue
+        shutil.rmtree(self.root)
+
+    def test_submit_and_stream_backtest(self):
+        """A real backtest runs in the pool and streams progress to the end"""
+        response = self.client.post('/api/backtest/jobs', json={'symbol': 'RELIANCE.NS', 'strategy': 'sma_crossover'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+
+        stream = self.client.get(f'/api/backtest/jobs/{job_id}/events')
+        self.assertEqual(stream.mimetype, 'text/event-stream')
+        events = [json.loads(line[len('data: '):]) for line in stream.get_data(as_text=True).splitlines()
+                  if line.startswith('data: ')]
+        self.assertEqual(events[-1]['status'], 'succeeded')
+        self.assertIn('loading data', [event['stage'] for event in events])
+
+        job = self.client.get(f'/api/backtest/jobs/{job_id}').get_json()['job']
+        self.assertIn('total_return', job['result']['metrics'])
+        self.assertEqual(self.client.get('/api/backtest/jobs/missing').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
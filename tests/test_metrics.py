@@ -0,0 +1,98 @@
+"""
+Test suite for the vectorized equity-curve metrics
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.metrics import equity_metrics, rolling_metrics, metrics_table
+from backend.services.synthetic import generate_close_matrix
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+
+
+def reference_metrics(values, initial_capital):
+    """Straightforward single-curve formulas the batched pass must match"""
+    values = np.asarray(values, dtype=float)
+    returns = np.diff(values) / values[:-1]
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    peaks = np.maximum.accumulate(np.concatenate([[initial_capital], values]))[1:]
+    moving = returns[returns != 0]
+    return {
+        'total_return': (values[-1] / initial_capital - 1) * 100,
+        'cagr': ((values[-1] / initial_capital) ** (252 / (len(values) - 1)) - 1) * 100,
+        'volatility': np.std(returns) * np.sqrt(252) * 100,
+        'sharpe_ratio': np.mean(returns) / np.std(returns) * np.sqrt(252),
+        'sortino_ratio': np.mean(returns) / downside * np.sqrt(252),
+        'max_drawdown': min(np.min(values / peaks - 1), 0) * 100,
+        'win_rate': np.mean(moving > 0) * 100,
+        'final_value': values[-1],
+    }
+
+
+class TestEquityMetrics(unittest.TestCase):
+    def setUp(self):
+        self.curves = generate_close_matrix(1000, 20, seed=3).T * 100
+
+    def test_batch_matches_single_curves(self):
+        batched = equity_metrics(self.curves, 100_000)
+        for i, curve in enumerate(self.curves):
+            for name, expected in reference_metrics(curve, 100_000).items():
+                self.assertAlmostEqual(batched[name][i], expected, places=6, msg=f'{name} run {i}')
+
+    def test_nan_padded_curves(self):
+        """Shorter curves right-padded with NaN score as if passed alone"""
+        padded = self.curves.copy()
+        padded[1, 600:] = np.nan
+        batched = equity_metrics(padded, 100_000)
+        alone = equity_metrics(self.curves[1, :600], 100_000)
+        for name, values in alone.items():
+            self.assertAlmostEqual(batched[name][1], values[0], places=9, msg=name)
+        self.assertEqual(batched['num_bars'][1], 600)
+
+    def test_zero_variance_and_empty(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            flat, empty = metrics_table([100.0] * 50, 100.0), metrics_table([], 100.0)
+        self.assertEqual(flat[0]['sharpe_ratio'], 0.0)
+        self.assertEqual(flat[0]['sortino_ratio'], 0.0)
+        self.assertEqual(flat[0]['max_drawdown'], 0.0)
+        self.assertIsNone(flat[0]['win_rate'])
+        self.assertTrue(all(value is None for name, value in empty[0].items() if name != 'num_trades'))
+
+    def test_drawdown_from_initial_capital(self):
+        metrics = equity_metrics([90.0, 95.0, 80.0, 120.0], 100.0)
+        self.assertAlmostEqual(metrics['max_drawdown'][0], -20.0)
+
+    def test_table_rows(self):
+        rows = metrics_table(self.curves[:3], 100_000, [1, 2, 3])
+        self.assertEqual([row['num_trades'] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]['final_value'], round(self.curves[0, -1], 2))
+
+
+class TestRollingMetrics(unittest.TestCase):
+    def test_matches_pandas_rolling(self):
+        curves = generate_close_matrix(800, 5, seed=7).T
+        rolling = rolling_metrics(curves, 63)
+        for i, curve in enumerate(curves):
+            returns = pd.Series(curve).pct_change()
+            std = returns.rolling(63).std(ddof=0)
+            expected_sharpe = (returns.rolling(63).mean() / std * np.sqrt(252)).to_numpy()
+            np.testing.assert_allclose(rolling['rolling_sharpe'][i], expected_sharpe, rtol=1e-6, equal_nan=True)
+            np.testing.assert_allclose(rolling['rolling_volatility'][i], (std * np.sqrt(252) * 100).to_numpy(),
+                                       rtol=1e-6, equal_nan=True)
+            np.testing.assert_allclose(rolling['rolling_return'][i], (pd.Series(curve).pct_change(63) * 100).to_numpy(),
+                                       rtol=1e-9, equal_nan=True)
+
+    def test_flat_windows(self):
+        curve = np.concatenate([np.linspace(100, 120, 50), np.full(50, 120.0)])
+        rolling = rolling_metrics(curve, 10)
+        self.assertTrue(np.isnan(rolling['rolling_sharpe'][0, :10]).all())
+        self.assertTrue((rolling['rolling_sharpe'][0, 60:] == 0).all())
+        self.assertTrue((rolling['rolling_volatility'][0, 60:] == 0).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Test suite for the model registry and prediction endpoint
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.model_registry import ModelRegistry, ModelNotFoundError, MODEL_FILENAME
+import importlib.util
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+def touch_model(root, symbol=None, version=None):
+    directory = os.path.join(root, symbol) if symbol else root
+    if version is not None:
+        directory = os.path.join(directory, f'v{version}')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, MODEL_FILENAME)
+    open(path, 'w').close()
+    return path
+
+
+class FakePredictor:
+    def __init__(self, path):
+        self.path = path
+
+    def predict_next_days(self, df, days):
+        return np.linspace(0.1, 0.5, days).reshape(-1, 1)
+
+    def inverse_close(self, values):
+        return np.asarray(values) * 1000
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.loads = []
+        def loader(path):
+            self.loads.append(path)
+            time.sleep(0.05)
+            return FakePredictor(path)
+        self.registry = ModelRegistry(self.root, max_models=2, loader=loader)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_resolves_symbol_then_shared_model(self):
+        """Per-symbol artifacts win over the shared model"""
+        with self.assertRaises(ModelNotFoundError):
+            self.registry.resolve('TCS.NS')
+        shared = touch_model(self.root)
+        own = touch_model(self.root, 'INFY.NS')
+        self.assertEqual(self.registry.resolve('TCS.NS'), shared)
+        self.assertEqual(self.registry.resolve('INFY.NS'), own)
+
+    def test_resolves_latest_version(self):
+        """The highest complete version wins; staging directories are ignored"""
+        touch_model(self.root, 'TCS.NS')
+        touch_model(self.root, 'TCS.NS', version=2)
+        latest = touch_model(self.root, 'TCS.NS', version=10)
+        os.makedirs(os.path.join(self.root, 'TCS.NS', '.v11-123'))
+        self.assertEqual(self.registry.versions('TCS.NS'), [2, 10])
+        self.assertEqual(self.registry.resolve('TCS.NS'), latest)
+        self.assertIn(os.path.join('v2', MODEL_FILENAME), self.registry.resolve('TCS.NS', version=2))
+        with self.assertRaises(ModelNotFoundError):
+            self.registry.resolve('TCS.NS', version=3)
+
+    def test_loads_once_and_stays_warm(self):
+        """Only the first request for a symbol loads the model"""
+        touch_model(self.root, 'TCS.NS')
+        first = self.registry.get('TCS.NS')
+        second = self.registry.get('TCS.NS')
+        self.assertIs(first, second)
+        self.assertEqual(len(self.loads), 1)
+
+    def test_concurrent_first_requests_share_a_load(self):
+        touch_model(self.root, 'TCS.NS')
+        threads = [threading.Thread(target=self.registry.get, args=('TCS.NS',)) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.loads), 1)
+
+    def test_lru_eviction(self):
+        """At most max_models stay loaded; the least recently used goes first"""
+        for symbol in ['A.NS', 'B.NS', 'C.NS']:
+            touch_model(self.root, symbol)
+        self.registry.get('A.NS')
+        self.registry.get('B.NS')
+        self.registry.get('A.NS')
+        self.registry.get('C.NS')
+        self.assertEqual(self.registry.stats()['loaded'], 2)
+        self.registry.get('A.NS')
+        self.assertEqual(len(self.loads), 3)
+        self.registry.get('B.NS')
+        self.assertEqual(len(self.loads), 4)
+
+
+class TestPredictEndpoint(unittest.TestCase):
+    def setUp(self):
+        from flask import Flask
+        from api import stock_routes
+        self.root = tempfile.mkdtemp()
+        self.routes = stock_routes
+        self.original_registry = stock_routes.model_registry
+        self.original_loader = stock_routes.load_prices
+        stock_routes.model_registry = ModelRegistry(self.root, loader=FakePredictor)
+        dates = pd.bdate_range('2024-01-01', periods=100)
+        stock_routes.load_prices = lambda symbol, period, interval='1d': [
+            {'Date': f'{d:%Y-%m-%d} 00:00:00+05:30', 'Close': 100.0} for d in dates
+        ]
+        app = Flask(__name__)
+        app.register_blueprint(stock_routes.stock_bp)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.routes.model_registry = self.original_registry
+        self.routes.load_prices = self.original_loader
+        shutil.rmtree(self.root)
+
+    def test_predict(self):
+        touch_model(self.root, 'TCS.NS')
+        response = self.client.post('/api/stock/predict/TCS.NS', json={'days': 3})
+        self.assertEqual(response.status_code, 200)
+        prediction = response.get_json()['prediction']
+        self.assertEqual([p['date'] for p in prediction], ['2024-05-20', '2024-05-21', '2024-05-22'])
+        self.assertEqual(prediction[0]['price'], 100.0)
+
+    def test_predict_with_version(self):
+        touch_model(self.root, 'TCS.NS', version=1)
+        response = self.client.post('/api/stock/predict/TCS.NS', json={'days': 1, 'version': 1})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/stock/predict/TCS.NS', json={'days': 1, 'version': 2})
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_model(self):
+        response = self.client.post('/api/stock/predict/TCS.NS', json={})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.get_json()['success'])
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestRegistryWithKerasModel(unittest.TestCase):
+    def test_load_and_forecast(self):
+        """A model saved by CNNLSTMModel loads through the registry and forecasts"""
+        from models.cnn_lstm_model import CNNLSTMModel
+        root = tempfile.mkdtemp()
+        try:
+            rng = np.random.default_rng(0)
+            close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+            df = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                               'Close': close, 'Volume': rng.uniform(1e6, 1e7, 200)})
+            model = CNNLSTMModel()
+            model.prepare_data(df.copy())
+            model.build_model()
+            os.makedirs(os.path.join(root, 'TCS.NS'))
+            model.save_model(os.path.join(root, 'TCS.NS', MODEL_FILENAME))
+
+            predictor = ModelRegistry(root).get('TCS.NS')
+            forecast = predictor.predict_next_days(df, days=3)
+            self.assertEqual(forecast.shape, (3, 1))
+            self.assertEqual(predictor.inverse_close(forecast).shape, (3, 1))
+        finally:
+            shutil.rmtree(root)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Test suite for the TensorFlow-free inference path
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.synthetic import generate_ohlcv
+from services.numpy_model import NumpyCNNLSTM, save_inference_artifact, inference_artifact_path
+import importlib.util
+import shutil
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+def random_artifact(path, seed=0):
+    """A small CNN-LSTM-shaped artifact, written without TensorFlow"""
+    rng = np.random.default_rng(seed)
+    w = lambda *shape: rng.normal(0, 0.3, shape)
+    layers = [
+        ({'type': 'conv1d', 'activation': 'relu'}, {'kernel': w(3, 5, 8), 'bias': w(8)}),
+        ({'type': 'max_pool1d', 'pool_size': 2, 'strides': 2}, {}),
+        ({'type': 'lstm', 'activation': 'tanh', 'recurrent_activation': 'sigmoid', 'return_sequences': False},
+         {'kernel': w(8, 24), 'recurrent_kernel': w(6, 24), 'bias': w(24)}),
+        ({'type': 'dense', 'activation': 'linear'}, {'kernel': w(6, 1), 'bias': w(1)}),
+    ]
+    save_inference_artifact(path, layers, (20, 5), np.full(5, -0.5), np.full(5, 0.01))
+
+
+class TestNumpyModel(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cnn_lstm_model.npz')
+        random_artifact(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_round_trip(self):
+        model, scaler = NumpyCNNLSTM.load(self.path)
+        self.assertEqual(model.input_shape, (20, 5))
+        x = np.random.default_rng(1).random((7, 20, 5), dtype=np.float32)
+        out = model.predict(x)
+        self.assertEqual(out.shape, (7, 1))
+        self.assertEqual(out.dtype, np.float32)
+        np.testing.assert_allclose(model.predict(x, batch_size=3), out, rtol=1e-6)
+        np.testing.assert_allclose(scaler.inverse_transform(scaler.transform(np.ones((2, 5)))), np.ones((2, 5)))
+
+    def test_serving_does_not_import_tensorflow(self):
+        script = (
+            "import sys\n"
+            "import numpy as np, pandas as pd\n"
+            "from services.predictor import StockPredictor\n"
+            f"predictor = StockPredictor({self.path!r})\n"
+            "close = np.linspace(100, 120, 40)\n"
+            "df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': close})\n"
+            "assert predictor.predict_next_days(df, days=3).shape == (3, 1)\n"
+            "print('tensorflow' in sys.modules)\n"
+        )
+        output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+    def test_registry_prefers_artifact(self):
+        from services.model_registry import ModelRegistry, MODEL_FILENAME
+        open(os.path.join(self.root, MODEL_FILENAME), 'w').close()
+        self.assertEqual(ModelRegistry(self.root).resolve('TCS.NS'), self.path)
+        self.assertEqual(ModelRegistry(self.root, backend='keras').resolve('TCS.NS'),
+                         os.path.join(self.root, MODEL_FILENAME))
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestKerasParity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from models.cnn_lstm_model import CNNLSTMModel
+        cls.root = tempfile.mkdtemp()
+        cls.df = generate_ohlcv('TEST.NS', bars=300).reset_index(drop=True)
+        cls.trainer = CNNLSTMModel()
+        X, y, _, _ = cls.trainer.prepare_data(cls.df.copy())
+        cls.trainer.build_model()
+        cls.trainer.model.fit(np.ascontiguousarray(X), y, epochs=1, verbose=0)
+        cls.h5 = os.path.join(cls.root, 'cnn_lstm_model.h5')
+        cls.trainer.save_model(cls.h5)
+        cls.trainer.export_inference(inference_artifact_path(cls.h5))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+
+    def test_forward_parity(self):
+        model, scaler = NumpyCNNLSTM.load(inference_artifact_path(self.h5))
+        x = np.random.default_rng(2).random((64, 60, 5), dtype=np.float32)
+        np.testing.assert_allclose(model.predict(x), self.trainer.model.predict(x, verbose=0), rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(scaler.transform(self.df.values), self.trainer.scaler.transform(self.df.values))
+
+    def test_predictor_parity(self):
+        from services.predictor import StockPredictor
+        keras_predictor = StockPredictor(self.h5)
+        numpy_predictor = StockPredictor(inference_artifact_path(self.h5))
+        np.testing.assert_allclose(numpy_predictor.predict_next_days(self.df, days=5),
+                                   keras_predictor.predict_next_days(self.df, days=5), rtol=1e-4, atol=1e-5)
+        windows = keras_predictor.prepare_data(self.df)
+        np.testing.assert_allclose(numpy_predictor.predict_windows(windows),
+                                   keras_predictor.predict_windows(windows), rtol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
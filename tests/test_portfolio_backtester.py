@@ -0,0 +1,105 @@
+"""
+Test suite for the multi-asset portfolio backtester
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.portfolio_backtester import PortfolioBacktester, align_prices, simulate_portfolio
+from backend.services.backtester import Backtester
+from backend.services.synthetic import generate_close_matrix
+from services.data_fetcher import DataFetcher
+from services.data_sources import SyntheticSource
+import unittest
+import numpy as np
+import pandas as pd
+
+
+class TestAlignPrices(unittest.TestCase):
+    def test_union_of_dates_with_forward_fill(self):
+        frames = {
+            'A.NS': pd.DataFrame({'Date': ['2024-01-01', '2024-01-02', '2024-01-04'], 'Close': [1.0, 2.0, 4.0]}),
+            'B.NS': pd.DataFrame({'Date': ['2024-01-02 00:00:00+05:30', '2024-01-03 00:00:00+05:30'],
+                                  'Close': [20.0, 30.0]}),
+        }
+        dates, close = align_prices(frames)
+        self.assertEqual(dates, ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'])
+        np.testing.assert_array_equal(close, [[1.0, np.nan], [2.0, 20.0], [2.0, 30.0], [4.0, 30.0]])
+
+
+class TestPortfolioBacktester(unittest.TestCase):
+    def setUp(self):
+        self.close = generate_close_matrix(3000, 40, seed=7)
+        self.symbols = [f'S{j:02d}.NS' for j in range(40)]
+        self.dates = pd.bdate_range('2010-01-01', periods=3000).strftime('%Y-%m-%d')
+
+    def test_single_all_in_symbol_matches_backtester(self):
+        """Risking the whole stake with no stop reproduces the single-symbol engine"""
+        close = self.close[:, :1] * 10
+        portfolio = PortfolioBacktester(['S00.NS'], None, None, initial_capital=100000,
+                                        risk_per_trade=1.0, stop_loss=1.0)
+        results = portfolio.run_on_prices(self.dates, close, 'sma_crossover')
+
+        single = Backtester('S00.NS', None, None)._sma_crossover_strategy(
+            pd.DataFrame({'Close': close[:, 0]}, index=self.dates),
+            {'capital': 100000, 'shares': 0, 'trades': [], 'portfolio_value': []})
+        self.assertGreater(len(single['trades']), 2)
+        self.assertEqual([(t['date'], t['type'], t['shares']) for t in results['trades']],
+                         [(t['date'], t['type'], t['shares']) for t in single['trades']])
+        np.testing.assert_allclose([v['value'] for v in results['portfolio_value']][200:],
+                                   [v['value'] for v in single['portfolio_value']])
+
+    def test_risk_budget_limits_positions(self):
+        """Every symbol entering at once fills only what the cash allows"""
+        close = np.full((5, 30), 100.0)
+        buy = np.zeros(close.shape, dtype=bool)
+        buy[1] = True
+        sim = simulate_portfolio(close, buy, np.zeros_like(buy), np.zeros(close.shape),
+                                 100000, risk_per_trade=0.02, stop_loss=0.10)
+        self.assertEqual(sim['positions'][1], 5)
+        self.assertEqual([fill[3] for fill in sim['fills']], [200] * 5)
+
+    def test_stop_loss_exit(self):
+        close = np.array([[100.0], [100.0], [95.0], [89.0], [120.0]])
+        buy = np.array([[False], [True], [False], [False], [False]])
+        sim = simulate_portfolio(close, buy, np.zeros_like(buy), np.zeros(close.shape),
+                                 10000, risk_per_trade=0.02, stop_loss=0.10)
+        self.assertEqual(sim['fills'][-1], (3, 0, 'SELL', 20, 89.0, 'stop'))
+        self.assertEqual(sim['pnl'][0], -220.0)
+        self.assertEqual(sim['wins'][0], 0)
+
+    def test_metrics_add_up(self):
+        portfolio = PortfolioBacktester(self.symbols, None, None, initial_capital=1000000)
+        results = portfolio.run_on_prices(self.dates, self.close, 'sma_crossover')
+        final = results['portfolio_value'][-1]['value']
+        total_pnl = sum(s['pnl'] for s in results['symbols'].values())
+        self.assertAlmostEqual(total_pnl, final - 1000000, delta=0.01 * len(self.symbols))
+        self.assertEqual(sum(s['num_trades'] for s in results['symbols'].values()),
+                         results['metrics']['num_trades'])
+        self.assertLessEqual(results['metrics']['max_positions'], 5)
+
+    def test_late_listing_and_unknown_strategy(self):
+        close = self.close[:, :3].copy()
+        close[:1000, 2] = np.nan
+        portfolio = PortfolioBacktester(self.symbols[:3], None, None, risk_per_trade=0.05, stop_loss=1.0)
+        results = portfolio.run_on_prices(self.dates, close, 'buy_and_hold')
+        self.assertEqual([t['date'] for t in results['trades']],
+                         [self.dates[0], self.dates[0], self.dates[1000]])
+        with self.assertRaises(ValueError):
+            portfolio.run_on_prices(self.dates, close, 'momentum')
+
+    def test_results_bounded_to_range(self):
+        """Only the requested dates are traded and reported; warm-up bars are loaded before them"""
+        portfolio = PortfolioBacktester(self.symbols[:3], '2024-01-01', '2024-06-30')
+        portfolio.data_fetcher = DataFetcher(source=SyntheticSource(), store=False)
+        for strategy in ('sma_crossover', 'buy_and_hold'):
+            results = portfolio.run_strategy(strategy)
+            dates = [row['date'] for row in results['portfolio_value']]
+            self.assertEqual(dates[0], '2024-01-01')
+            self.assertEqual(dates[-1], '2024-06-28')
+            self.assertTrue(all(trade['date'] >= '2024-01-01' for trade in results['trades']))
+        self.assertGreater(len(portfolio.run_strategy('buy_and_hold')['trades']), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Test suite for the prediction service
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.synthetic import generate_ohlcv
+import importlib.util
+import unittest
+import numpy as np
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+def naive_forecast(model, window, days, close_index=3):
+    """One predict() per day, rebuilding the window with np.append"""
+    sequence = window[np.newaxis].astype(np.float32)
+    predictions = []
+    for _ in range(days):
+        pred = model.predict(sequence, verbose=0)
+        predictions.append(pred[0, 0])
+        next_row = sequence[:, -1:, :].copy()
+        next_row[0, 0, close_index] = pred[0, 0]
+        sequence = np.append(sequence[:, 1:, :], next_row, axis=1)
+    return np.array(predictions)
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestForecast(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from models.cnn_lstm_model import CNNLSTMModel
+        from services.predictor import StockPredictor
+        cls.frames = [generate_ohlcv('TEST.NS', bars=300, seed=seed).reset_index(drop=True) for seed in range(3)]
+        trainer = CNNLSTMModel()
+        trainer.prepare_data(cls.frames[0].copy())
+        cls.predictor = StockPredictor()
+        cls.predictor.model = trainer.build_model()
+        cls.predictor.scaler = trainer.scaler
+
+    def test_latest_window_ends_at_last_bar(self):
+        window = self.predictor.latest_window(self.frames[0])
+        expected = self.predictor.scaler.transform(self.frames[0][['Open', 'High', 'Low', 'Close', 'Volume']].values)
+        np.testing.assert_allclose(window, expected[-60:])
+
+    def test_matches_naive_loop(self):
+        """The compiled, buffered loop reproduces per-step predict()"""
+        forecast = self.predictor.predict_next_days(self.frames[0], days=10)
+        expected = naive_forecast(self.predictor.model, self.predictor.latest_window(self.frames[0]), 10)
+        self.assertEqual(forecast.shape, (10, 1))
+        np.testing.assert_allclose(forecast[:, 0], expected, rtol=1e-4, atol=1e-5)
+
+    def test_batch_matches_individual_forecasts(self):
+        """Several horizons forecast in lockstep match one-at-a-time runs"""
+        batch = self.predictor.predict_next_days_batch(self.frames, days=7)
+        self.assertEqual(batch.shape, (3, 7))
+        for i, df in enumerate(self.frames):
+            np.testing.assert_allclose(batch[i], self.predictor.predict_next_days(df, days=7)[:, 0],
+                                       rtol=1e-4, atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
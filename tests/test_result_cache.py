@@ -0,0 +1,101 @@
+"""
+Test suite for the backtest result cache
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.backtester import Backtester
+from backend.services.result_cache import BacktestResultCache, data_fingerprint
+from backend.services.synthetic import generate_ohlcv
+from services.data_fetcher import DataFetcher
+from services.data_sources import SyntheticSource
+import shutil
+import tempfile
+import unittest
+
+
+class CountingBacktester(Backtester):
+    """Backtester over a fixed frame that counts strategy runs"""
+    def __init__(self, df, result_cache, **kwargs):
+        super().__init__('TEST.NS', None, None, result_cache=result_cache, **kwargs)
+        self.df = df
+        self.runs = 0
+
+    def _load_data(self, warmup=0):
+        return self.df.copy()
+
+    def _run_on_data(self, df, strategy_name, params):
+        self.runs += 1
+        return super()._run_on_data(df, strategy_name, params)
+
+
+class TestBacktestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.df = generate_ohlcv('TEST.NS', '5y', end='2024-06-28').reset_index()
+        self.cache = BacktestResultCache(self.root, max_bytes=64 * 1024 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_repeat_run_is_served_from_memory(self):
+        backtester = CountingBacktester(self.df, self.cache)
+        first = backtester.run_strategy('sma_crossover')
+        second = backtester.run_strategy('sma_crossover')
+        self.assertEqual(backtester.runs, 1)
+        self.assertIs(second, first)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_disk_tier_survives_restart(self):
+        """A fresh cache over the same directory reuses stored results"""
+        expected = CountingBacktester(self.df, self.cache).run_strategy('sma_crossover')
+        backtester = CountingBacktester(self.df, BacktestResultCache(self.root))
+        result = backtester.run_strategy('sma_crossover')
+        self.assertEqual(backtester.runs, 0)
+        self.assertEqual(result['metrics'], expected['metrics'])
+        self.assertEqual(len(result['trades']), len(expected['trades']))
+
+    def test_key_covers_strategy_params_and_capital(self):
+        backtester = CountingBacktester(self.df, self.cache)
+        backtester.run_strategy('sma_crossover')
+        backtester.run_strategy('sma_crossover', {'short_window': 20})
+        backtester.run_strategy('buy_and_hold')
+        CountingBacktester(self.df, self.cache, initial_capital=50000).run_strategy('sma_crossover')
+        self.assertEqual(backtester.runs, 3)
+        self.assertEqual(self.cache.stats()['computed'], 4)
+
+    def test_changed_data_invalidates(self):
+        """A revised bar is a miss, and results from the old data are purged"""
+        CountingBacktester(self.df, self.cache).run_strategy('sma_crossover')
+        revised = self.df.copy()
+        revised.loc[revised.index[-1], 'Close'] += 1.0
+        self.assertNotEqual(data_fingerprint(revised), data_fingerprint(self.df))
+
+        backtester = CountingBacktester(revised, self.cache)
+        backtester.run_strategy('sma_crossover')
+        self.assertEqual(backtester.runs, 1)
+        self.assertEqual(self.cache.stats()['invalidated'], 1)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'TEST.NS'))), 1)
+
+    def test_alternating_date_ranges_stay_cached(self):
+        """Runs over different ranges of unchanged data do not evict each other"""
+        runs = []
+        for _ in range(2):
+            for start, end in (('2022-01-01', '2022-06-30'), ('2023-01-01', '2023-06-30')):
+                backtester = Backtester('TEST.NS', start, end, result_cache=self.cache)
+                backtester.data_fetcher = DataFetcher(source=SyntheticSource(), store=False)
+                runs.append(backtester.run_strategy('sma_crossover'))
+        self.assertEqual(runs[2:], runs[:2])
+        self.assertNotEqual(runs[0]['metrics'], runs[1]['metrics'])
+        self.assertEqual(self.cache.stats()['computed'], 2)
+        self.assertEqual(self.cache.stats()['invalidated'], 0)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(os.path.join(self.root, 'TEST.NS'))), 2)
+
+    def test_unknown_parameter(self):
+        with self.assertRaises(ValueError):
+            CountingBacktester(self.df, self.cache).run_strategy('sma_crossover', {'window': 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Test suite for the synthetic OHLCV generator
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.synthetic import generate_ohlcv, generate_universe, generate_close_matrix
+from backend.services.data_fetcher import DataFetcher
+import subprocess
+import unittest
+import numpy as np
+import pandas as pd
+
+END = '2024-06-28'
+
+
+class TestSyntheticData(unittest.TestCase):
+    def test_deterministic_across_processes(self):
+        """Seeding does not depend on hash randomization"""
+        script = (
+            "import sys; sys.path.insert(0, 'backend');"
+            "from services.synthetic import generate_ohlcv;"
+            f"print(generate_ohlcv('TCS.NS', '1y', end='{END}')['Close'].sum())"
+        )
+        root = os.path.join(os.path.dirname(__file__), '..')
+        outputs = {
+            subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True,
+                           env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+            for seed in ('1', '2')
+        }
+        self.assertEqual(len(outputs), 1)
+
+    def test_periods_and_intervals(self):
+        """Long periods and intraday intervals are supported"""
+        self.assertEqual(len(generate_ohlcv('TCS.NS', '5d', end=END)), 5)
+        self.assertGreater(len(generate_ohlcv('TCS.NS', '5y', end=END)), 1200)
+        self.assertGreater(len(generate_ohlcv('TCS.NS', 'max', end=END)), 5000)
+        intraday = generate_ohlcv('TCS.NS', '5d', '15m', end=END)
+        self.assertEqual(len(intraday), 5 * 25)
+        self.assertEqual(intraday.index[0].strftime('%H:%M'), '09:15')
+        self.assertEqual(len(generate_ohlcv('TCS.NS', interval='1m', bars=100000)), 100000)
+
+    def test_ohlc_structure(self):
+        """High/Low bracket Open/Close and volume is positive"""
+        df = generate_ohlcv('INFY.NS', '10y', end=END)
+        self.assertTrue((df['High'] >= df[['Open', 'Close']].max(axis=1)).all())
+        self.assertTrue((df['Low'] <= df[['Open', 'Close']].min(axis=1)).all())
+        self.assertTrue((df['Volume'] > 0).all())
+        self.assertEqual(df['Volume'].dtype, np.int64)
+        self.assertEqual(df['Close'].iloc[-1], 1500.0)
+
+    def test_universe_matches_single_symbol(self):
+        universe = generate_universe(50, '1y', end=END)
+        self.assertEqual(len(universe), 50)
+        pd.testing.assert_frame_equal(universe['SYN0007.NS'], generate_ohlcv('SYN0007.NS', '1y', end=END))
+
+    def test_close_matrix(self):
+        matrix = generate_close_matrix(1000, 200)
+        self.assertEqual(matrix.shape, (1000, 200))
+        np.testing.assert_array_equal(matrix, generate_close_matrix(1000, 200))
+
+    def test_mock_fallback_covers_max(self):
+        """Offline 'max' fetches have enough history for SMA_200"""
+        records = DataFetcher(store=False)._generate_mock_data('RELIANCE.NS', 'max')
+        self.assertGreater(len(records), 200)
+        self.assertEqual(set(records[0]), {'Date', 'Open', 'High', 'Low', 'Close', 'Volume'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Test suite for latency metrics and the sampling profiler
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.telemetry import Histogram, STAGE_SECONDS, SamplingProfiler, stage_timer
+from config import Config
+import time
+import unittest
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value, '/a')
+        series = histogram.snapshot()[('/a',)]
+        self.assertEqual(series['buckets'], [1, 3])
+        self.assertEqual(series['count'], 4)
+        self.assertAlmostEqual(series['sum'], 6.05)
+        lines = histogram.render()
+        self.assertIn('# TYPE latency_seconds histogram', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_count{route="/a"} 4', lines)
+
+    def test_label_escaping_and_arity(self):
+        histogram = Histogram('h', 'H', ('path',))
+        histogram.observe(1, 'say "hi"\\')
+        self.assertIn('h_count{path="say \\"hi\\"\\\\"} 1', histogram.render())
+        with self.assertRaises(ValueError):
+            histogram.observe(1)
+
+    def test_stage_timer(self):
+        before = STAGE_SECONDS.snapshot().get(('test', 'block'), {'count': 0})['count']
+        with stage_timer('test', 'block'):
+            pass
+
+        @stage_timer('test', 'block')
+        def decorated():
+            return 42
+
+        self.assertEqual(decorated(), 42)
+        self.assertEqual(STAGE_SECONDS.snapshot()[('test', 'block')]['count'], before + 2)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_registered_thread(self):
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        busy(0.1)
+        samples = profiler.stop()
+        self.assertGreater(sum(samples.values()), 0)
+        self.assertTrue(any('test_telemetry.py:busy' in stack for stack in samples))
+        profile_id = profiler.keep(samples, path='/x')
+        self.assertEqual(profiler.profiles()[0]['id'], profile_id)
+        self.assertIn('test_telemetry.py:busy', profiler.collapsed(profile_id))
+        self.assertIsNone(profiler.collapsed(profile_id + 1))
+
+
+class TestMetricsRoutes(unittest.TestCase):
+    def setUp(self):
+        from app import create_app
+        self.app = create_app(preload=False)
+        self.app.add_url_rule('/api/test/slow', 'slow', lambda: (busy(0.05), 'ok')[1])
+        self.client = self.app.test_client()
+        self.mode = Config.PROFILER_MODE
+
+    def tearDown(self):
+        Config.PROFILER_MODE = self.mode
+
+    def test_request_histogram(self):
+        self.client.get('/api/health')
+        body = self.client.get('/api/metrics').get_data(as_text=True)
+        self.assertIn('finanz_http_request_duration_seconds_count{method="GET",endpoint="/api/health",status="200"}',
+                      body)
+        self.assertIn('# TYPE finanz_stage_duration_seconds histogram', body)
+
+    def test_profile_on_request(self):
+        Config.PROFILER_MODE = 'off'
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/test/slow', headers={'X-Profile': '1'}).headers)
+        Config.PROFILER_MODE = 'request'
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/test/slow').headers)
+        response = self.client.get('/api/test/slow', headers={'X-Profile': '1'})
+        profile_id = response.headers['X-Profile-Id']
+        profiles = self.client.get('/api/metrics/profiles').get_json()['profiles']
+        self.assertEqual(profiles[0]['endpoint'], '/api/test/slow')
+        collapsed = self.client.get(f'/api/metrics/profiles/{profile_id}').get_data(as_text=True)
+        self.assertIn('test_telemetry.py:busy', collapsed)
+        self.assertEqual(self.client.get('/api/metrics/profiles/999999').status_code, 404)
+
+    def test_unknown_profiler_mode(self):
+        from app import create_app
+        Config.PROFILER_MODE = 'slwo'
+        with self.assertRaises(ValueError):
+            create_app(preload=False)
+
+    def test_slow_mode_keeps_slow_requests(self):
+        Config.PROFILER_MODE = 'slow'
+        slow_ms = Config.PROFILER_SLOW_MS
+        try:
+            Config.PROFILER_SLOW_MS = 10
+            self.assertIn('X-Profile-Id', self.client.get('/api/test/slow').headers)
+            self.assertNotIn('X-Profile-Id', self.client.get('/api/health').headers)
+        finally:
+            Config.PROFILER_SLOW_MS = slow_ms
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Test suite for the per-symbol training orchestrator
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.model_registry import ModelRegistry, MODEL_FILENAME, METADATA_FILENAME
+import importlib.util
+import json
+import shutil
+import tempfile
+import unittest
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestTrainSymbols(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_parallel_versioned_artifacts(self):
+        from models.train import train_symbols, format_summary
+        summaries = train_symbols(['TCS.NS', 'INFY.NS'], period='1y', epochs=1, batch_size=64,
+                                  max_workers=2, model_dir=self.root, plot=HAS_MATPLOTLIB)
+        self.assertEqual([row['symbol'] for row in summaries], ['TCS.NS', 'INFY.NS'])
+        self.assertTrue(all(row['status'] == 'ok' for row in summaries), summaries)
+
+        directory = os.path.join(self.root, 'TCS.NS', 'v1')
+        for name in (MODEL_FILENAME, 'cnn_lstm_model_scaler.pkl', 'cnn_lstm_model.npz', METADATA_FILENAME):
+            self.assertTrue(os.path.exists(os.path.join(directory, name)), name)
+        with open(os.path.join(directory, METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata['version'], 1)
+        self.assertIn('rmse', metadata['metrics'])
+        self.assertEqual(ModelRegistry(self.root, backend='keras').resolve('TCS.NS'),
+                         os.path.join(directory, MODEL_FILENAME))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'training_summary.json')))
+        self.assertIn('INFY.NS', format_summary(summaries))
+
+        # A second run adds a version instead of overwriting the first
+        rerun = train_symbols(['TCS.NS'], period='1y', epochs=1, batch_size=64,
+                              max_workers=1, model_dir=self.root, plot=False)
+        self.assertEqual(rerun[0]['version'], 2)
+        self.assertEqual(ModelRegistry(self.root).versions('TCS.NS'), [1, 2])
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestPooledModel(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_each_symbol_keeps_its_scaler(self):
+        from models.train import train_pooled_model, load_pooled_model
+        from services.data_fetcher import DataFetcher
+        symbols = ['TCS.NS', 'INFY.NS']
+        train_pooled_model(symbols, period='1y', epochs=1, batch_size=64, model_dir=self.root)
+        fetcher = DataFetcher()
+        for symbol in symbols:
+            model = load_pooled_model(symbol, model_dir=self.root)
+            close = [row['Close'] for row in fetcher.fetch_stock_data(symbol, period='1y')]
+            self.assertAlmostEqual(model.scaler.data_min_[3], min(close))
+            self.assertAlmostEqual(model.scaler.data_max_[3], max(close))
+        with self.assertRaises(ValueError):
+            load_pooled_model('HDFCBANK.NS', model_dir=self.root)
+
+if __name__ == '__main__':
+    unittest.main()
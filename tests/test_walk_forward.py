@@ -0,0 +1,152 @@
+"""
+Test suite for the batched walk-forward ML strategy
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.backtester import Backtester
+from services.walk_forward import predict_closes, walk_forward_folds
+from services.synthetic import generate_ohlcv
+import importlib.util
+import unittest
+import numpy as np
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+class IdentityScaler:
+    def transform(self, data):
+        return np.asarray(data, dtype=float)
+
+
+class MomentumPredictor:
+    """Predicts that the last window's move repeats, one bar ahead"""
+    sequence_length = 10
+    scaler = IdentityScaler()
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_windows(self, windows, batch_size=1024):
+        self.calls += 1
+        close = windows[:, :, 3]
+        return close[:, -1] * (close[:, -1] / close[:, 0])
+
+
+class SharedRegistry:
+    """Stand-in for the API's model registry, handing out one warm predictor"""
+    def __init__(self):
+        self.predictor = MomentumPredictor()
+        self.loads = 0
+
+    def resolve(self, symbol, version=None):
+        return ''
+
+    def get(self, symbol, version=None):
+        self.loads += 1
+        return self.predictor
+
+
+def naive_ml_backtest(predictor, df, threshold, capital):
+    """One model call per bar, trading bar by bar"""
+    features = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float)
+    seq = predictor.sequence_length
+    shares, trades, values = 0, [], []
+    for t in range(seq - 1, len(df)):
+        price = features[t, 3]
+        predicted = predictor.predict_windows(features[None, t - seq + 1:t + 1])[0]
+        expected = predicted / price - 1
+        if expected > threshold and shares == 0:
+            shares = int(capital / price)
+            capital -= shares * price
+            trades.append((t, 'BUY', shares))
+        elif expected < -threshold and shares > 0:
+            capital += shares * price
+            trades.append((t, 'SELL', shares))
+            shares = 0
+        values.append(capital + shares * price)
+    return trades, values
+
+
+class TestMLStrategy(unittest.TestCase):
+    def setUp(self):
+        self.df = generate_ohlcv('TEST.NS', '5y', end='2024-06-28').reset_index(drop=True)
+        self.predictor = MomentumPredictor()
+        self.backtester = Backtester('TEST.NS', None, None, predictor=self.predictor)
+        self.backtester._load_data = lambda warmup=0: self.df.copy()
+
+    def test_batched_predictions_match_per_window_calls(self):
+        features = self.df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float)
+        predicted = predict_closes(self.predictor, features, batch_size=64)
+        self.assertTrue(np.isnan(predicted[:9]).all())
+        for t in (9, 100, len(features) - 1):
+            expected = self.predictor.predict_windows(features[None, t - 9:t + 1])[0]
+            self.assertEqual(predicted[t], expected)
+
+    def test_matches_bar_by_bar_loop(self):
+        for threshold in (0.0, 0.01):
+            results = self.backtester.run_strategy('ml_predictions', {'threshold': threshold})
+            trades, values = naive_ml_backtest(MomentumPredictor(), self.df, threshold, 100000)
+            self.assertGreater(len(trades), 2)
+            self.assertEqual([(int(t['date']), t['type'], t['shares']) for t in results['trades']], trades)
+            np.testing.assert_allclose([v['value'] for v in results['portfolio_value']], values)
+
+    def test_timings_and_single_prediction_pass(self):
+        results = self.backtester.run_strategy('ml_predictions')
+        self.assertEqual(self.predictor.calls, 1)
+        timings = results['timings']
+        self.assertEqual(timings['bars_predicted'], len(self.df) - 9)
+        self.assertGreaterEqual(timings['prediction_seconds'], 0)
+        self.assertGreaterEqual(timings['simulation_seconds'], 0)
+
+    def test_in_memory_model_is_not_cached(self):
+        self.assertIsNone(self.backtester._cache_params('ml_predictions', {}))
+        self.assertEqual(self.backtester._cache_params('sma_crossover', {'short_window': 5}), {'short_window': 5})
+
+    def test_model_comes_from_injected_registry(self):
+        """Backtests reuse the shared registry's model instead of loading their own"""
+        registry = SharedRegistry()
+        for _ in range(2):
+            backtester = Backtester('TEST.NS', None, None, model_registry=registry)
+            backtester._load_data = lambda warmup=0: self.df.copy()
+            backtester.run_strategy('ml_predictions')
+        self.assertEqual(registry.loads, 2)
+        self.assertEqual(registry.predictor.calls, 2)
+
+    def test_folds(self):
+        self.assertEqual(walk_forward_folds(400, 150, 100), [(0, 150, 250), (100, 250, 350), (200, 350, 400)])
+
+
+def tiny_model(sequence_length, n_features):
+    from tensorflow import keras
+    model = keras.Sequential([
+        keras.Input(shape=(sequence_length, n_features)),
+        keras.layers.Flatten(),
+        keras.layers.Dense(1),
+    ])
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestWalkForwardRetraining(unittest.TestCase):
+    def test_rolling_retrain(self):
+        """Each fold predicts only its own test segment; pooled and serial runs agree"""
+        from services.walk_forward import walk_forward_predictions
+        df = generate_ohlcv('TEST.NS', bars=400, end='2024-06-28')
+        features = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=float)
+        kwargs = dict(sequence_length=10, train_window=150, retrain_every=100, epochs=2,
+                      batch_size=32, model_factory=tiny_model)
+
+        serial, folds = walk_forward_predictions(features, max_workers=1, **kwargs)
+        self.assertEqual(len(folds), 3)
+        self.assertTrue(np.isnan(serial[:150]).all())
+        self.assertTrue(np.isfinite(serial[150:]).all())
+
+        pooled, _ = walk_forward_predictions(features, max_workers=2, **kwargs)
+        np.testing.assert_allclose(pooled, serial, rtol=1e-4)
+
+if __name__ == '__main__':
+    unittest.main()
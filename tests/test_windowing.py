@@ -0,0 +1,102 @@
+"""
+Test suite for sliding-window sequence builders
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backend.services.synthetic import generate_ohlcv
+from backend.services.windowing import sliding_windows, window_batches
+import importlib.util
+import tracemalloc
+import unittest
+import numpy as np
+
+HAS_TENSORFLOW = importlib.util.find_spec('tensorflow') is not None
+
+
+def loop_windows(data, window):
+    """The list-append construction the models used before"""
+    sequences = []
+    for i in range(window, len(data)):
+        sequences.append(data[i-window:i])
+    return np.array(sequences)
+
+
+class TestSlidingWindows(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.default_rng(0).random((500, 5))
+
+    def test_matches_loop(self):
+        """Windows are identical to the list-append construction"""
+        np.testing.assert_array_equal(sliding_windows(self.data, 60)[:-1], loop_windows(self.data, 60))
+
+    def test_is_a_view(self):
+        """No copy of the input is made"""
+        windows = sliding_windows(self.data, 60)
+        self.assertEqual(windows.shape, (441, 60, 5))
+        self.assertTrue(np.shares_memory(windows, self.data))
+        self.assertFalse(windows.flags.writeable)
+
+    def test_short_input(self):
+        """Inputs shorter than the window yield no windows"""
+        self.assertEqual(sliding_windows(self.data[:10], 60).shape, (0, 60, 5))
+        self.assertEqual(len(sliding_windows(self.data[:60], 60)[:-1]), len(loop_windows(self.data[:60], 60)))
+
+    def test_window_batches(self):
+        """Batches concatenate to the full window set"""
+        targets = np.arange(len(self.data))
+        batches = list(window_batches(self.data, 60, 100, targets=targets, stop=440))
+        self.assertEqual([len(x) for x, _ in batches], [100, 100, 100, 100, 40])
+        np.testing.assert_array_equal(np.concatenate([x for x, _ in batches]), loop_windows(self.data, 60))
+        np.testing.assert_array_equal(np.concatenate([y for _, y in batches]), targets[:440])
+
+    def test_peak_memory_reduction(self):
+        """Building windows allocates a fraction of the materialized copy"""
+        data = np.random.default_rng(1).random((20000, 5))
+
+        tracemalloc.start()
+        loop_windows(data, 60)
+        _, loop_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        sliding_windows(data, 60)[:-1]
+        _, view_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertGreater(loop_peak, 20000 * 60 * 5 * 8)
+        self.assertLess(view_peak, loop_peak / 100)
+
+
+@unittest.skipUnless(HAS_TENSORFLOW, 'tensorflow is not installed')
+class TestModelPrepareData(unittest.TestCase):
+    def test_cnn_lstm_prepare_data(self):
+        """CNNLSTMModel.prepare_data output is unchanged"""
+        from models.cnn_lstm_model import CNNLSTMModel
+        model = CNNLSTMModel(sequence_length=60, n_features=5)
+        df = generate_ohlcv('TEST.NS', bars=400).reset_index(drop=True)
+        X_train, y_train, X_test, y_test = model.prepare_data(df.copy())
+
+        scaled = model.scaler.transform(model.add_technical_indicators(df)[
+            ['Open', 'High', 'Low', 'Close', 'Volume']].values)
+        X = loop_windows(scaled, 60)
+        y = scaled[60:, 3]
+        split = int(len(X) * 0.8)
+        np.testing.assert_array_equal(X_train, X[:split])
+        np.testing.assert_array_equal(X_test, X[split:])
+        np.testing.assert_array_equal(y_train, y[:split])
+        np.testing.assert_array_equal(y_test, y[split:])
+
+    def test_predictor_prepare_data(self):
+        """StockPredictor.prepare_data output is unchanged"""
+        from services.predictor import StockPredictor
+        predictor = StockPredictor()
+        df = generate_ohlcv('TEST.NS', bars=300).reset_index(drop=True)
+        sequences = predictor.prepare_data(df)
+        scaled = predictor.scaler.transform(df[['Open', 'High', 'Low', 'Close', 'Volume']].values)
+        np.testing.assert_array_equal(sequences, loop_windows(scaled, 60))
+
+if __name__ == '__main__':
+    unittest.main()